@@ -7,4 +7,7 @@ from django.db.models.signals import post_save
 #   https://stackoverflow.com/questions/70466886/typeerror-init-got-an-unexpected-keyword-argument-providing-args
 job_created = Signal()
 assist_created = Signal()
-
+# Sent with `instance` once a BoostJobs row is posted or edited
+boost_job_posted = Signal()
+# Sent with `instance` after a user's JobPreference is saved
+job_preference_updated = Signal()
@@ -1,12 +1,41 @@
+import itertools
+import json
 import logging
-import pandas as pd
-from rest_framework.decorators import api_view, permission_classes
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import IngestedJob, MatchResult, Profile
+from .models import IngestedJob, MatchResult, MatchingTask, Profile
+from .pagination import InvalidCursor, keyset_page
 from .job_model.job_recommender import JobAppMatching
+from .job_model.ingest import (
+    ingest_batch,
+    ingested_fields_from_payload,
+    job_profile_for_ingested,
+    upsert_ingested_job,
+)
+from .job_model.job_index import recommend_ingested_jobs
+from .job_model.matches import (
+    MATCH_ORDERING,
+    MATCHED_JOB_FIELDS,
+    job_matches,
+    user_matches,
+)
+from .job_model.match_worker import (
+    enqueue_matching,
+    enqueue_matching_many,
+    latest_task,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,32 +56,6 @@ EMPLOYMENT_TYPE_MAP = {
 }
 
 
-def _infer_experience_level(years):
-    if years is None:
-        return "entry"
-    if years >= 5:
-        return "senior"
-    elif years >= 2:
-        return "mid"
-    return "entry"
-
-
-def _ingested_jobs_to_dataframe(jobs):
-    rows = []
-    for j in jobs:
-        skills = ";".join((j.required_skills or []) + (j.preferred_skills or []))
-        rows.append({
-            "title": j.title,
-            "owner": j.company or "",
-            "location": (j.location or "").lower(),
-            "experience_level": _infer_experience_level(j.years_experience),
-            "skills": skills,
-            "min_salary": j.salary_min or 0,
-            "max_salary": j.salary_max or 0,
-        })
-    return pd.DataFrame(rows) if rows else pd.DataFrame()
-
-
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def ingest_job_and_match(request):
@@ -65,157 +68,345 @@ def ingest_job_and_match(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    existing = IngestedJob.objects.filter(source_job_id=source_job_id).first()
-    if existing:
-        return Response(
-            {
-                "detail": "Job already ingested",
-                "ingested_job_id": existing.id,
-                "match_count": existing.matches.count(),
-            },
-            status=status.HTTP_200_OK,
-        )
+    fields = ingested_fields_from_payload(payload)
+    fields["source_job_id"] = str(source_job_id)
+    with transaction.atomic():
+        ingested, outcome = upsert_ingested_job(fields)
+        if outcome == "unchanged":
+            return Response(
+                {
+                    "detail": "Job already ingested",
+                    "ingested_job_id": ingested.id,
+                    "status": ingested.status,
+                    "match_count": ingested.matches.count(),
+                },
+                status=status.HTTP_200_OK,
+            )
+        # Only this job is (re-)matched; its matches are replaced atomically
+        task = enqueue_matching(MatchingTask.Kind.INGESTED_JOB, ingested.id)
 
-    ingested = IngestedJob.objects.create(
-        source_job_id=source_job_id,
-        title=payload.get("job_title", "Untitled"),
-        company=payload.get("company"),
-        location=payload.get("location"),
-        remote=payload.get("remote", False),
-        salary_min=payload.get("salary_min"),
-        salary_max=payload.get("salary_max"),
-        salary_currency=payload.get("salary_currency", "USD"),
-        required_skills=payload.get("required_skills", []),
-        preferred_skills=payload.get("preferred_skills", []),
-        years_experience=payload.get("years_experience"),
-        employment_type=payload.get("employment_type"),
-        description=payload.get("description"),
-        source=payload.get("source", "scuib_jobs_ai"),
-        raw_payload=payload,
+    return Response(
+        {
+            "detail": (
+                "Job ingested; matching queued"
+                if outcome == "created"
+                else "Job changed; re-matching queued"
+            ),
+            "ingested_job_id": ingested.id,
+            "status": ingested.status,
+            "task_id": task.id,
+        },
+        status=status.HTTP_202_ACCEPTED,
     )
 
-    skills_list = payload.get("required_skills", []) + payload.get("preferred_skills", [])
-    skills_str = ";".join(skills_list) if skills_list else ""
 
-    years = ingested.years_experience or 0
-    exp_level = _infer_experience_level(years)
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON. Parses lazily: request.data is an iterator that
+    reads the body one line at a time and yields each decoded value, or the
+    decoding error for a malformed line, so a large upload is never held in
+    memory at once.
+    """
 
-    job_profile = {
-        "skills": skills_str,
-        "experience_level": exp_level,
-        "years_of_experience": years,
-        "location": (ingested.location or "").lower(),
-        "min_salary": ingested.salary_min or 0,
-        "max_salary": ingested.salary_max or 0,
-        "currency_type": ingested.salary_currency,
-    }
+    media_type = "application/x-ndjson"
 
-    matcher = JobAppMatching()
-    user_profiles = matcher.load_users_from_db()
-
-    matched_users = []
-    if not user_profiles.empty:
-        try:
-            matched_users = matcher.recommend_users(job_profile, user_profiles)
-        except Exception as e:
-            logger.error(f"Matching failed for job {ingested.id}: {e}")
-
-    match_objects = []
-    for user_data in matched_users:
-        match = MatchResult(
-            ingested_job=ingested,
-            user_id=user_data["user_id"],
-            user_name=user_data["user_name"],
-            match_score=user_data["match_score"],
-            skills=user_data.get("skills", ""),
-            location=user_data.get("user_location", ""),
-            years_of_experience=user_data.get("years_of_experience"),
-            experience_level=user_data.get("experience_level"),
-            salary_range=user_data.get("salary_range"),
-        )
-        match_objects.append(match)
+    def parse(self, stream, media_type=None, parser_context=None):
+        def values():
+            if stream is None:
+                return
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield ParseError(f"Malformed JSON line: {e}")
 
-    if match_objects:
-        MatchResult.objects.bulk_create(match_objects)
+        return values()
 
-    ingested.status = "matched"
-    ingested.save(update_fields=["status"])
 
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@parser_classes([JSONParser, NDJSONParser])
+def ingest_jobs_bulk(request):
+    """
+    Ingest many handoff payloads in one request: a JSON array (or
+    {"jobs": [...]}), or an NDJSON body with one payload per line. Payloads
+    are stored INGEST_BATCH_SIZE at a time, each batch with a constant
+    number of queries, and the new jobs of a batch are queued for matching
+    together. At most INGEST_MAX_JOBS payloads are read per request.
+
+    Returns one result per payload, in order, with its ingested_job_id:
+    created, updated (content changed since it was ingested; re-matched),
+    unchanged (identical content hash; nothing written) or invalid.
+    """
+    data = request.data
+    if isinstance(data, dict):
+        data = data.get("jobs")
+    if isinstance(data, (str, bytes)) or not hasattr(data, "__iter__"):
+        return Response(
+            {"error": "Expected a JSON array or NDJSON body of jobs"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    batch_size = getattr(settings, "INGEST_BATCH_SIZE", 500)
+    max_jobs = getattr(settings, "INGEST_MAX_JOBS", 10000)
+    payloads = iter(data)
+    results = []
+    while len(results) < max_jobs:
+        batch = list(
+            itertools.islice(payloads, min(batch_size, max_jobs - len(results)))
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            batch_results, created = ingest_batch(batch, offset=len(results))
+            enqueue_matching_many(MatchingTask.Kind.INGESTED_JOB, created)
+        results.extend(batch_results)
+    unread = object()
+    truncated = next(payloads, unread) is not unread
+
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "invalid": 0}
+    for result in results:
+        counts[result["status"]] += 1
     return Response(
         {
-            "detail": "Job ingested and matched",
-            "ingested_job_id": ingested.id,
-            "match_count": len(matched_users),
-            "matches": [
-                {
-                    "user_id": m.user_id,
-                    "user_name": m.user_name,
-                    "match_score": m.match_score,
-                    "skills": m.skills,
-                    "location": m.location,
-                }
-                for m in match_objects
-            ],
+            "count": len(results),
+            **counts,
+            "truncated": truncated,
+            "results": results,
         },
-        status=status.HTTP_201_CREATED,
+        status=(
+            status.HTTP_202_ACCEPTED
+            if counts["created"] or counts["updated"]
+            else status.HTTP_200_OK
+        ),
     )
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
-def list_ingested_jobs(request):
-    status_filter = request.query_params.get("status")
-    limit = int(request.query_params.get("limit", 50))
+def ingested_job_status(request, job_id):
+    """Matching status of an ingested job; matches are served by .../matches/."""
+    try:
+        job = IngestedJob.objects.get(id=job_id)
+    except IngestedJob.DoesNotExist:
+        return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    task = latest_task(MatchingTask.Kind.INGESTED_JOB, job.id)
+    return Response(
+        {
+            "ingested_job_id": job.id,
+            "status": job.status,
+            "task_status": task.status if task else None,
+            "error": task.error if task else None,
+            "match_count": job.matches.count() if job.status == "matched" else None,
+        }
+    )
+
+
+# Most matches returned per job by match_jobs_batch
+MAX_BATCH_TOP_K = 100
 
-    qs = IngestedJob.objects.all()
-    if status_filter:
-        qs = qs.filter(status=status_filter)
 
-    jobs = qs[:limit]
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def match_jobs_batch(request):
+    """
+    Score many job payloads (same shape as the ingest payload) against all
+    candidates in one pass, returning the best `top_k` (1 to
+    MAX_BATCH_TOP_K, default 10) per job. Nothing is persisted.
+    """
+    jobs = request.data.get("jobs")
+    if not isinstance(jobs, list) or not jobs:
+        return Response(
+            {"error": "jobs must be a non-empty list"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not all(isinstance(job, dict) for job in jobs):
+        return Response(
+            {"error": "each job must be an object"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        top_k = int(request.data.get("top_k", 10))
+    except (TypeError, ValueError):
+        top_k = 0
+    if not 1 <= top_k <= MAX_BATCH_TOP_K:
+        return Response(
+            {"error": f"top_k must be an integer from 1 to {MAX_BATCH_TOP_K}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    job_profiles = [
+        job_profile_for_ingested(IngestedJob(**ingested_fields_from_payload(job)))
+        for job in jobs
+    ]
+
+    matcher = JobAppMatching()
+    results = matcher.recommend_users_batch(job_profiles, k=top_k)
+
     return Response(
         {
             "count": len(jobs),
             "results": [
                 {
-                    "id": j.id,
-                    "source_job_id": j.source_job_id,
-                    "title": j.title,
-                    "company": j.company,
-                    "location": j.location,
-                    "remote": j.remote,
-                    "salary_min": j.salary_min,
-                    "salary_max": j.salary_max,
-                    "salary_currency": j.salary_currency,
-                    "required_skills": j.required_skills,
-                    "preferred_skills": j.preferred_skills,
-                    "years_experience": j.years_experience,
-                    "employment_type": j.employment_type,
-                    "description": j.description,
-                    "source": j.source,
-                    "status": j.status,
-                    "match_count": j.matches.count(),
-                    "created_at": j.created_at.isoformat(),
+                    "job_id": job.get("job_id") or job.get("id"),
+                    "match_count": len(matches),
+                    "matches": matches,
                 }
-                for j in jobs
+                for job, matches in zip(jobs, results)
             ],
         }
     )
 
 
+# Fields of an ingested job in the listing: "full" (the default) for consumers
+# that need the whole job, "summary" for dashboards (raw_payload is never listed)
+INGESTED_SUMMARY_FIELDS = (
+    "id",
+    "source_job_id",
+    "title",
+    "company",
+    "location",
+    "remote",
+    "source",
+    "status",
+    "created_at",
+)
+INGESTED_FULL_FIELDS = INGESTED_SUMMARY_FIELDS + (
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "required_skills",
+    "preferred_skills",
+    "years_experience",
+    "employment_type",
+    "description",
+)
+MAX_LIST_LIMIT = 200
+
+
+def _parse_time(value, end_of_day=False):
+    """A datetime query parameter; a bare date means the start (or end) of day."""
+    # parse_datetime also accepts a bare date (as midnight), so try it last
+    day = parse_date(value)
+    if day is not None:
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    else:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def list_ingested_jobs(request):
+    """
+    Ingested jobs, newest first, keyset-paginated on (created_at, id): pass
+    the returned next_cursor as `cursor` for the next page. Filters: status,
+    source, created_after, created_before (ISO dates or datetimes). `fields`
+    is "full" (default, every field) or "summary", which leaves out the
+    description, salary and skills. Each page costs two queries: the page
+    itself and one grouped count of its matches.
+    """
+    params = request.query_params
+    fields = params.get("fields", "full")
+    if fields not in ("summary", "full"):
+        return Response(
+            {"error": "fields must be summary or full"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        limit = min(max(int(params.get("limit", 50)), 1), MAX_LIST_LIMIT)
+        created_after = params.get("created_after")
+        created_before = params.get("created_before")
+        qs = IngestedJob.objects.all()
+        if created_after:
+            qs = qs.filter(created_at__gte=_parse_time(created_after))
+        if created_before:
+            qs = qs.filter(
+                created_at__lte=_parse_time(created_before, end_of_day=True)
+            )
+    except ValueError:
+        return Response(
+            {"error": "limit must be an integer and dates ISO formatted"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if params.get("status"):
+        qs = qs.filter(status=params["status"])
+    if params.get("source"):
+        qs = qs.filter(source=params["source"])
+
+    names = INGESTED_FULL_FIELDS if fields == "full" else INGESTED_SUMMARY_FIELDS
+    try:
+        jobs, next_cursor = keyset_page(
+            qs.values(*names),
+            ("-created_at", "-id"),
+            limit,
+            params.get("cursor"),
+        )
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    match_counts = dict(
+        MatchResult.objects.filter(ingested_job_id__in=[j["id"] for j in jobs])
+        .values("ingested_job_id")
+        .annotate(count=Count("id"))
+        .values_list("ingested_job_id", "count")
+    )
+    for job in jobs:
+        job["match_count"] = match_counts.get(job["id"], 0)
+        job["created_at"] = job["created_at"].isoformat()
+    return Response({"count": len(jobs), "next_cursor": next_cursor, "results": jobs})
+
+
+def _match_page_params(params):
+    """(limit, min_score) query parameters of the match listings."""
+    limit = min(max(int(params.get("limit", 50)), 1), MAX_LIST_LIMIT)
+    min_score = params.get("min_score")
+    return limit, float(min_score) if min_score not in (None, "") else None
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_ingested_job_matches(request, job_id):
+    """
+    Matches of an ingested job, best first, keyset-paginated: pass the
+    returned next_cursor as `cursor` for the next page. `min_score` drops
+    weaker matches.
+    """
     try:
-        job = IngestedJob.objects.get(id=job_id)
+        job = IngestedJob.objects.only("id", "title", "status").get(id=job_id)
     except IngestedJob.DoesNotExist:
         return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    matches = job.matches.all()
+    try:
+        limit, min_score = _match_page_params(request.query_params)
+        matches, next_cursor = keyset_page(
+            job_matches(job.id, min_score),
+            MATCH_ORDERING,
+            limit,
+            request.query_params.get("cursor"),
+        )
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response(
+            {"error": "limit and min_score must be numbers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     return Response(
         {
             "job_id": job.id,
             "title": job.title,
             "status": job.status,
+            "next_cursor": next_cursor,
             "matches": [
                 {
                     "user_id": m.user_id,
@@ -239,7 +430,7 @@ def get_ingested_job_matches(request, job_id):
 def recommend_jobs_for_user(request):
     """
     Recommends ingested jobs to the authenticated user.
-    Uses recommend_jobs() — matches user's profile against all ingested jobs.
+    Same scoring as recommend_jobs(), run over the resident ingested job index.
     """
     user = request.user
     skills_list = list(user.user_skills.values_list("name", flat=True))
@@ -254,16 +445,10 @@ def recommend_jobs_for_user(request):
         "experience": (profile.experience_level or "entry").lower(),
         "location": (profile.location or "").lower(),
         "min_salary": profile.min_salary or 0,
-        "max_salary": [profile.max_salary or 0],
+        "max_salary": profile.max_salary or 0,
     }
 
-    jobs_qs = IngestedJob.objects.filter(status="matched")
-    job_df = _ingested_jobs_to_dataframe(jobs_qs)
-    if job_df.empty:
-        return Response({"recommended_jobs": []})
-
-    matcher = JobAppMatching()
-    recommendations = matcher.recommend_jobs(user_profile, job_df)
+    recommendations = recommend_ingested_jobs(user_profile)
 
     return Response({"recommended_jobs": recommendations})
 
@@ -271,9 +456,26 @@ def recommend_jobs_for_user(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_matched_jobs(request):
-    """Returns all ingested jobs that were matched to the authenticated user."""
-    user = request.user
-    matches = MatchResult.objects.filter(user_id=user.id).select_related("ingested_job")
+    """
+    Ingested jobs matched to the authenticated user, best first,
+    keyset-paginated like get_ingested_job_matches (cursor, limit,
+    min_score).
+    """
+    try:
+        limit, min_score = _match_page_params(request.query_params)
+        matches, next_cursor = keyset_page(
+            user_matches(request.user.id, min_score),
+            MATCH_ORDERING,
+            limit,
+            request.query_params.get("cursor"),
+        )
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response(
+            {"error": "limit and min_score must be numbers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
     results = []
     for m in matches:
@@ -281,21 +483,8 @@ def my_matched_jobs(request):
         results.append({
             "match_id": m.id,
             "match_score": m.match_score,
-            "job": {
-                "id": job.id,
-                "title": job.title,
-                "company": job.company,
-                "location": job.location,
-                "remote": job.remote,
-                "salary_min": job.salary_min,
-                "salary_max": job.salary_max,
-                "salary_currency": job.salary_currency,
-                "required_skills": job.required_skills,
-                "preferred_skills": job.preferred_skills,
-                "years_experience": job.years_experience,
-                "employment_type": job.employment_type,
-            },
-            "matched_at": m.created_at.isoformat() if hasattr(m, "created_at") else None,
+            "job": {name: getattr(job, name) for name in MATCHED_JOB_FIELDS},
+            "matched_at": m.created_at.isoformat(),
         })
 
-    return Response({"matches": results})
+    return Response({"matches": results, "next_cursor": next_cursor})
@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import BoostFeedEntry, BoostJobs, JobPreference
+from .boost_scoring import (
+    BOOST_MIN_SCORE,
+    normalize_boost_score,
+    passes_boost_filters,
+    recommend_boost_jobs,
+    score_boost_job,
+)
+
+
+def feed_size():
+    return getattr(settings, "BOOST_FEED_SIZE", 20)
+
+
+def refresh_boost_feed(pref):
+    """Recompute one user's materialized boost feed from their preferences."""
+    recommendations = recommend_boost_jobs(pref, limit=feed_size())
+    with transaction.atomic():
+        BoostFeedEntry.objects.filter(user_id=pref.user_id).delete()
+        BoostFeedEntry.objects.bulk_create(
+            BoostFeedEntry(user_id=pref.user_id, boost_job=job, score=score)
+            for job, score in recommendations
+        )
+        # update() rather than save(): the feed refresh is not a preference edit
+        JobPreference.objects.filter(pk=pref.pk).update(
+            feed_refreshed_at=timezone.now()
+        )
+    return recommendations
+
+
+def _names_by_preference(through, related, names):
+    """{preference id: the preference's names among `names`} via one query."""
+    matched = {}
+    for pref_id, name in (
+        through.objects.filter(**{f"{related}__name__in": names})
+        .values_list("jobpreference_id", f"{related}__name")
+        .iterator()
+    ):
+        matched.setdefault(pref_id, set()).add(name)
+    return matched
+
+
+def scores_for_boost_job(job):
+    """
+    {user_id: normalized score} for every user with a materialized feed that
+    the job qualifies for. Preferences are read in three queries and only the
+    skill/category names the job actually carries are loaded.
+    """
+    job_skills = set(job.job_skills.values_list("name", flat=True))
+    job_categories = set(job.job_categories.values_list("name", flat=True))
+    skills = _names_by_preference(
+        JobPreference.preferred_skills.through, "jobskills", job_skills
+    )
+    categories = _names_by_preference(
+        JobPreference.preferred_categories.through, "usercategories", job_categories
+    )
+
+    scores = {}
+    for pref in (
+        JobPreference.objects.filter(feed_refreshed_at__isnull=False)
+        .values(
+            "id",
+            "user_id",
+            "preferred_job_types",
+            "preferred_job_nature",
+            "preferred_locations",
+            "preferred_experience",
+            "min_salary",
+            "max_salary",
+        )
+        .iterator()
+    ):
+        terms = {
+            "job_types": set(pref["preferred_job_types"] or []),
+            "job_nature": set(pref["preferred_job_nature"] or []),
+            "locations": {loc.lower() for loc in pref["preferred_locations"] or []},
+            "experience": set(pref["preferred_experience"] or []),
+            "skills": skills.get(pref["id"], set()),
+            "categories": categories.get(pref["id"], set()),
+            "min_salary": pref["min_salary"] or 0,
+            "max_salary": pref["max_salary"] or 0,
+        }
+        if not passes_boost_filters(job, terms):
+            continue
+        score = score_boost_job(job, terms, job_skills, job_categories)
+        if score and normalize_boost_score(score) >= BOOST_MIN_SCORE:
+            scores[pref["user_id"]] = normalize_boost_score(score)
+    return scores
+
+
+def update_feeds_for_boost_job(job):
+    """
+    Re-score a posted or edited BoostJob against every materialized feed and
+    patch only the feeds it enters or leaves. A full feed takes the job only
+    if it beats the feed's lowest entry, which is then dropped.
+    """
+    size = feed_size()
+    scores = scores_for_boost_job(job)
+
+    entries = {}
+    for user_id, entry_id, boost_job_id, score in (
+        BoostFeedEntry.objects.filter(user_id__in=list(scores))
+        .values_list("user_id", "id", "boost_job_id", "score")
+        .iterator()
+    ):
+        entries.setdefault(user_id, []).append((score, -boost_job_id, entry_id))
+
+    created, evicted, updated = [], [], []
+    for user_id, score in scores.items():
+        feed = entries.get(user_id, [])
+        current = [e for e in feed if -e[1] == job.id]
+        if current:
+            updated.append(BoostFeedEntry(id=current[0][2], score=score))
+            continue
+        if len(feed) >= size:
+            lowest = min(feed)
+            if (score, -job.id) <= lowest[:2]:
+                continue
+            evicted.append(lowest[2])
+        created.append(BoostFeedEntry(user_id=user_id, boost_job=job, score=score))
+
+    with transaction.atomic():
+        # Feeds the job no longer qualifies for after an edit
+        BoostFeedEntry.objects.filter(boost_job=job).exclude(
+            user_id__in=list(scores)
+        ).delete()
+        if evicted:
+            BoostFeedEntry.objects.filter(id__in=evicted).delete()
+        if updated:
+            BoostFeedEntry.objects.bulk_update(updated, ["score"])
+        if created:
+            BoostFeedEntry.objects.bulk_create(created, ignore_conflicts=True)
+    return len(created) + len(updated)
+
+
+def boost_feed_for(pref):
+    """
+    The user's feed as [(job, score)], best first: one indexed read of the
+    feed plus one batched BoostJobs fetch. Feeds that were never built, or
+    are older than BOOST_FEED_MAX_AGE, are refreshed first.
+    """
+    max_age = getattr(settings, "BOOST_FEED_MAX_AGE", 86400)
+    refreshed_at = pref.feed_refreshed_at
+    if refreshed_at is None or (
+        max_age and timezone.now() - refreshed_at > timedelta(seconds=max_age)
+    ):
+        return refresh_boost_feed(pref)
+
+    entries = list(
+        BoostFeedEntry.objects.filter(user_id=pref.user_id)
+        .order_by("-score", "boost_job_id")
+        .values_list("boost_job_id", "score")[: feed_size()]
+    )
+    jobs = {
+        job.id: job
+        for job in BoostJobs.objects.filter(
+            id__in=[job_id for job_id, _ in entries]
+        ).prefetch_related("job_skills", "job_categories")
+    }
+    return [(jobs[job_id], score) for job_id, score in entries if job_id in jobs]
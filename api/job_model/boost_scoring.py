@@ -0,0 +1,241 @@
+import heapq
+
+from django.db.models import (
+    Case,
+    Count,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Least, Lower
+
+from ..models import BoostJobs
+
+# Points per preference term; a job matching every term scores BOOST_MAX_SCORE
+BOOST_POINTS = {
+    "job_type": 25,
+    "job_nature": 20,
+    "location": 25,
+    "experience": 20,
+    "salary": 10,
+    "skill": 5,
+    "category": 10,
+}
+BOOST_SKILL_CAP = 30
+BOOST_CATEGORY_CAP = 20
+BOOST_MAX_SCORE = 150
+# Minimum normalized score (0-100) for a job to be recommended
+BOOST_MIN_SCORE = 10
+
+
+def preference_terms(pref):
+    """The preference values the boost score is computed from."""
+    return {
+        "job_types": set(pref.preferred_job_types or []),
+        "job_nature": set(pref.preferred_job_nature or []),
+        "locations": {loc.lower() for loc in pref.preferred_locations or []},
+        "experience": set(pref.preferred_experience or []),
+        "skills": set(pref.preferred_skills.values_list("name", flat=True)),
+        "categories": set(pref.preferred_categories.values_list("name", flat=True)),
+        "min_salary": pref.min_salary or 0,
+        "max_salary": pref.max_salary or 0,
+    }
+
+
+def filtered_boost_jobs(terms):
+    """BoostJobs passing the hard preference filters."""
+    qs = BoostJobs.objects.all()
+    if terms["job_types"]:
+        qs = qs.filter(job_type__in=terms["job_types"])
+    if terms["job_nature"]:
+        qs = qs.filter(job_nature__in=terms["job_nature"])
+    if terms["experience"]:
+        qs = qs.filter(experience_level__in=terms["experience"])
+    if terms["locations"]:
+        qs = qs.filter(location__in=terms["locations"])
+    return qs
+
+
+def passes_boost_filters(job, terms):
+    """Python twin of filtered_boost_jobs for a single job."""
+    return (
+        (not terms["job_types"] or job.job_type in terms["job_types"])
+        and (not terms["job_nature"] or job.job_nature in terms["job_nature"])
+        and (not terms["experience"] or job.experience_level in terms["experience"])
+        and (not terms["locations"] or job.location in terms["locations"])
+    )
+
+
+def score_boost_job(job, terms, job_skills, job_categories):
+    """Raw preference score of one job, given its skill and category names."""
+    score = 0
+    if job.job_type in terms["job_types"]:
+        score += BOOST_POINTS["job_type"]
+    if job.job_nature in terms["job_nature"]:
+        score += BOOST_POINTS["job_nature"]
+    if (job.location or "").lower() in terms["locations"]:
+        score += BOOST_POINTS["location"]
+    if job.experience_level in terms["experience"]:
+        score += BOOST_POINTS["experience"]
+
+    min_salary, max_salary = terms["min_salary"], terms["max_salary"]
+    if job.min_salary and job.max_salary and min_salary and max_salary:
+        if job.min_salary >= min_salary and job.max_salary <= max_salary:
+            score += BOOST_POINTS["salary"]
+
+    score += min(
+        len(job_skills & terms["skills"]) * BOOST_POINTS["skill"], BOOST_SKILL_CAP
+    )
+    score += min(
+        len(job_categories & terms["categories"]) * BOOST_POINTS["category"],
+        BOOST_CATEGORY_CAP,
+    )
+    return score
+
+
+def normalize_boost_score(score):
+    return (score / BOOST_MAX_SCORE) * 100
+
+
+def _points_if(condition, points):
+    return Case(
+        When(condition, then=Value(points)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _overlap_count(through, relation, names):
+    """Correlated subquery: distinct names of `relation` on the job in `names`."""
+    counts = (
+        through.objects.filter(boostjobs_id=OuterRef("pk"))
+        .filter(**{f"{relation}__name__in": names})
+        .order_by()
+        .values("boostjobs_id")
+        .annotate(matched=Count(f"{relation}__name", distinct=True))
+        .values("matched")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def boost_score_expression(terms):
+    """
+    The preference score as a single SQL expression. Empty preference sets
+    contribute nothing, exactly as the set-membership tests they replace.
+    Only portable expressions are used, so it runs on SQLite and Postgres.
+    """
+    parts = []
+    if terms["job_types"]:
+        parts.append(
+            _points_if(Q(job_type__in=terms["job_types"]), BOOST_POINTS["job_type"])
+        )
+    if terms["job_nature"]:
+        parts.append(
+            _points_if(
+                Q(job_nature__in=terms["job_nature"]), BOOST_POINTS["job_nature"]
+            )
+        )
+    if terms["locations"]:
+        parts.append(
+            _points_if(
+                Q(location_lower__in=terms["locations"]), BOOST_POINTS["location"]
+            )
+        )
+    if terms["experience"]:
+        parts.append(
+            _points_if(
+                Q(experience_level__in=terms["experience"]),
+                BOOST_POINTS["experience"],
+            )
+        )
+    if terms["min_salary"] and terms["max_salary"]:
+        parts.append(
+            _points_if(
+                ~Q(min_salary=0)
+                & ~Q(max_salary=0)
+                & Q(min_salary__gte=terms["min_salary"])
+                & Q(max_salary__lte=terms["max_salary"]),
+                BOOST_POINTS["salary"],
+            )
+        )
+    if terms["skills"]:
+        parts.append(
+            Least(
+                _overlap_count(
+                    BoostJobs.job_skills.through, "jobskills", terms["skills"]
+                )
+                * Value(BOOST_POINTS["skill"]),
+                Value(BOOST_SKILL_CAP),
+            )
+        )
+    if terms["categories"]:
+        parts.append(
+            Least(
+                _overlap_count(
+                    BoostJobs.job_categories.through,
+                    "usercategories",
+                    terms["categories"],
+                )
+                * Value(BOOST_POINTS["category"]),
+                Value(BOOST_CATEGORY_CAP),
+            )
+        )
+
+    if not parts:
+        return Value(0, output_field=IntegerField())
+    score = parts[0]
+    for part in parts[1:]:
+        score = score + part
+    return score
+
+
+def recommend_boost_jobs(pref, limit=20):
+    """
+    Top `limit` BoostJobs for a JobPreference as [(job, normalized score)].
+    Scoring, the threshold and ORDER BY/LIMIT all run in the database.
+    """
+    terms = preference_terms(pref)
+    min_raw_score = BOOST_MIN_SCORE * BOOST_MAX_SCORE / 100
+
+    qs = (
+        filtered_boost_jobs(terms)
+        .annotate(location_lower=Lower("location"))
+        .annotate(boost_score=boost_score_expression(terms))
+        .filter(boost_score__gt=0, boost_score__gte=min_raw_score)
+        .order_by("-boost_score", "id")
+        .prefetch_related("job_skills", "job_categories")[:limit]
+    )
+    return [(job, normalize_boost_score(job.boost_score)) for job in qs]
+
+
+def recommend_boost_jobs_python(pref, limit=20):
+    """
+    Reference implementation scoring every filtered job in Python. Kept for
+    benchmark_boost_scoring, which checks both versions agree.
+    """
+    terms = preference_terms(pref)
+    qs = (
+        filtered_boost_jobs(terms)
+        .order_by("id")
+        .prefetch_related("job_skills", "job_categories")
+    )
+
+    scored = []
+    for job in qs:
+        score = score_boost_job(
+            job,
+            terms,
+            {s.name for s in job.job_skills.all()},
+            {c.name for c in job.job_categories.all()},
+        )
+
+        if score:
+            normalized = normalize_boost_score(score)
+            if normalized >= BOOST_MIN_SCORE:
+                scored.append((normalized, job))
+
+    top = heapq.nlargest(limit, scored, key=lambda x: x[0])
+    return [(job, score) for score, job in top]
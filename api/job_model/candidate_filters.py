@@ -0,0 +1,129 @@
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from ..models import Profile
+from .scoring import EXPERIENCE_MAP
+
+# Constraint names accepted by CandidateFilter.for_job and the
+# CANDIDATE_HARD_FILTERS setting
+HARD_FILTERS = ("experience", "years", "salary", "currency", "location", "remote")
+
+
+class CandidateFilter:
+    """
+    Hard constraints on candidates, applied in SQL before any candidate row
+    is loaded. Every constraint is optional; an empty filter matches every
+    candidate.
+
+    - min_experience: lowest accepted experience level, as a level name
+      ("mid") or an EXPERIENCE_MAP ordinal
+    - min_years: lowest accepted years of experience
+    - min_salary / max_salary: the job's salary range; candidates whose
+      expected range does not overlap it are excluded
+    - currency: the candidate's salary currency
+    - location: the candidate's location (case-insensitive, exact)
+    - remote: True keeps candidates open to remote work, False those open
+      to onsite work (hybrid candidates are kept either way)
+
+    Each constraint is backed by an index on Profile (see its Meta).
+    """
+
+    def __init__(
+        self,
+        min_experience=None,
+        min_years=None,
+        min_salary=None,
+        max_salary=None,
+        currency=None,
+        location=None,
+        remote=None,
+    ):
+        if isinstance(min_experience, str):
+            min_experience = EXPERIENCE_MAP.get(min_experience.strip().lower())
+        self.min_experience = min_experience
+        self.min_years = min_years
+        self.min_salary = min_salary
+        self.max_salary = max_salary
+        self.currency = currency or None
+        self.location = (location or "").strip().lower() or None
+        self.remote = remote
+
+    @classmethod
+    def for_job(cls, job_profile, constraints):
+        """
+        The filter enforcing `constraints` (names from HARD_FILTERS) of a
+        recommend_users job profile; the others stay soft, scored only.
+        """
+        unknown = set(constraints) - set(HARD_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown candidate filters: {sorted(unknown)}")
+        remote = job_profile.get("remote")
+        if remote is None and job_profile.get("employment_type"):
+            remote = job_profile["employment_type"] == "R"
+
+        def hard(name, field):
+            return job_profile.get(field) if name in constraints else None
+
+        return cls(
+            min_experience=hard("experience", "experience_level"),
+            min_years=hard("years", "years_of_experience"),
+            min_salary=hard("salary", "min_salary"),
+            max_salary=hard("salary", "max_salary"),
+            currency=hard("currency", "currency_type"),
+            # A remote job is open to candidates anywhere
+            location=None if remote else hard("location", "location"),
+            remote=remote if "remote" in constraints else None,
+        )
+
+    def __bool__(self):
+        return any(
+            value is not None
+            for value in (
+                self.min_experience,
+                self.min_years,
+                self.min_salary,
+                self.max_salary,
+                self.currency,
+                self.location,
+                self.remote,
+            )
+        )
+
+    def profile_q(self, prefix=""):
+        """The constraints as a Q over Profile fields, with `prefix` prepended."""
+        q = Q()
+        if self.min_experience is not None:
+            levels = [
+                level
+                for level in Profile.ExperienceLevel.values
+                if EXPERIENCE_MAP.get(level.lower(), 0) >= self.min_experience
+            ]
+            q &= Q(**{f"{prefix}experience_level__in": levels})
+        if self.min_years:
+            q &= Q(**{f"{prefix}years_of_experience__gte": self.min_years})
+        if self.max_salary:
+            q &= Q(**{f"{prefix}min_salary__lte": self.max_salary})
+        if self.min_salary:
+            q &= Q(**{f"{prefix}max_salary__gte": self.min_salary})
+        if self.currency:
+            q &= Q(**{f"{prefix}currency": self.currency})
+        if self.remote is not None:
+            accepted = [
+                Profile.JobLocationChoices.REMOTE
+                if self.remote
+                else Profile.JobLocationChoices.ONSITE,
+                Profile.JobLocationChoices.HYBRID,
+            ]
+            q &= Q(**{f"{prefix}job_location__in": accepted})
+        return q
+
+    def apply(self, users):
+        """Filter a User queryset down to the candidates meeting the constraints."""
+        users = users.filter(self.profile_q("profile__"))
+        if self.location:
+            # Compared as lower(location) so profile_location_lower_idx is used
+            # (iexact compiles to UPPER() on PostgreSQL)
+            users = users.alias(profile_location=Lower("profile__location")).filter(
+                profile_location=self.location
+            )
+        return users
@@ -0,0 +1,723 @@
+import sys
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import Profile, User, UserSkills
+from .posting_index import PostingListIndex, split_terms
+from .shared_cache import warn_if_process_local
+from .snapshots import current_snapshot
+
+# Shared version stamp. Every worker that changes a candidate bumps it, so other
+# workers can tell their snapshot is stale (requires a shared cache backend).
+CANDIDATE_INDEX_VERSION_KEY = "candidate_index_version"
+# User ids changed by each version bump, so a worker (or an index loaded from
+# an on-disk snapshot) can replay the changes it missed instead of rebuilding
+CANDIDATE_CHANGES_KEY = "candidate_index_changes:{version}"
+# Beyond this many missed versions a rebuild is cheaper than the replay
+MAX_REPLAYED_VERSIONS = 1000
+# Incremental updates an index remembers for changed_since; derived
+# structures further behind than that are rebuilt instead of patched
+MAX_CHANGELOG_ENTRIES = 1000
+
+# Field order of the row tuples returned by fetch_candidate_rows
+COLUMNS = [
+    "user_id",
+    "user_name",
+    "skills",
+    "experience_level",
+    "years_of_experience",
+    "location",
+    "job_location",
+    "min_salary",
+    "max_salary",
+    "currency_type",
+    "categories",
+]
+
+# Stored as int32 arrays
+INT_COLUMNS = ("years_of_experience", "min_salary", "max_salary")
+# Low-cardinality strings, stored as int32 codes into a CodeBook
+CODED_COLUMNS = ("experience_level", "location", "job_location", "currency_type")
+# Delimited columns, stored as term ids in CSR layout (TermLists) and indexed
+# in an inverted posting-list index
+POSTING_COLUMNS = ("skills", "categories")
+
+
+def _shared_version():
+    cache.add(CANDIDATE_INDEX_VERSION_KEY, 0, timeout=None)
+    return cache.get(CANDIDATE_INDEX_VERSION_KEY, 0)
+
+
+def _bump_shared_version():
+    try:
+        return cache.incr(CANDIDATE_INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(CANDIDATE_INDEX_VERSION_KEY, 1, timeout=None)
+        return 1
+
+
+def _publish_changes(user_ids):
+    """Bump the shared version and log which users it covers."""
+    version = _bump_shared_version()
+    cache.set(
+        CANDIDATE_CHANGES_KEY.format(version=version),
+        sorted(user_ids),
+        timeout=getattr(settings, "CANDIDATE_CHANGELOG_TTL", 86400),
+    )
+    return version
+
+
+def _changes_between(old_version, new_version):
+    """
+    Ids of the users changed by versions (old_version, new_version], or None
+    if the log does not cover all of them (expired, or a full invalidation).
+    """
+    if new_version == old_version:
+        return set()
+    if not 0 < new_version - old_version <= MAX_REPLAYED_VERSIONS:
+        return None
+    keys = [
+        CANDIDATE_CHANGES_KEY.format(version=version)
+        for version in range(old_version + 1, new_version + 1)
+    ]
+    logged = cache.get_many(keys)
+    if len(logged) != len(keys):
+        return None
+    return set().union(*logged.values())
+
+
+def fetch_candidate_rows(user_ids=None):
+    """
+    Load candidate rows from the database with a constant number of queries.
+    Returns a dict of user_id -> row tuple ordered like COLUMNS.
+    """
+    users = User.objects.filter(company=False)
+    skills = UserSkills.objects.filter(user__company=False)
+    categories = Profile.categories.through.objects.filter(
+        profile__user__company=False
+    )
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+        skills = skills.filter(user_id__in=user_ids)
+        categories = categories.filter(profile__user_id__in=user_ids)
+
+    skills_by_user = {}
+    for user_id, name in skills.values_list("user_id", "name").iterator():
+        skills_by_user.setdefault(user_id, set()).add(name)
+
+    categories_by_user = {}
+    for user_id, name in categories.values_list(
+        "profile__user_id", "usercategories__name"
+    ).iterator():
+        categories_by_user.setdefault(user_id, set()).add(name)
+
+    rows = {}
+    for user in (
+        users.order_by("id")
+        .values(
+            "id",
+            "first_name",
+            "last_name",
+            "profile__experience_level",
+            "profile__years_of_experience",
+            "profile__location",
+            "profile__job_location",
+            "profile__min_salary",
+            "profile__max_salary",
+            "profile__currency",
+        )
+        .iterator()
+    ):
+        user_id = user["id"]
+        rows[user_id] = (
+            user_id,
+            f"{user['first_name']} {user['last_name']}",
+            ";".join(sorted(skills_by_user.get(user_id, ()))),
+            (user["profile__experience_level"] or "").lower(),
+            user["profile__years_of_experience"] or 0,
+            (user["profile__location"] or "").lower(),
+            (user["profile__job_location"] or "").lower(),
+            user["profile__min_salary"] or 0,
+            user["profile__max_salary"] or 0,
+            user["profile__currency"] or "",
+            ";".join(sorted(categories_by_user.get(user_id, ()))),
+        )
+    return rows
+
+
+class CodeBook:
+    """Maps string values to stable integer codes and back."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        return np.fromiter(
+            (self.code(v) for v in values), dtype=np.int32, count=len(values)
+        )
+
+    def lookup(self, value):
+        """Code of `value`, or -1 if it was never seen."""
+        return self.codes.get(value, -1)
+
+    def matching(self, predicate):
+        """Codes of every value satisfying `predicate`."""
+        return np.array(
+            [code for code, value in enumerate(self.values) if predicate(value)],
+            dtype=np.int32,
+        )
+
+    def decode(self, codes):
+        values = self.values
+        return [values[code] for code in codes]
+
+
+class TermLists:
+    """
+    Each row's terms as int32 ids into `vocabulary`, in CSR layout: row r's
+    terms are ids[indptr[r]:indptr[r + 1]], in the order of its document.
+    """
+
+    def __init__(self, documents=()):
+        self.vocabulary = CodeBook()
+        lists = [self.encode(document) for document in documents]
+        self.indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+        self.indptr[1:] = np.cumsum([len(ids) for ids in lists], dtype=np.int64)
+        self.ids = (
+            np.concatenate(lists).astype(np.int32)
+            if lists
+            else np.empty(0, dtype=np.int32)
+        )
+
+    @classmethod
+    def from_arrays(cls, vocabulary, indptr, ids):
+        terms = cls()
+        terms.vocabulary = CodeBook(vocabulary)
+        terms.indptr, terms.ids = indptr, ids
+        return terms
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def encode(self, document):
+        return self.vocabulary.encode([t for t in document.split(";") if t])
+
+    def lengths(self):
+        return np.diff(self.indptr)
+
+    def document(self, row):
+        ids = self.ids[self.indptr[row] : self.indptr[row + 1]]
+        return ";".join(self.vocabulary.decode(ids))
+
+    def documents(self, rows):
+        return [self.document(row) for row in rows]
+
+    def replace(self, documents, n_rows):
+        """
+        Set the documents of the rows in `documents` ({row: document}) and
+        grow to `n_rows` rows, rewriting the CSR arrays in one pass.
+        """
+        old_lengths = self.lengths()
+        lengths = np.zeros(n_rows, dtype=np.int64)
+        lengths[: len(old_lengths)] = old_lengths
+        kept = np.zeros(n_rows, dtype=bool)
+        kept[: len(old_lengths)] = True
+
+        encoded = {row: self.encode(document) for row, document in documents.items()}
+        for row, ids in encoded.items():
+            lengths[row] = len(ids)
+            kept[row] = False
+
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(lengths)
+        ids = np.empty(indptr[-1], dtype=np.int32)
+        # Untouched rows keep their order and lengths, so one masked copy
+        # moves all of them
+        ids[np.repeat(kept, lengths)] = self.ids[
+            np.repeat(kept[: len(old_lengths)], old_lengths)
+        ]
+        for row, row_ids in encoded.items():
+            ids[indptr[row] : indptr[row + 1]] = row_ids
+        self.indptr, self.ids = indptr, ids
+
+    def nbytes(self):
+        return self.indptr.nbytes + self.ids.nbytes + _strings_nbytes(
+            self.vocabulary.values
+        )
+
+
+def _strings_nbytes(values):
+    """Approximate heap size of a list of strings, pointers included."""
+    return sum(sys.getsizeof(value) + 8 for value in values)
+
+
+class PackedStrings:
+    """
+    Strings packed into one utf-8 byte array with int64 offsets, so they can
+    be written to and memory-mapped from a snapshot. Rows set afterwards are
+    kept in a small `overlay` dict until the strings are packed again.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self.overlay = {}
+        self.length = len(offsets) - 1
+
+    @classmethod
+    def from_strings(cls, values):
+        encoded = [value.encode() for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return self.length
+
+    def get(self, row):
+        value = self.overlay.get(row)
+        if value is None:
+            start, end = self.offsets[row], self.offsets[row + 1]
+            value = self.blob[start:end].tobytes().decode()
+        return value
+
+    def take(self, rows):
+        return [self.get(row) for row in rows]
+
+    def set(self, row, value):
+        self.overlay[int(row)] = value
+        self.length = max(self.length, int(row) + 1)
+
+    def packed(self):
+        """(blob, offsets) with the overlay folded in."""
+        if not self.overlay:
+            return self.blob, self.offsets
+        repacked = PackedStrings.from_strings(self.take(range(self.length)))
+        return repacked.blob, repacked.offsets
+
+    def nbytes(self):
+        return (
+            self.blob.nbytes
+            + self.offsets.nbytes
+            + _strings_nbytes(self.overlay.values())
+        )
+
+
+class CandidateIndex:
+    """
+    Process-resident, compact snapshot of every candidate (non-company user):
+    int32 numeric columns, int32 codes for low-cardinality strings (see
+    CodeBook), skills and categories as term ids in CSR layout (TermLists)
+    plus posting lists for term lookups, and user names packed as utf-8.
+
+    Rows are kept sorted by user_id. Removed users are masked out through
+    `alive` instead of being deleted, so row positions stay stable until the
+    next full rebuild.
+
+    Every array can be written to an on-disk snapshot (to_snapshot) and
+    memory-mapped back (from_snapshot); mapped arrays are read-only and are
+    copied the first time an incremental update writes to them.
+    """
+
+    def __init__(self, rows, shared_version=0):
+        ordered = [rows[user_id] for user_id in sorted(rows)]
+        values = {
+            name: [row[position] for row in ordered]
+            for position, name in enumerate(COLUMNS)
+        }
+        self.columns = {"user_id": np.array(values["user_id"], dtype=np.int64)}
+        for name in INT_COLUMNS:
+            self.columns[name] = np.array(values[name], dtype=np.int32)
+        self.codes = {name: CodeBook() for name in CODED_COLUMNS}
+        for name in CODED_COLUMNS:
+            self.columns[name] = self.codes[name].encode(values[name])
+        self.names = PackedStrings.from_strings(values["user_name"])
+        self.terms = {name: TermLists(values[name]) for name in POSTING_COLUMNS}
+
+        self.alive = np.ones(len(ordered), dtype=bool)
+        self.postings = {
+            name: PostingListIndex.from_documents(
+                self.columns["user_id"], values[name]
+            )
+            for name in POSTING_COLUMNS
+        }
+        self.version = shared_version
+        # (version, positions) for each incremental update, so derived
+        # structures can patch only the rows that changed
+        self.changelog = []
+        # changed_since is complete for versions from this one on
+        self.changelog_start = shared_version
+        # Positions patched while behind the shared version, logged on the
+        # next catch_up
+        self.unlogged = set()
+        self.built_at = time.monotonic()
+        # The on-disk snapshot this index was loaded from, if any, and the
+        # newest one published when it was loaded or built
+        self.snapshot = None
+        self.snapshot_name = None
+
+    @classmethod
+    def build(cls):
+        shared_version = _shared_version()
+        return cls(fetch_candidate_rows(), shared_version)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """An index over the memory-mapped arrays of `snapshot`."""
+        meta = snapshot.meta
+        index = cls.__new__(cls)
+        index.columns = {
+            name: snapshot.array(f"column-{name}")
+            for name in ("user_id", *INT_COLUMNS, *CODED_COLUMNS)
+        }
+        index.codes = {name: CodeBook(meta["codes"][name]) for name in CODED_COLUMNS}
+        index.names = PackedStrings(
+            snapshot.array("names-blob"), snapshot.array("names-offsets")
+        )
+        index.terms = {
+            name: TermLists.from_arrays(
+                meta["vocabularies"][name],
+                snapshot.array(f"terms-{name}-indptr"),
+                snapshot.array(f"terms-{name}-ids"),
+            )
+            for name in POSTING_COLUMNS
+        }
+        index.postings = {
+            name: PostingListIndex.from_csr(
+                meta["posting_terms"][name],
+                snapshot.array(f"postings-{name}-indptr"),
+                snapshot.array(f"postings-{name}-ids"),
+            )
+            for name in POSTING_COLUMNS
+        }
+        # Small and flipped on every removal, so kept private
+        index.alive = np.array(snapshot.array("alive"))
+        index.version = snapshot.version
+        index.changelog = []
+        index.changelog_start = snapshot.version
+        index.unlogged = set()
+        index.built_at = time.monotonic()
+        index.snapshot = snapshot
+        index.snapshot_name = snapshot.name
+        return index
+
+    def to_snapshot(self):
+        """(arrays, meta) to pass to snapshots.write_snapshot."""
+        arrays = {f"column-{name}": column for name, column in self.columns.items()}
+        arrays["alive"] = self.alive
+        arrays["names-blob"], arrays["names-offsets"] = self.names.packed()
+        meta = {
+            "version": self.version,
+            "rows": len(self.user_ids),
+            "codes": {name: self.codes[name].values for name in CODED_COLUMNS},
+            "vocabularies": {},
+            "posting_terms": {},
+        }
+        for name in POSTING_COLUMNS:
+            terms = self.terms[name]
+            arrays[f"terms-{name}-indptr"] = terms.indptr
+            arrays[f"terms-{name}-ids"] = terms.ids
+            meta["vocabularies"][name] = terms.vocabulary.values
+
+            posting_terms, indptr, ids = self.postings[name].to_csr()
+            arrays[f"postings-{name}-indptr"] = indptr
+            arrays[f"postings-{name}-ids"] = ids
+            meta["posting_terms"][name] = posting_terms
+        return arrays, meta
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    @property
+    def empty(self):
+        return not self.alive.any()
+
+    @property
+    def user_ids(self):
+        return self.columns["user_id"]
+
+    def live_rows(self):
+        return np.flatnonzero(self.alive)
+
+    def has_terms(self, name):
+        """Whether any live candidate has at least one `name` term."""
+        return bool((self.alive & (self.terms[name].lengths() > 0)).any())
+
+    def row_of(self, user_id):
+        """Row position of a user id, or None if the user is not indexed."""
+        ids = self.user_ids
+        position = int(np.searchsorted(ids, user_id))
+        if position < len(ids) and ids[position] == user_id:
+            return position
+        return None
+
+    def values(self, name, rows):
+        """Python values of column `name` at `rows`, decoded where needed."""
+        if name == "user_name":
+            return self.names.take(rows)
+        if name in POSTING_COLUMNS:
+            return self.terms[name].documents(rows)
+        if name in CODED_COLUMNS:
+            return self.codes[name].decode(self.columns[name][rows])
+        return self.columns[name][rows].tolist()
+
+    def documents(self, name, rows=None):
+        """`name` documents ("a;b") of `rows` (default: every row)."""
+        if rows is None:
+            rows = range(len(self.user_ids))
+        return self.terms[name].documents(rows)
+
+    def expired(self):
+        max_age = getattr(settings, "CANDIDATE_INDEX_MAX_AGE", 300)
+        return bool(max_age) and time.monotonic() - self.built_at > max_age
+
+    def is_stale(self, shared_version):
+        return self.expired() or shared_version != self.version
+
+    def catch_up(self, shared_version):
+        """
+        Replay the logged changes between this index's version and
+        `shared_version`. Returns False if they can't be replayed and the
+        index has to be rebuilt instead.
+        """
+        user_ids = _changes_between(self.version, shared_version)
+        if user_ids is None:
+            return False
+        changed = []
+        if user_ids:
+            changed = self.apply(user_ids, fetch_candidate_rows(user_ids))
+        if changed is None:
+            return False
+        self.version = shared_version
+        changed = sorted(self.unlogged.union(changed))
+        self.unlogged.clear()
+        if changed:
+            self.log_changes(shared_version, changed)
+        return True
+
+    def _row_tuple(self, position):
+        return tuple(self.values(name, [position])[0] for name in COLUMNS)
+
+    def _update_postings(self, user_id, old_row, new_row):
+        for name in POSTING_COLUMNS:
+            position = COLUMNS.index(name)
+            old_terms = split_terms(old_row[position]) if old_row else set()
+            new_terms = split_terms(new_row[position]) if new_row else set()
+            self.postings[name].update(user_id, old_terms, new_terms)
+
+    def _writable(self, name):
+        column = self.columns[name]
+        if not column.flags.writeable:
+            # Memory-mapped from a snapshot; this worker gets a private copy
+            column = self.columns[name] = np.array(column)
+        return column
+
+    def _set_row(self, position, row):
+        values = dict(zip(COLUMNS, row))
+        for name in INT_COLUMNS:
+            self._writable(name)[position] = values[name]
+        for name in CODED_COLUMNS:
+            self._writable(name)[position] = self.codes[name].code(values[name])
+        self.names.set(position, values["user_name"])
+
+    def _append(self, row):
+        for name, column in self.columns.items():
+            self.columns[name] = np.append(column, np.zeros(1, dtype=column.dtype))
+        self.columns["user_id"][-1] = row[0]
+        self.alive = np.append(self.alive, True)
+        self._set_row(len(self.alive) - 1, row)
+
+    def apply(self, user_ids, rows):
+        """
+        Apply fresh rows for `user_ids`. Ids missing from `rows` are removed.
+        Returns the row positions that actually changed, or None if the index
+        has to be rebuilt instead.
+        """
+        changed = []
+        documents = {name: {} for name in POSTING_COLUMNS}
+        for user_id in sorted(user_ids):
+            row = rows.get(user_id)
+            position = self.row_of(user_id)
+
+            if row is None:
+                if position is not None and self.alive[position]:
+                    self._update_postings(user_id, self._row_tuple(position), None)
+                    self.alive[position] = False
+                    changed.append(position)
+                continue
+
+            if position is None:
+                if len(self.user_ids) and user_id < self.user_ids[-1]:
+                    # Out of order insert; cheaper to rebuild than to shift rows
+                    return None
+                self._append(row)
+                self._update_postings(user_id, None, row)
+                position = len(self.user_ids) - 1
+            else:
+                old_row = self._row_tuple(position) if self.alive[position] else None
+                if old_row == row:
+                    continue
+                self._update_postings(user_id, old_row, row)
+                self._set_row(position, row)
+                self.alive[position] = True
+
+            for name in POSTING_COLUMNS:
+                documents[name][position] = row[COLUMNS.index(name)]
+            changed.append(position)
+
+        for name, updates in documents.items():
+            if updates or len(self.terms[name]) != len(self.user_ids):
+                self.terms[name].replace(updates, len(self.user_ids))
+        return changed
+
+    def log_changes(self, version, positions):
+        """Record the rows changed by `version`, forgetting the oldest entries."""
+        self.changelog.append((version, np.array(positions, dtype=np.int64)))
+        if len(self.changelog) > MAX_CHANGELOG_ENTRIES:
+            dropped = self.changelog[:-MAX_CHANGELOG_ENTRIES]
+            del self.changelog[:-MAX_CHANGELOG_ENTRIES]
+            self.changelog_start = dropped[-1][0]
+
+    def changed_since(self, version):
+        """
+        Row positions touched by updates newer than `version`, or None if
+        they are no longer all logged and the caller has to rebuild.
+        """
+        if version < self.changelog_start:
+            return None
+        positions = []
+        for logged_version, logged in reversed(self.changelog):
+            if logged_version <= version:
+                break
+            positions.append(logged)
+        if not positions:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(positions))
+
+    def memory_usage(self):
+        """Approximate bytes held per component, and scaled per 100k rows."""
+        usage = {
+            f"column:{name}": column.nbytes for name, column in self.columns.items()
+        }
+        usage["alive"] = self.alive.nbytes
+        usage["names"] = self.names.nbytes()
+        for name in CODED_COLUMNS:
+            usage[f"codes:{name}"] = _strings_nbytes(self.codes[name].values)
+        for name in POSTING_COLUMNS:
+            usage[f"terms:{name}"] = self.terms[name].nbytes()
+            usage[f"postings:{name}"] = self.postings[name].nbytes()
+        total = sum(usage.values())
+        rows = max(1, len(self.user_ids))
+        return {
+            "rows": len(self.user_ids),
+            "total_bytes": total,
+            "bytes_per_100k": total * 100_000 // rows,
+            "components": usage,
+        }
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def resident_index_for(user_data):
+    """`user_data` if it is this worker's resident index, else None."""
+    index = _index
+    if index is not None and index is user_data:
+        return index
+    return None
+
+
+def get_candidate_index():
+    """
+    Return this worker's candidate index. A stale index replays the logged
+    changes it missed; failing that, the newest on-disk snapshot is mapped
+    (plus the changes made since it was written), and only without one is
+    the index rebuilt from the database.
+    """
+    global _index
+    shared_version = _shared_version()
+    with _lock:
+        snapshot = current_snapshot()
+        index = _index
+        if snapshot is not None and index is not None:
+            if index.snapshot_name != snapshot.name:
+                # A newer snapshot was published; move to the shared copy
+                index = None
+
+        if index is not None:
+            if not index.is_stale(shared_version):
+                return index
+            if not index.expired() and index.catch_up(shared_version):
+                return index
+
+        if snapshot is not None:
+            index = CandidateIndex.from_snapshot(snapshot)
+            if index.catch_up(shared_version):
+                _index = index
+                return index
+
+        # No snapshot, or its changes are no longer in the log
+        warn_if_process_local("Candidate index")
+        _index = CandidateIndex.build()
+        _index.snapshot_name = snapshot.name if snapshot is not None else None
+        return _index
+
+
+def invalidate_candidate_index():
+    """Drop every worker's index, e.g. after bulk inserts that bypass signals."""
+    global _index
+    with _lock:
+        _index = None
+        _bump_shared_version()
+
+
+def refresh_candidates(user_ids):
+    """
+    Re-read the given users and patch them into the resident index.
+    Called from signals after the surrounding transaction commits.
+    """
+    global _index
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    with _lock:
+        if _index is None:
+            _publish_changes(user_ids)
+            return
+
+        stale = _shared_version() != _index.version
+        changed = _index.apply(user_ids, fetch_candidate_rows(user_ids))
+        if changed is None:
+            _index = None
+            _publish_changes(user_ids)
+            return
+        if not changed and not stale:
+            return
+
+        new_version = _publish_changes(user_ids)
+        if new_version == _index.version + 1:
+            # Nobody else changed anything in between; stay current
+            _index.version = new_version
+            if changed:
+                _index.log_changes(new_version, changed)
+        else:
+            # Behind the shared version: the next catch_up logs these rows
+            # with the versions it replays, so the scorer still re-syncs them
+            _index.unlogged.update(changed)
@@ -1,151 +1,234 @@
+import logging
+
+import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from django.shortcuts import get_object_or_404
-from ..models import Jobs, JobSkills, User, UserCategories, UserSkills, Profile
-from ..serializer import JobSerializer, ProfileSerializer, UserSerializer
+
+from ..models import Jobs, Profile
+
+logger = logging.getLogger(__name__)
+
+# Profile fields read for every user row
+PROFILE_FIELDS = ("id", "user_id", "min_salary", "max_salary", "years_of_experience")
+USER_COLUMNS = ["id", "skills", "category", "min_salary", "max_salary", "experience"]
+
+
+def _names_by_profile(links):
+    """{profile id: "name name ..."} from (profile id, name) pairs."""
+    names = {}
+    for profile_id, name in links.iterator():
+        names.setdefault(profile_id, []).append(name)
+    return {
+        profile_id: " ".join(sorted(values)) for profile_id, values in names.items()
+    }
+
+
+def user_frame(profiles, restrict=True):
+    """
+    User rows for `profiles` (Profile value dicts with PROFILE_FIELDS) with
+    two more queries, one for all skills and one for all categories. With
+    `restrict` the queries are limited to these profiles; without it every
+    link is read, which is cheaper when `profiles` is the whole table.
+    """
+    skill_links = Profile.skills.through.objects.all()
+    category_links = Profile.categories.through.objects.all()
+    if restrict:
+        profile_ids = [profile["id"] for profile in profiles]
+        skill_links = skill_links.filter(profile_id__in=profile_ids)
+        category_links = category_links.filter(profile_id__in=profile_ids)
+    skills = _names_by_profile(
+        skill_links.values_list("profile_id", "userskills__name")
+    )
+    categories = _names_by_profile(
+        category_links.values_list("profile_id", "usercategories__name")
+    )
+
+    def column(field):
+        return np.fromiter(
+            (profile[field] or 0 for profile in profiles),
+            dtype=np.int64,
+            count=len(profiles),
+        )
+
+    return pd.DataFrame(
+        {
+            "id": column("user_id"),
+            "skills": [skills.get(profile["id"], "") for profile in profiles],
+            "category": [categories.get(profile["id"], "") for profile in profiles],
+            "min_salary": column("min_salary"),
+            "max_salary": column("max_salary"),
+            "experience": column("years_of_experience"),
+        },
+        columns=USER_COLUMNS,
+    )
+
+
+def iter_user_frames(chunk_size=5000):
+    """
+    User rows in DataFrames of at most `chunk_size` rows. Profiles stream
+    through a server-side cursor (on PostgreSQL) and each chunk costs two
+    more queries, so memory stays flat however many users there are.
+    """
+    chunk = []
+    profiles = Profile.objects.order_by("id").values(*PROFILE_FIELDS)
+    for profile in profiles.iterator(chunk_size=chunk_size):
+        chunk.append(profile)
+        if len(chunk) == chunk_size:
+            yield user_frame(chunk)
+            chunk = []
+    if chunk:
+        yield user_frame(chunk)
+
 
 class DataPreprocessor:
+    """
+    Rule-based job/user matching: experience, category and salary matches
+    are counted per user, all as vectorized column operations. Loading is a
+    constant number of queries (load_data), or a constant number per chunk
+    (iter_matching_scores).
+    """
+
     def __init__(self):
         self.job_posting = None
         self.user_profiles = None
         self.vectorizer = TfidfVectorizer()
 
+    def load_job(self, job_id):
+        """The job as a one-row DataFrame (three queries)."""
+        job = Jobs.objects.prefetch_related("skills", "categories").get(id=job_id)
+        # Jobs only state a minimum number of years, so there is no upper bound
+        self.job_posting = pd.DataFrame(
+            [
+                {
+                    "id": job.id,
+                    "description": job.description or "",
+                    "skills": " ".join(sorted(s.name for s in job.skills.all())),
+                    "category": " ".join(sorted(c.name for c in job.categories.all())),
+                    "min_salary": job.min_salary,
+                    "max_salary": job.max_salary,
+                    "min_experience": job.years_of_experience or 0,
+                    "max_experience": np.inf,
+                }
+            ]
+        )
+        return self.job_posting
+
     def load_data(self, job_id):
-        # Query only the specific job using job_id
-        job = Jobs.objects.get(id=job_id)
-        job_data = [{
-            'id': job.id,
-            'description': job.description,
-            'skills': ' '.join(list(job.skills.values_list('name', flat=True))),
-            'category': ' '.join([cat for cat in [job.categories] if cat]),
-            'min_salary': job.min_salary,
-            'max_salary': job.max_salary,
-            'min_experience': job.min_experience,
-            'max_experience': job.max_experience,
-        }]
-        print(f"List of Job Data \n {job_data}")
-        
-        profiles = Profile.objects.all()
-        
-        
-        user_data = []
-        for profile in profiles:
-            try:    
-                user_data.append({
-                    'id': profile.user.id,
-                    'skills': ' '.join(profile.skills.values_list('name', flat=True)),
-                    'category': ' '.join(profile.categories.values_list('name', flat=True)),
-                    'min_salary': profile.min_salary,
-                    'max_salary': profile.max_salary,
-                    'experience': profile.experience,
-                })
-
-            except:
-                print(f"No profile found for user {profile.user.id}")
-        
-        self.job_posting = pd.DataFrame(job_data)
-        self.user_profiles = pd.DataFrame(user_data)
-        
+        self.load_job(job_id)
+        profiles = list(Profile.objects.order_by("id").values(*PROFILE_FIELDS))
+        self.user_profiles = user_frame(profiles, restrict=False)
         return self.job_posting, self.user_profiles
 
     def preprocess_data(self):
-        print(self.job_posting.columns)
-        print(self.user_profiles.columns)
-        # Verify DataFrames exist and have required columns
-        if not hasattr(self, 'job_posting') or not hasattr(self, 'user_profiles'):
+        if self.job_posting is None or self.user_profiles is None:
             raise ValueError("Data not loaded. Call load_data() first.")
-            
+
         required_columns = {
-            'job_posting': ['description', 'skills', 'category'],
-            'user_profiles': ['skills', 'category']
+            "job_posting": ["description", "skills", "category"],
+            "user_profiles": ["skills", "category"],
         }
-        
         for df_name, columns in required_columns.items():
             df = getattr(self, df_name)
             missing_cols = [col for col in columns if col not in df.columns]
             if missing_cols:
-                raise ValueError(f"Missing required columns in {df_name}: {missing_cols}")
-
-        # Process text columns
-        text_columns = ['skills', 'category']
-        
-        # Process job posting
-        for col in text_columns:
-            self.job_posting[col] = self.job_posting[col].apply(
-                lambda x: ' '.join(x) if isinstance(x, list) else str(x)
-            ).fillna('')
-            
-        # Process user profiles
-        for col in text_columns:
-            self.user_profiles[col] = self.user_profiles[col].apply(
-                lambda x: ' '.join(x) if isinstance(x, list) else str(x)
-            ).fillna('')
-
-        # Create combined features
-        self.job_posting['combined'] = (
-            self.job_posting['description'] + ' ' +
-            self.job_posting['skills'] + ' ' +
-            self.job_posting['category']
-        ).str.lower()  # Convert to lowercase for better matching
-        
-        self.user_profiles['combined'] = (
-            self.user_profiles['skills'] + ' ' +
-            self.user_profiles['category']
-        ).str.lower()  # Convert to lowercase for better matching
-        
-        # Debug information
-        print("Job Posting Shape:", self.job_posting.shape)
-        print("User Profiles Shape:", self.user_profiles.shape)
-        
-        # Create TF-IDF matrices
+                raise ValueError(
+                    f"Missing required columns in {df_name}: {missing_cols}"
+                )
+
+        for df in (self.job_posting, self.user_profiles):
+            for col in ("skills", "category"):
+                df[col] = df[col].fillna("").astype(str)
+
+        self.job_posting["combined"] = (
+            self.job_posting["description"]
+            + " "
+            + self.job_posting["skills"]
+            + " "
+            + self.job_posting["category"]
+        ).str.lower()
+        self.user_profiles["combined"] = (
+            self.user_profiles["skills"] + " " + self.user_profiles["category"]
+        ).str.lower()
+        logger.debug(
+            "Job posting %s, user profiles %s",
+            self.job_posting.shape,
+            self.user_profiles.shape,
+        )
+
         try:
-            self.job_tfidf_matrix = self.vectorizer.fit_transform(self.job_posting['combined'])
-            self.user_tfidf_matrix = self.vectorizer.transform(self.user_profiles['combined'])
+            self.job_tfidf_matrix = self.vectorizer.fit_transform(
+                self.job_posting["combined"]
+            )
+            self.user_tfidf_matrix = self.vectorizer.transform(
+                self.user_profiles["combined"]
+            )
         except Exception as e:
             raise ValueError(f"Error creating TF-IDF matrices: {str(e)}")
-        
+
     def get_feature_matrices(self):
         return self.user_tfidf_matrix, self.job_tfidf_matrix
 
     def match_experience(self):
-        job_min_exp = self.job_posting['min_experience'].iloc[0]
-        job_max_exp = self.job_posting['max_experience'].iloc[0]
-        self.user_profiles['exp_match'] = self.user_profiles['experience'].apply(
-            lambda x: job_min_exp <= x <= job_max_exp
+        job_min_exp = self.job_posting["min_experience"].iloc[0]
+        job_max_exp = self.job_posting["max_experience"].iloc[0]
+        experience = self.user_profiles["experience"]
+        self.user_profiles["exp_match"] = (experience >= job_min_exp) & (
+            experience <= job_max_exp
         )
 
     def match_category(self):
-        job_categories = set(self.job_posting['category'].iloc[0].split())
-        self.user_profiles['category_match'] = self.user_profiles['category'].apply(
-            lambda x: bool(set(x.split()) & job_categories)
+        job_categories = set(self.job_posting["category"].iloc[0].split())
+        # One row per (user, category word); a user matches if any word does
+        words = self.user_profiles["category"].str.split().explode()
+        self.user_profiles["category_match"] = (
+            words.isin(job_categories)
+            .groupby(level=0)
+            .any()
+            .reindex(self.user_profiles.index, fill_value=False)
         )
 
     def match_salary(self):
-        job_min_salary = self.job_posting['min_salary'].iloc[0]
-        job_max_salary = self.job_posting['max_salary'].iloc[0]
-        self.user_profiles['salary_match'] = (
-            (self.user_profiles['min_salary'] <= job_max_salary) &
-            (self.user_profiles['max_salary'] >= job_min_salary)
-        )
+        job_min_salary = self.job_posting["min_salary"].iloc[0]
+        job_max_salary = self.job_posting["max_salary"].iloc[0]
+        self.user_profiles["salary_match"] = (
+            self.user_profiles["min_salary"] <= job_max_salary
+        ) & (self.user_profiles["max_salary"] >= job_min_salary)
 
     def get_matching_scores(self, min_score=1):
+        """Users with at least `min_score` matches, as (id, total_match)."""
         self.match_experience()
         self.match_category()
         self.match_salary()
-        
-        # Combine all matching criteria
-        self.user_profiles['total_match'] = (
-            self.user_profiles['exp_match'].astype(int) +
-            self.user_profiles['category_match'].astype(int) +
-            self.user_profiles['salary_match'].astype(int)
+
+        self.user_profiles["total_match"] = (
+            self.user_profiles["exp_match"].astype(int)
+            + self.user_profiles["category_match"].astype(int)
+            + self.user_profiles["salary_match"].astype(int)
         )
-        print(f"Total match: {self.user_profiles['total_match']}")
-        
-        # Filter users based on the minimum score
-        qualified_users = self.user_profiles[self.user_profiles['total_match'] >= min_score]
-        print(f"Qualified: {qualified_users}")
-        
-        # Sort by total_match score in descending order
-        qualified_users = qualified_users.sort_values('total_match', ascending=False)
-        
-        return qualified_users[['id', 'total_match']]
\ No newline at end of file
+        qualified_users = self.user_profiles[
+            self.user_profiles["total_match"] >= min_score
+        ]
+        qualified_users = qualified_users.sort_values(
+            "total_match", ascending=False, kind="stable"
+        )
+        return qualified_users[["id", "total_match"]]
+
+    def iter_matching_scores(self, job_id, min_score=1, chunk_size=5000):
+        """get_matching_scores for each chunk of users (see iter_user_frames)."""
+        self.load_job(job_id)
+        for users in iter_user_frames(chunk_size):
+            self.user_profiles = users
+            yield self.get_matching_scores(min_score)
+
+    def get_matching_scores_chunked(self, job_id, min_score=1, chunk_size=5000):
+        """
+        Same result as load_data + get_matching_scores, but only the
+        qualified users of each chunk are kept in memory.
+        """
+        parts = list(self.iter_matching_scores(job_id, min_score, chunk_size))
+        if not parts:
+            return pd.DataFrame(
+                {"id": pd.Series(dtype=np.int64), "total_match": pd.Series(dtype=int)}
+            )
+        scores = pd.concat(parts, ignore_index=True)
+        return scores.sort_values("total_match", ascending=False, kind="stable")
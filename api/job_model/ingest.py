@@ -0,0 +1,279 @@
+import hashlib
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import IngestedJob, IngestedJobPayload, MatchResult
+from .job_recommender import JobAppMatching
+from .skills import normalize_skills
+
+
+def infer_experience_level(years):
+    if years is None:
+        return "entry"
+    if years >= 5:
+        return "senior"
+    elif years >= 2:
+        return "mid"
+    return "entry"
+
+
+# IngestedJob fields covered by content_hash: what matching and the job
+# listing show. Bookkeeping (source, raw_payload) and the free-text
+# description are left out, so re-sending a job with only those changed is
+# still a no-op
+CONTENT_FIELDS = (
+    "title",
+    "company",
+    "location",
+    "remote",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "required_skills",
+    "preferred_skills",
+    "years_experience",
+    "employment_type",
+)
+
+
+def content_hash(fields):
+    """
+    Stable SHA-256 of the CONTENT_FIELDS of IngestedJob field values (a dict
+    or an IngestedJob). Strings are compared trimmed and case-insensitively
+    and skill lists as sets, so cosmetic re-sends hash the same.
+    """
+    if not isinstance(fields, dict):
+        fields = {name: getattr(fields, name) for name in CONTENT_FIELDS}
+    normalized = {}
+    for name in CONTENT_FIELDS:
+        value = fields.get(name)
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, (list, tuple)):
+            value = sorted(set(value))
+        normalized[name] = value
+    document = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def ingested_fields_from_payload(payload):
+    """IngestedJob field values for a ScuibJobsAi handoff payload."""
+    fields = {
+        "source_job_id": payload.get("job_id") or payload.get("id") or "",
+        "title": payload.get("job_title", "Untitled"),
+        "company": payload.get("company"),
+        "location": payload.get("location"),
+        "remote": payload.get("remote", False),
+        "salary_min": payload.get("salary_min"),
+        "salary_max": payload.get("salary_max"),
+        "salary_currency": payload.get("salary_currency", "USD"),
+        "required_skills": normalize_skills(payload.get("required_skills")),
+        "preferred_skills": normalize_skills(payload.get("preferred_skills")),
+        "years_experience": payload.get("years_experience"),
+        "employment_type": payload.get("employment_type"),
+        "description": payload.get("description"),
+        "source": payload.get("source", "scuib_jobs_ai"),
+        "raw_payload": payload,
+    }
+    fields["content_hash"] = content_hash(fields)
+    return fields
+
+
+def upsert_ingested_job(fields):
+    """
+    Create or update the IngestedJob for `fields` (see
+    ingested_fields_from_payload). Returns (job, outcome), outcome being:
+
+    - "created": a new job
+    - "unchanged": same content hash as the stored job; nothing is written
+    - "updated": the stored job changed; it is rewritten and marked pending
+      so it can be re-matched
+
+    The lookup is one query on the unique source_job_id index.
+    """
+    existing = (
+        IngestedJob.objects.filter(source_job_id=fields["source_job_id"])
+        .only("id", "content_hash", "status")
+        .first()
+    )
+    if existing is None:
+        return IngestedJob.objects.create(**fields), "created"
+    if existing.content_hash == fields["content_hash"]:
+        return existing, "unchanged"
+    for name, value in fields.items():
+        setattr(existing, name, value)
+    existing.status = "pending"
+    existing.save(update_fields=[*fields, "status", "updated_at"])
+    return existing, "updated"
+
+
+def ingest_batch(payloads, offset=0):
+    """
+    Store a batch of handoff payloads as IngestedJob rows with a constant
+    number of queries: one IN query for the source ids already ingested, one
+    bulk insert of the new jobs (conflicts ignored, so a concurrent ingest of
+    the same job cannot fail the batch), one IN query for their ids, one
+    bulk update of the stored jobs whose content hash changed and one
+    upsert of the compressed raw payloads of both.
+
+    Items that are not payload dicts (e.g. a line that failed to parse, as an
+    exception) are reported invalid. Returns (results, ids to match), one
+    result per item: created, updated (changed content), unchanged or
+    invalid. `offset` numbers the items within the whole request.
+    """
+    results = []
+    fields_by_source_id = {}
+    for position, payload in enumerate(payloads, offset):
+        result = {"index": position}
+        results.append(result)
+        if isinstance(payload, Exception):
+            result.update(status="invalid", error=str(payload))
+            continue
+        if not isinstance(payload, dict):
+            result.update(status="invalid", error="Expected a JSON object")
+            continue
+        fields = ingested_fields_from_payload(payload)
+        source_job_id = str(fields["source_job_id"])
+        result["job_id"] = source_job_id
+        if not source_job_id:
+            result.update(status="invalid", error="job_id is required")
+            continue
+        fields["source_job_id"] = source_job_id
+        # The last version of a job sent in the batch wins
+        fields_by_source_id[source_job_id] = fields
+
+    existing = {
+        source_job_id: (job_id, digest)
+        for source_job_id, job_id, digest in IngestedJob.objects.filter(
+            source_job_id__in=list(fields_by_source_id)
+        ).values_list("source_job_id", "id", "content_hash")
+    }
+    new = [s for s in fields_by_source_id if s not in existing]
+    IngestedJob.objects.bulk_create(
+        [IngestedJob(**fields_by_source_id[s]) for s in new], ignore_conflicts=True
+    )
+    created = dict(
+        IngestedJob.objects.filter(source_job_id__in=new).values_list(
+            "source_job_id", "id"
+        )
+    )
+
+    changed = []
+    now = timezone.now()
+    for source_job_id, (job_id, digest) in existing.items():
+        fields = fields_by_source_id[source_job_id]
+        if digest != fields["content_hash"]:
+            changed.append(
+                IngestedJob(id=job_id, status="pending", updated_at=now, **fields)
+            )
+    if changed:
+        # raw_payload lives in IngestedJobPayload, stored below
+        update_fields = [
+            name for name in fields if name not in ("source_job_id", "raw_payload")
+        ]
+        IngestedJob.objects.bulk_update(
+            changed, [*update_fields, "status", "updated_at"]
+        )
+    changed_ids = {job.id for job in changed}
+    payloads = {job.id: job.raw_payload for job in changed}
+    for source_job_id, job_id in created.items():
+        payloads[job_id] = fields_by_source_id[source_job_id]["raw_payload"]
+    if payloads:
+        IngestedJobPayload.store(payloads)
+
+    to_match = []
+    reported = set()
+    for result in results:
+        if "status" in result:
+            continue
+        source_job_id = result["job_id"]
+        if source_job_id in created:
+            job_id, outcome = created[source_job_id], "created"
+        else:
+            job_id = existing.get(source_job_id, (None, None))[0]
+            outcome = "updated" if job_id in changed_ids else "unchanged"
+        if source_job_id in reported:
+            # Repeats of a source id within the batch
+            outcome = "unchanged"
+        elif outcome != "unchanged":
+            to_match.append(job_id)
+        reported.add(source_job_id)
+        result.update(status=outcome, ingested_job_id=job_id)
+    return results, to_match
+
+
+def job_profile_for_ingested(ingested):
+    """The job profile dict JobAppMatching.recommend_users expects."""
+    skills_list = (ingested.required_skills or []) + (ingested.preferred_skills or [])
+    years = ingested.years_experience or 0
+    return {
+        "skills": ";".join(skills_list) if skills_list else "",
+        "experience_level": infer_experience_level(years),
+        "years_of_experience": years,
+        "location": (ingested.location or "").lower(),
+        "min_salary": ingested.salary_min or 0,
+        "max_salary": ingested.salary_max or 0,
+        "currency_type": ingested.salary_currency,
+        "remote": ingested.remote,
+    }
+
+
+def match_result_objects(ingested, matched_users):
+    return [
+        MatchResult(
+            ingested_job=ingested,
+            user_id=user_data["user_id"],
+            user_name=user_data["user_name"],
+            match_score=user_data["match_score"],
+            skills=user_data.get("skills", ""),
+            location=user_data.get("user_location", ""),
+            years_of_experience=user_data.get("years_of_experience"),
+            experience_level=user_data.get("experience_level"),
+            salary_range=user_data.get("salary_range"),
+        )
+        for user_data in matched_users
+    ]
+
+
+def save_matches(ingested, matched_users):
+    """Replace the stored matches of an ingested job and mark it matched."""
+    match_objects = match_result_objects(ingested, matched_users)
+    with transaction.atomic():
+        MatchResult.objects.filter(ingested_job=ingested).delete()
+        if match_objects:
+            MatchResult.objects.bulk_create(match_objects)
+        ingested.status = "matched"
+        ingested.save(update_fields=["status", "updated_at"])
+    return match_objects
+
+
+def match_ingested_job(ingested, matcher=None):
+    """
+    Score one ingested job against all candidates and persist the matches.
+    Scoring errors propagate, so the job's previous matches are kept and
+    the caller can mark its task failed.
+    """
+    matcher = matcher or JobAppMatching()
+    job_profile = job_profile_for_ingested(ingested)
+    user_profiles = matcher.load_users_for_job(job_profile)
+
+    matched_users = []
+    if not user_profiles.empty:
+        matched_users = matcher.recommend_users(job_profile, user_profiles)
+
+    return save_matches(ingested, matched_users)
+
+
+def match_ingested_jobs(ingested_jobs, matcher=None):
+    """Batch version of match_ingested_job: one scoring pass for all jobs."""
+    matcher = matcher or JobAppMatching()
+    ingested_jobs = list(ingested_jobs)
+    results = matcher.recommend_users_batch(
+        [job_profile_for_ingested(job) for job in ingested_jobs]
+    )
+    return {
+        ingested.id: save_matches(ingested, matched_users)
+        for ingested, matched_users in zip(ingested_jobs, results)
+    }
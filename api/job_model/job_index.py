@@ -0,0 +1,610 @@
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from ..models import Applicant, IngestedJob, Jobs, MatchResult
+from .candidate_filters import HARD_FILTERS
+from .candidate_index import COLUMNS, fetch_candidate_rows
+from .ingest import job_profile_for_ingested
+from .posting_index import PostingListIndex, split_terms
+from .scoring import (
+    CATEGORY_WEIGHTS,
+    EXPERIENCE_MAP,
+    MIN_MATCH_SCORE,
+    SKILL_WEIGHTS,
+    TOP_K,
+    top_k_positions,
+)
+from .shared_cache import warn_if_process_local
+from .vectorizer_store import vectorizer_store
+
+# Per-kind shared version stamps, bumped whenever an indexed job changes so
+# other workers know their job matrix is stale
+JOB_INDEX_VERSION_KEY = "job_index_version:{kind}"
+
+# Appended blocks are merged into one CSR matrix beyond this many
+MAX_BLOCKS = 8
+
+
+def _shared_version(kind):
+    key = JOB_INDEX_VERSION_KEY.format(kind=kind)
+    cache.add(key, 0, timeout=None)
+    return cache.get(key, 0)
+
+
+def _bump_shared_version(kind):
+    key = JOB_INDEX_VERSION_KEY.format(kind=kind)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def posted_job_profiles(job_ids=None):
+    """Job profiles of posted Jobs, as load_job_from_db shapes them."""
+    jobs = Jobs.objects.all()
+    categories = Jobs.categories.through.objects.all()
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+        categories = categories.filter(jobs_id__in=job_ids)
+
+    categories_by_job = {}
+    for job_id, name in categories.values_list(
+        "jobs_id", "usercategories__name"
+    ).iterator():
+        categories_by_job.setdefault(job_id, []).append(name)
+
+    profiles = {}
+    for job in (
+        jobs.order_by("id")
+        .values(
+            "id",
+            "title",
+            "experience_level",
+            "years_of_experience",
+            "location",
+            "min_salary",
+            "max_salary",
+            "currency_type",
+            "created_at",
+        )
+        .iterator()
+    ):
+        profiles[job["id"]] = {
+            "title": job["title"],
+            "categories": ";".join(categories_by_job.get(job["id"], ())),
+            "experience_level": job["experience_level"].lower().strip(),
+            "years_of_experience": job["years_of_experience"],
+            "location": job["location"].lower().strip(),
+            "min_salary": job["min_salary"],
+            "max_salary": job["max_salary"],
+            "currency_type": job["currency_type"],
+            "created_at": job["created_at"],
+        }
+    return profiles
+
+
+def ingested_job_profiles(job_ids=None):
+    """Job profiles of ingested jobs whose matches are already published."""
+    jobs = IngestedJob.objects.filter(status="matched")
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    jobs = jobs.order_by("id").only(
+        "id",
+        "title",
+        "company",
+        "location",
+        "salary_min",
+        "salary_max",
+        "salary_currency",
+        "required_skills",
+        "preferred_skills",
+        "years_experience",
+        "created_at",
+    )
+    return {
+        job.id: dict(
+            job_profile_for_ingested(job),
+            title=job.title,
+            company=job.company or "",
+            created_at=job.created_at,
+        )
+        for job in jobs.iterator()
+    }
+
+
+class JobMatrix:
+    """
+    Indexed jobs of one kind as L2-normalized CSR blocks plus dense columns
+    for the structured job requirements: the transpose of CandidateScorer.
+    Scoring one candidate against every job is a single sparse mat-vec.
+
+    New jobs are appended as a new block; removed or edited jobs are masked
+    out through `alive` (an edit appends the new version), so a job id maps
+    to at most one live row.
+    """
+
+    def __init__(self, profiles, kind, weights, vectorizer=None, max_age=None):
+        self.kind = kind
+        self.weights = weights
+        self.max_age = max_age
+        if vectorizer is None:
+            vectorizer = TfidfVectorizer()
+            vectorizer.fit(
+                [
+                    ", ".join(sorted(split_terms(p.get(kind))))
+                    for p in profiles.values()
+                ]
+            )
+        self.vectorizer = vectorizer
+
+        self.blocks = []
+        self.job_ids = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.columns = {
+            "experience": np.empty(0, dtype=np.int8),
+            "years": np.empty(0, dtype=np.int32),
+            "min_salary": np.empty(0, dtype=np.int64),
+            "max_salary": np.empty(0, dtype=np.int64),
+            "created_at": np.empty(0, dtype=np.float64),
+            "remote": np.empty(0, dtype=np.int8),
+            "experience_level": np.empty(0, dtype=object),
+            "location": np.empty(0, dtype=object),
+            "currency": np.empty(0, dtype=object),
+            "title": np.empty(0, dtype=object),
+            "company": np.empty(0, dtype=object),
+            "document": np.empty(0, dtype=object),
+        }
+        self.position = {}
+        self.postings = PostingListIndex()
+        self.version = 0
+        self.built_at = time.monotonic()
+        self._append(profiles)
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def _append(self, profiles):
+        if not profiles:
+            return
+        job_ids = sorted(profiles)
+        ordered = [profiles[job_id] for job_id in job_ids]
+        terms = [sorted(split_terms(p.get(self.kind))) for p in ordered]
+
+        block = self.vectorizer.transform([", ".join(t) for t in terms])
+        self.blocks.append(normalize(block, norm="l2").tocsr())
+        if len(self.blocks) > MAX_BLOCKS:
+            self.blocks = [sparse.vstack(self.blocks, format="csr")]
+
+        new_columns = {
+            "experience": [
+                EXPERIENCE_MAP.get(p["experience_level"], 1) for p in ordered
+            ],
+            "years": [p["years_of_experience"] or 0 for p in ordered],
+            "min_salary": [int(p.get("min_salary") or 0) for p in ordered],
+            "max_salary": [int(p.get("max_salary") or 0) for p in ordered],
+            "created_at": [
+                p["created_at"].timestamp() if p.get("created_at") else 0.0
+                for p in ordered
+            ],
+            "remote": [_remote(p) for p in ordered],
+            "experience_level": [p["experience_level"] for p in ordered],
+            "location": [p["location"] for p in ordered],
+            "currency": [p["currency_type"] for p in ordered],
+            "title": [p.get("title", "") for p in ordered],
+            "company": [p.get("company", "") for p in ordered],
+            "document": [";".join(t) for t in terms],
+        }
+        for name, values in new_columns.items():
+            column = self.columns[name]
+            self.columns[name] = np.concatenate(
+                [column, np.array(values, dtype=column.dtype)]
+            )
+
+        start = len(self.job_ids)
+        self.job_ids = np.concatenate(
+            [self.job_ids, np.array(job_ids, dtype=np.int64)]
+        )
+        self.alive = np.concatenate([self.alive, np.ones(len(job_ids), dtype=bool)])
+        for offset, (job_id, job_terms) in enumerate(zip(job_ids, terms)):
+            self.position[job_id] = start + offset
+            self.postings.add(job_id, job_terms)
+
+    def remove(self, job_ids):
+        for job_id in job_ids:
+            position = self.position.pop(job_id, None)
+            if position is None:
+                continue
+            self.alive[position] = False
+            self.postings.remove(
+                job_id, split_terms(self.columns["document"][position])
+            )
+
+    def apply(self, job_ids, profiles):
+        """
+        Replace the given jobs with their fresh `profiles`; ids missing from
+        `profiles` are dropped. Returns False once more than half the rows are
+        dead, when a rebuild is cheaper than carrying them.
+        """
+        self.remove(job_ids)
+        self._append(
+            {job_id: profiles[job_id] for job_id in job_ids if job_id in profiles}
+        )
+        return len(self) * 2 >= len(self.alive)
+
+    def live(self):
+        """Mask of rows that are neither removed nor expired."""
+        if not self.max_age:
+            return self.alive
+        cutoff = time.time() - self.max_age
+        return self.alive & (self.columns["created_at"] >= cutoff)
+
+    def text_scores(self, document):
+        """Cosine similarity of `document` against every row."""
+        if not self.blocks:
+            return np.empty(0)
+        vector = normalize(self.vectorizer.transform([document]), norm="l2")
+        return np.concatenate(
+            [(block @ vector.T).toarray().ravel() for block in self.blocks]
+        )
+
+    def score(self, row):
+        """
+        Score one candidate row (ordered like candidate_index.COLUMNS) against
+        every job. Returns (scores, overlap) where `overlap` marks the live jobs
+        that share at least one term with the candidate, i.e. the jobs whose
+        forward prefilter would have let this candidate through.
+        """
+        values = dict(zip(COLUMNS, row))
+        document = values[self.kind]
+        weights = self.weights
+        columns = self.columns
+
+        text = self.text_scores(document)
+        experience = (
+            EXPERIENCE_MAP.get(values["experience_level"], 0) >= columns["experience"]
+        )
+        years = values["years_of_experience"] >= columns["years"]
+        location = columns["location"] == values["location"]
+        salary = (
+            (values["min_salary"] <= columns["max_salary"])
+            & (values["max_salary"] >= columns["min_salary"])
+            & (columns["currency"] == values["currency_type"])
+        )
+        scores = (
+            weights["text"] * text
+            + weights["experience"] * experience
+            + weights["years"] * years
+            + weights["location"] * location
+            + weights["salary"] * salary
+        )
+
+        overlap = self.live() & np.isin(
+            self.job_ids, self.postings.lookup(split_terms(document))
+        )
+        return scores, overlap
+
+    def admits(self, row, constraints):
+        """
+        Mask of the jobs whose hard `constraints` (names from HARD_FILTERS)
+        let this candidate row through: CandidateFilter.for_job evaluated
+        for every job at once, so reverse matching drops the same pairs the
+        forward prefilter never loads.
+        """
+        unknown = set(constraints) - set(HARD_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown candidate filters: {sorted(unknown)}")
+        values = dict(zip(COLUMNS, row))
+        columns = self.columns
+        admitted = np.ones(len(self.job_ids), dtype=bool)
+
+        if "experience" in constraints:
+            level = EXPERIENCE_MAP.get(values["experience_level"], 0)
+            known = np.isin(columns["experience_level"], list(EXPERIENCE_MAP))
+            admitted &= ~known | (level >= columns["experience"])
+        if "years" in constraints:
+            admitted &= values["years_of_experience"] >= columns["years"]
+        if "salary" in constraints:
+            admitted &= (columns["max_salary"] == 0) | (
+                values["min_salary"] <= columns["max_salary"]
+            )
+            admitted &= (columns["min_salary"] == 0) | (
+                values["max_salary"] >= columns["min_salary"]
+            )
+        if "currency" in constraints:
+            currency = columns["currency"]
+            admitted &= ~currency.astype(bool) | (currency == values["currency_type"])
+        if "location" in constraints:
+            # A remote job is open to candidates anywhere
+            location = columns["location"]
+            admitted &= (
+                (columns["remote"] == 1)
+                | (location == "")
+                | (location == values["location"])
+            )
+        if "remote" in constraints:
+            job_location = values["job_location"]
+            if job_location != "h":
+                wanted = 1 if job_location == "r" else 0
+                admitted &= (columns["remote"] == -1) | (columns["remote"] == wanted)
+        return admitted
+
+
+def _remote(profile):
+    """1 for a remote job, 0 for an onsite one, -1 when the profile is silent."""
+    remote = profile.get("remote")
+    if remote is None and profile.get("employment_type"):
+        remote = profile["employment_type"] == "R"
+    return -1 if remote is None else int(remote)
+
+
+def _ingested_job_max_age():
+    days = getattr(settings, "INGESTED_JOB_MAX_AGE_DAYS", 30)
+    return days * 86400 if days else None
+
+
+# kind -> (profile loader, candidate column, weights, max age in seconds); the
+# columns match what the forward path scores each kind of job on
+JOB_KINDS = {
+    "job": (posted_job_profiles, "categories", CATEGORY_WEIGHTS, lambda: None),
+    "ingested_job": (
+        ingested_job_profiles,
+        "skills",
+        SKILL_WEIGHTS,
+        _ingested_job_max_age,
+    ),
+}
+
+_matrices = {}
+_lock = threading.Lock()
+
+
+def get_job_matrix(kind):
+    """
+    This worker's JobMatrix for `kind`. Rebuilt when another worker changed
+    the jobs, when it outlived JOB_INDEX_MAX_AGE or when a new vectorizer was
+    fitted. Returns None if no job carries a single term yet.
+    """
+    loader, column, weights, max_age = JOB_KINDS[kind]
+    shared_version = _shared_version(kind)
+    vectorizer = vectorizer_store.get(column)
+    index_max_age = getattr(settings, "JOB_INDEX_MAX_AGE", 300)
+
+    with _lock:
+        matrix = _matrices.get(kind)
+        if matrix is not None:
+            fresh = (
+                matrix.version == shared_version
+                and not (
+                    index_max_age
+                    and time.monotonic() - matrix.built_at > index_max_age
+                )
+                and (vectorizer is None or matrix.vectorizer is vectorizer)
+            )
+            if fresh:
+                return matrix
+
+        warn_if_process_local("Job index")
+        try:
+            matrix = JobMatrix(loader(), column, weights, vectorizer, max_age())
+        except ValueError:
+            _matrices.pop(kind, None)
+            return None
+        matrix.version = shared_version
+        _matrices[kind] = matrix
+        return matrix
+
+
+def refresh_jobs(kind, job_ids, deleted=False):
+    """
+    Patch changed jobs into this worker's matrix and tell the others. Called
+    from signals after the surrounding transaction commits; deleted jobs are
+    dropped without a query.
+    """
+    job_ids = {job_id for job_id in job_ids if job_id is not None}
+    if not job_ids:
+        return
+
+    loader = JOB_KINDS[kind][0]
+    with _lock:
+        matrix = _matrices.get(kind)
+        if matrix is None:
+            _bump_shared_version(kind)
+            return
+
+        expected = _shared_version(kind)
+        profiles = {} if deleted else loader(job_ids)
+        if not matrix.apply(job_ids, profiles):
+            del _matrices[kind]
+            _bump_shared_version(kind)
+            return
+
+        new_version = _bump_shared_version(kind)
+        if expected == matrix.version:
+            # Nobody else changed these jobs since our snapshot; stay current
+            matrix.version = new_version
+
+
+def invalidate_job_index(kind):
+    """Drop every worker's `kind` matrix, e.g. after bulk inserts."""
+    with _lock:
+        _matrices.pop(kind, None)
+        _bump_shared_version(kind)
+
+
+def recommend_ingested_jobs(user_profile, k=5):
+    """
+    recommend_jobs over the resident ingested job matrix: one mat-vec plus
+    vectorized comparisons instead of a DataFrame and a TF-IDF fit per call.
+    Same weights and output as JobAppMatching.recommend_jobs.
+    """
+    matrix = get_job_matrix("ingested_job")
+    if matrix is None or not len(matrix):
+        return []
+
+    live = np.flatnonzero(matrix.live())
+    if not len(live):
+        return []
+    columns = matrix.columns
+
+    skills = matrix.text_scores(", ".join(user_profile.get("skills") or []))[live]
+    user_level = EXPERIENCE_MAP.get(user_profile.get("experience", "entry"), 1)
+    experience = columns["experience"][live] == user_level
+    location = columns["location"][live] == user_profile.get("location", "")
+    salary = (
+        columns["min_salary"][live] <= int(user_profile.get("max_salary", 0))
+    ) & (columns["max_salary"][live] >= int(user_profile.get("min_salary", 0)))
+    scores = 0.4 * skills + 0.3 * experience + 0.2 * location + 0.1 * salary
+
+    best = top_k_positions(scores, k)
+    rows = live[best]
+    return [
+        {
+            "job_title": columns["title"][row],
+            "company": columns["company"][row],
+            "location": columns["location"][row],
+            "experience_level": columns["experience_level"][row],
+            "skills": columns["document"][row],
+            "min_salary": int(columns["min_salary"][row]),
+            "max_salary": int(columns["max_salary"][row]),
+            "score": float(scores[position]),
+        }
+        for row, position in zip(rows.tolist(), best.tolist())
+    ]
+
+
+MATCH_FIELDS = [
+    "user_name",
+    "match_score",
+    "skills",
+    "location",
+    "years_of_experience",
+    "experience_level",
+    "salary_range",
+]
+
+
+def _match_fields(row, score):
+    values = dict(zip(COLUMNS, row))
+    return {
+        "user_name": values["user_name"],
+        "match_score": round(float(score), 3),
+        "skills": values["skills"],
+        "location": values["location"],
+        "years_of_experience": values["years_of_experience"],
+        "experience_level": values["experience_level"],
+        "salary_range": (
+            f"{values['min_salary']} - {values['max_salary']} "
+            f"{values['currency_type']}"
+        ),
+    }
+
+
+def _sync_match_results(user_id, row, matrix, k=TOP_K, min_score=MIN_MATCH_SCORE):
+    """
+    Upsert this candidate's MatchResult rows for every published ingested job.
+    A job keeps at most `k` matches: a new match only enters by beating the
+    job's current lowest score, which it then evicts. Returns the number of
+    jobs the candidate is matched to afterwards.
+    """
+    current = MatchResult.objects.filter(
+        user_id=user_id, ingested_job__status="matched"
+    )
+    existing = dict(current.values_list("ingested_job_id", "id"))
+
+    eligible = {}
+    if row is not None and matrix is not None and len(matrix):
+        scores, overlap = matrix.score(row)
+        hard_filters = getattr(settings, "CANDIDATE_HARD_FILTERS", ())
+        if hard_filters:
+            overlap &= matrix.admits(row, hard_filters)
+        keep = np.flatnonzero(overlap & (scores >= min_score))
+        eligible = dict(zip(matrix.job_ids[keep].tolist(), scores[keep].tolist()))
+
+    stale = [
+        match_id for job_id, match_id in existing.items() if job_id not in eligible
+    ]
+
+    updated = [
+        MatchResult(id=match_id, **_match_fields(row, eligible[job_id]))
+        for job_id, match_id in existing.items()
+        if job_id in eligible
+    ]
+
+    new_jobs = [job_id for job_id in eligible if job_id not in existing]
+    ranked = {}
+    for job_id, match_id, score in MatchResult.objects.filter(
+        ingested_job_id__in=new_jobs
+    ).values_list("ingested_job_id", "id", "match_score"):
+        ranked.setdefault(job_id, []).append((score, match_id))
+
+    created, evicted = [], []
+    for job_id in new_jobs:
+        score = eligible[job_id]
+        others = ranked.get(job_id, [])
+        if len(others) >= k:
+            lowest_score, lowest_id = min(others)
+            if score <= lowest_score:
+                continue
+            evicted.append(lowest_id)
+        created.append(
+            MatchResult(
+                ingested_job_id=job_id, user_id=user_id, **_match_fields(row, score)
+            )
+        )
+
+    with transaction.atomic():
+        if stale or evicted:
+            MatchResult.objects.filter(id__in=stale + evicted).delete()
+        if updated:
+            MatchResult.objects.bulk_update(updated, MATCH_FIELDS)
+        if created:
+            MatchResult.objects.bulk_create(created)
+    return len(updated) + len(created)
+
+
+def _sync_applicant_scores(user_id, row, matrix):
+    """Refresh match_score on this candidate's existing job applications."""
+    if row is None or matrix is None or not len(matrix):
+        return 0
+    applicants = [
+        a
+        for a in Applicant.objects.filter(user_id=user_id).only(
+            "id", "job_id", "match_score"
+        )
+        if a.job_id in matrix.position
+    ]
+    if not applicants:
+        return 0
+
+    scores, _ = matrix.score(row)
+    for applicant in applicants:
+        position = matrix.position[applicant.job_id]
+        applicant.match_score = round(float(scores[position]), 3)
+    Applicant.objects.bulk_update(applicants, ["match_score"])
+    return len(applicants)
+
+
+def rematch_candidate(user_id):
+    """
+    Reverse matching for one candidate whose profile changed: score just this
+    user against every open job and patch the stored match rows, instead of
+    rematching every job against every user.
+    """
+    row = fetch_candidate_rows([user_id]).get(user_id)
+    return {
+        "match_count": _sync_match_results(
+            user_id, row, get_job_matrix("ingested_job")
+        ),
+        "applicants_updated": _sync_applicant_scores(
+            user_id, row, get_job_matrix("job")
+        ),
+    }
@@ -1,15 +1,36 @@
-import re
-import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from ..models import BoostJobs, JobPreference, Jobs, User, UserSkills, Profile
+from ..models import Jobs, User
+import logging
 import time
-import heapq
 
-from django.db.models import F, Value
-from django.db.models.functions import Lower
-from django.contrib.postgres.aggregates import StringAgg
+from django.conf import settings
+
+from .boost_scoring import recommend_boost_jobs
+from .candidate_filters import CandidateFilter
+from .candidate_index import (
+    CandidateIndex,
+    fetch_candidate_rows,
+    get_candidate_index,
+    resident_index_for,
+)
+from .model_registry import model_cache
+from .posting_index import positions_of
+from .ranking import rerank
+from .scoring import (
+    CATEGORY_WEIGHTS,
+    EXPERIENCE_MAP,
+    SKILL_WEIGHTS,
+    TOP_K,
+    build_scorer,
+    get_scorer,
+    top_k_positions,
+)
+from .skills import normalize_skills
+from .vectorizer_store import vectorizer_store
+
+logger = logging.getLogger(__name__)
 
 # Currency map for locations
 currency_map = {
@@ -30,9 +51,35 @@ currency_map = {
 }
 
 
+def _to_number(value):
+    """Salary as a float; missing or unparsable values become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
 class JobAppMatching:
-    def __init__(self):
-        self.tfidf = TfidfVectorizer()
+    def __init__(self, rerank_model=None, shortlist_k=None, rerank_budget_ms=None):
+        """
+        recommend_users(_categories) run in two stages when a rerank model is
+        set (default: settings.RERANK_MODEL) and published: the weighted
+        score retrieves the top `shortlist_k` candidates, then the model
+        reranks them until the request has taken `rerank_budget_ms`. Per-stage
+        timings of the last call are kept in `self.timings`.
+        """
+        self.rerank_model = (
+            getattr(settings, "RERANK_MODEL", "")
+            if rerank_model is None
+            else rerank_model
+        )
+        self.shortlist_k = shortlist_k or getattr(settings, "RERANK_SHORTLIST_K", 200)
+        self.rerank_budget_ms = (
+            getattr(settings, "RERANK_BUDGET_MS", 50)
+            if rerank_budget_ms is None
+            else rerank_budget_ms
+        )
+        self.timings = {}
 
     def load_job_from_db(self, job_id):
         """Fetch job details from the database."""
@@ -56,18 +103,25 @@ class JobAppMatching:
             print("Job not found.")
             return None
 
-    def load_users_from_db(self, skills=None, categories=None, location=None):
+    def load_users_from_db(
+        self, skills=None, categories=None, location=None, constraints=None
+    ):
         """
-        Load user profiles with optional filters for skills, categories, or location.
-        Returns a pandas DataFrame of user data.
+        Load candidate profiles with optional filters for skills, categories,
+        location, or hard constraints (a CandidateFilter). Returns a compact
+        CandidateIndex (typed numpy columns, term ids in CSR layout) that
+        every recommend_users* method accepts.
+
+        Filters run in SQL, as a subquery of the candidate row queries, so
+        only matching candidates leave the database. Unfiltered loads are
+        served from the process-resident candidate index instead of scanning
+        the user table on every request.
         """
+        if not (skills or categories or location or constraints):
+            return get_candidate_index()
 
         # Base queryset
-        users = (
-            User.objects.filter(company=False)
-            .select_related("profile")
-            .prefetch_related("user_skills", "profile__categories")
-        )
+        users = User.objects.filter(company=False)
 
         # Apply filters dynamically
         if skills:
@@ -75,242 +129,270 @@ class JobAppMatching:
         if categories:
             users = users.filter(profile__categories__name__in=categories)
         if location:
-            users = users.filter(profile__location__iexact=location)
-
-        # Remove duplicates if multiple relations overlap
-        users = users.distinct()
-
-        # Annotate and prepare data
-        users = users.annotate(
-            skills_agg=StringAgg("user_skills__name", delimiter=";", distinct=True),
-            experience_level=Lower("profile__experience_level"),
-            location=Lower("profile__location"),
-            job_location=Lower("profile__job_location"),
-            years_of_experience=F("profile__years_of_experience"),
-            min_salary=F("profile__min_salary"),
-            max_salary=F("profile__max_salary"),
-            currency=F("profile__currency"),
-            categories_agg=StringAgg(
-                "profile__categories__name", delimiter=";", distinct=True
-            ),
-        ).values(
-            "id",
-            "first_name",
-            "last_name",
-            "skills_agg",
-            "experience_level",
-            "years_of_experience",
-            "location",
-            "job_location",
-            "min_salary",
-            "max_salary",
-            "currency",
-            "categories_agg",
+            users = CandidateFilter(location=location).apply(users)
+        if constraints:
+            users = constraints.apply(users)
+
+        return CandidateIndex(fetch_candidate_rows(users.values("id")))
+
+    def load_users_for_job(self, job_profile):
+        """
+        Candidates for one job profile: those meeting the job's hard
+        constraints (settings.CANDIDATE_HARD_FILTERS), or every candidate.
+        """
+        hard_filters = getattr(settings, "CANDIDATE_HARD_FILTERS", ())
+        if not hard_filters:
+            return self.load_users_from_db()
+        return self.load_users_from_db(
+            constraints=CandidateFilter.for_job(job_profile, hard_filters)
         )
 
-        # Convert to DataFrame
-        user_data = [
-            {
-                "user_id": user["id"],
-                "user_name": f"{user['first_name']} {user['last_name']}",
-                "skills": user["skills_agg"] or "",
-                "experience_level": user["experience_level"] or "",
-                "years_of_experience": user["years_of_experience"] or 0,
-                "location": user["location"] or "",
-                "job_location": user["job_location"] or "",
-                "min_salary": user["min_salary"] or 0,
-                "max_salary": user["max_salary"] or 0,
-                "currency_type": user["currency"] or "",
-                "categories": user["categories_agg"] or "",
-            }
-            for user in users
+    def candidate_rows(self, index, column, terms):
+        """Row positions of live candidates carrying any of `terms` in `column`."""
+        return positions_of(
+            index.user_ids, index.postings[column].lookup(terms), assume_sorted=True
+        )
+
+    def location_rows(self, index, rows, location):
+        """The `rows` whose location contains `location` (case-insensitive)."""
+        location = location.strip().lower()
+        codes = index.codes["location"].matching(lambda value: location in value)
+        return rows[np.isin(index.columns["location"][rows], codes)]
+
+    def scorer_for(self, user_data, kind):
+        """
+        The shared, incrementally patched scorer for the resident index; a
+        one-off scorer for any other (filtered) candidate set.
+        """
+        if resident_index_for(user_data) is not None:
+            return get_scorer(user_data, kind)
+        return build_scorer(user_data, kind, vectorizer_store.get(kind))
+
+    def reranker(self):
+        """The active rerank model, or None to rank by the weighted score."""
+        if not self.rerank_model:
+            return None
+        return model_cache.get(self.rerank_model)
+
+    def score_candidates(self, user_data, kind, terms, job, weights, job_profile):
+        """
+        Top candidates for one job. Stage one scores every candidate carrying
+        a job term with the sparse scoring engine; with a rerank model, stage
+        two reranks only the stage-one shortlist.
+        """
+        started = time.perf_counter()
+        scorer = self.scorer_for(user_data, kind)
+        if scorer is None:
+            return []
+        rows = self.candidate_rows(user_data, kind, terms)
+        candidates = len(rows)
+        ranker = self.reranker()
+        k = max(self.shortlist_k, TOP_K) if ranker is not None else TOP_K
+        rows, scores = scorer.shortlist(rows, ", ".join(terms), job, weights, k)
+        retrieved = time.perf_counter()
+        self.timings = {
+            "candidates": candidates,
+            "retrieve_ms": (retrieved - started) * 1000,
+        }
+        if ranker is None or not len(rows):
+            return scorer.build_results(rows[:TOP_K], scores[:TOP_K])
+
+        deadline = started + self.rerank_budget_ms / 1000
+        model_scores = rerank(ranker, user_data, rows, job_profile, deadline)
+        reranked = np.flatnonzero(~np.isnan(model_scores))
+        # Reranked rows first, by model score; rows the budget did not reach
+        # follow in their stage-one order
+        order = np.concatenate(
+            [
+                reranked[np.argsort(-model_scores[reranked], kind="stable")],
+                np.flatnonzero(np.isnan(model_scores)),
+            ]
+        )[:TOP_K]
+        results = scorer.build_results(rows[order], scores[order])
+        for result, position in zip(results, order.tolist()):
+            if not np.isnan(model_scores[position]):
+                result["rerank_score"] = round(float(model_scores[position]), 3)
+        self.timings.update(
+            shortlist=len(rows),
+            reranked=len(reranked),
+            rerank_ms=(time.perf_counter() - retrieved) * 1000,
+        )
+        if len(reranked) < len(rows):
+            logger.info(
+                "Rerank budget of %s ms reranked %d of %d shortlisted candidates",
+                self.rerank_budget_ms,
+                len(reranked),
+                len(rows),
+            )
+        return results
+
+    def job_terms_and_features(self, job_profile, column="skills"):
+        """
+        Normalized terms and structured features of a job profile. Skills are
+        canonicalized like stored candidate skills, so "ReactJS" matches
+        "react".
+        """
+        terms = [
+            t.strip().lower()
+            for t in (job_profile.get(column) or "").split(";")
+            if t.strip()
         ]
+        if column == "skills":
+            terms = normalize_skills(terms)
+        return terms, {
+            "experience": EXPERIENCE_MAP.get(
+                job_profile["experience_level"].strip().lower(), 1
+            ),
+            "years": job_profile["years_of_experience"],
+            "location": job_profile["location"].strip().lower(),
+            "min_salary": int(job_profile.get("min_salary", 0)),
+            "max_salary": int(job_profile.get("max_salary", 0)),
+            "currency": job_profile["currency_type"],
+        }
+
+    def recommend_users_batch(self, job_profiles, user_data=None, k=TOP_K):
+        """
+        Recommend users for many job profiles in one pass over the candidates.
+        Returns one recommend_users-shaped list per job profile, in order.
+        """
+        if user_data is None:
+            user_data = self.load_users_from_db()
+        if user_data.empty:
+            return [[] for _ in job_profiles]
+
+        scorer = self.scorer_for(user_data, "skills")
+        if scorer is None:
+            return [[] for _ in job_profiles]
+
+        rows_per_job, queries, jobs = [], [], []
+        for job_profile in job_profiles:
+            terms, job = self.job_terms_and_features(job_profile, "skills")
+            rows_per_job.append(self.candidate_rows(user_data, "skills", terms))
+            queries.append(", ".join(terms))
+            jobs.append(job)
+
+        return scorer.recommend_batch(
+            rows_per_job,
+            queries,
+            jobs,
+            SKILL_WEIGHTS,
+            k=k,
+            memory_budget=getattr(settings, "MATCHING_BATCH_MEMORY_MB", 64)
+            * 1024
+            * 1024,
+        )
 
-        return pd.DataFrame(user_data)
+    def text_similarity(self, kind, query, documents):
+        """
+        Cosine similarity of `query` against each document. Uses the global
+        vectorizer for `kind` transform-only; falls back to fitting on the
+        documents themselves until one has been fitted with refit_vectorizers.
+        """
+        vectorizer = vectorizer_store.get(kind)
+        if vectorizer is None:
+            vectorizer = TfidfVectorizer()
+            matrix = vectorizer.fit_transform(documents)
+        else:
+            matrix = vectorizer.transform(documents)
+        query_vector = vectorizer.transform([query])
+        return cosine_similarity(query_vector, matrix).flatten()
 
     def enrich_jobs_with_currency(self, jobs):
-        # Add a currency symbol column to the job data
-        jobs["currency_symbol"] = jobs["location"].map(
-            lambda loc: currency_map.get(loc, "$")
-        )  # Default to USD if not mapped
+        # Add a currency symbol to each job dict
+        for job in jobs:
+            job["currency_symbol"] = currency_map.get(
+                job.get("location"), "$"
+            )  # Default to USD if not mapped
         return jobs
 
-    def recommend_jobs(self, user_profile, job_data):
+    def recommend_jobs(self, user_profile, job_data, k=5):
         """
         Function to recommend jobs based on user profile by matching skills, experience, location, and salary.
+        `job_data` is a list of job dicts with title, owner, skills,
+        experience_level, location, min_salary and max_salary.
         """
+        if not job_data:
+            return []
+
         # Process the user profile
         user_skills = user_profile.get("skills", "")
-        user_experience = user_profile.get(
-            "experience", "entry"
-        )  # default to 'entry' if not provided
+        user_experience_level = EXPERIENCE_MAP.get(
+            user_profile.get("experience", "entry"), 1
+        )  # Default to 'entry'
         user_location = user_profile.get("location", "")
-        user_min_salary = user_profile.get("min_salary")  # Extract and convert
-        user_max_salary = int(user_profile.get("max_salary", [0])[0])
         user_min_salary = int(user_profile.get("min_salary", 0))
         user_max_salary = int(user_profile.get("max_salary", 0))
 
-        # Handle missing data
-        job_data = job_data.fillna(
-            {"skills": "", "experience_level": "entry", "location": ""}
-        )
-
         # Step 1: Calculate Skills Similarity using TF-IDF Vectorization
-        tfidf = TfidfVectorizer()
-        job_skills_matrix = tfidf.fit_transform(job_data["skills"].fillna(""))
-
-        # Convert user skills to a TF-IDF vector
-        user_skills_vector = tfidf.transform([", ".join(user_skills)])
-
-        # Compute cosine similarity between user skills and job skills
-        skills_similarity = cosine_similarity(
-            user_skills_vector, job_skills_matrix
-        ).flatten()
-
-        # Step 2: Match Experience Level
-        experience_map = {"entry": 1, "mid": 2, "senior": 3, "lead": 4}
-        user_experience_level = experience_map.get(
-            user_experience, 1
-        )  # Default to 'entry'
+        skills_similarity = self.text_similarity(
+            "skills",
+            ", ".join(user_skills),
+            [job.get("skills") or "" for job in job_data],
+        )
 
-        # Experience match: check if the job experience level matches the user's experience
+        # Step 2: Match Experience Level (missing levels count as entry)
         experience_match = (
-            job_data["experience_level"].map(experience_map) == user_experience_level
+            np.array(
+                [
+                    EXPERIENCE_MAP.get(job.get("experience_level") or "entry", 0)
+                    for job in job_data
+                ]
+            )
+            == user_experience_level
         )
 
         # Step 3: Match Location
-        location_match = job_data["location"].eq(user_location)
-        # location_match = job_data["location"] == user_location
-
-        # Step 4: Salary Match (simple range check)
-        job_data["min_salary"] = pd.to_numeric(job_data["min_salary"], errors="coerce")
-        job_data["max_salary"] = pd.to_numeric(job_data["max_salary"], errors="coerce")
+        location_match = np.array(
+            [(job.get("location") or "") == user_location for job in job_data]
+        )
 
-        salary_match = (job_data["min_salary"] <= user_max_salary) & (
-            job_data["max_salary"] >= user_min_salary
+        # Step 4: Salary Match (simple range check; unparsable salaries never match)
+        min_salaries = np.array(
+            [_to_number(job.get("min_salary")) for job in job_data], dtype=np.float64
+        )
+        max_salaries = np.array(
+            [_to_number(job.get("max_salary")) for job in job_data], dtype=np.float64
+        )
+        salary_match = (min_salaries <= user_max_salary) & (
+            max_salaries >= user_min_salary
         )
 
         # Step 5: Calculate Final Scores (weighted sum of all factors)
         scores = (
             (0.4 * skills_similarity)
-            + (0.3 * experience_match.astype(int))
-            + (0.2 * location_match.astype(int))
-            + (0.1 * salary_match.astype(int))
+            + (0.3 * experience_match)
+            + (0.2 * location_match)
+            + (0.1 * salary_match)
         )
 
-        # Debugging: Print scores and indices
-        print(f"Scores: {scores}")
-        top_job_indices = np.argsort(scores)[-5:][::-1]  # Sort and pick top 5
-        print(f"Top Job Indices: {top_job_indices}")
-
         recommendations = []
-        for idx in top_job_indices:
-            job = job_data.iloc[idx]
+        for idx in top_k_positions(scores, k).tolist():
+            job = job_data[idx]
             recommendations.append(
                 {
                     "job_title": job["title"],
                     "company": job["owner"],
-                    "location": job["location"],
-                    "experience_level": job["experience_level"],
-                    "skills": job["skills"],
-                    "min_salary": job["min_salary"],
-                    "max_salary": job["max_salary"],
-                    "score": scores[idx],
+                    "location": job.get("location") or "",
+                    "experience_level": job.get("experience_level") or "entry",
+                    "skills": job.get("skills") or "",
+                    "min_salary": min_salaries[idx],
+                    "max_salary": max_salaries[idx],
+                    "score": float(scores[idx]),
                 }
             )
 
-        if not recommendations:
-            print("No job recommendations found.")
-
         return recommendations
 
     def recommend_users(self, job_profile, user_data):
         """
         Recommend users for a job profile based on skills, experience, location, and salary.
         """
-        # Extract job profile details
-        job_skills = [
-            s.strip().lower()
-            for s in job_profile.get("skills", "").split(";")
-            if s.strip()
-        ]
-        job_experience = job_profile["experience_level"].strip().lower()
-        job_years_of_experience = job_profile["years_of_experience"]
-        job_location = job_profile["location"].strip().lower()
-        job_min_salary = int(job_profile.get("min_salary", 0))
-        job_max_salary = int(job_profile.get("max_salary", 0))
-        job_currency = job_profile["currency_type"]
-
+        job_skills, job = self.job_terms_and_features(job_profile, "skills")
         if not job_skills:
             return []
-
-        pattern = "|".join(re.escape(skill) for skill in job_skills)
-        filtered = user_data[
-            user_data["skills"].fillna("").str.lower().str.contains(pattern, na=False)
-        ]
-        if filtered.empty:
-            return []
-
-        # Step 1: Skills Matching
-        tfidf = TfidfVectorizer()
-        user_skills_matrix = tfidf.fit_transform(filtered["skills"])
-        job_skills_vector = tfidf.transform([", ".join(job_skills)])
-        skills_similarity = cosine_similarity(
-            job_skills_vector, user_skills_matrix
-        ).flatten()
-
-        # Step 2: Experience Level and Years of Experience Match
-        experience_map = {"entry": 1, "mid": 2, "senior": 3, "lead": 4}
-        filtered["experience_numeric"] = (
-            filtered["experience_level"].map(experience_map).fillna(0).astype(int)
+        return self.score_candidates(
+            user_data, "skills", job_skills, job, SKILL_WEIGHTS, job_profile
         )
-        job_experience_numeric = experience_map.get(job_experience, 1)
-
-        experience_match = filtered["experience_numeric"] >= job_experience_numeric
-        years_experience_match = (
-            filtered["years_of_experience"] >= job_years_of_experience
-        )
-
-        # Step 3: Location and Preferred Job Location Match
-        location_match = filtered["location"].str.lower() == job_location
-
-        # Step 4: Salary Match
-        salary_match = (
-            (filtered["min_salary"].fillna(0) <= job_max_salary)
-            & (filtered["max_salary"].fillna(0) >= job_min_salary)
-            & (filtered["currency_type"].fillna("") == job_currency)
-        ).astype(int)
-
-        # Step 5: Scoring and Recommendations
-        scores = (
-            (0.5 * skills_similarity)
-            + (0.2 * experience_match.astype(int))
-            + (0.1 * years_experience_match.astype(int))
-            + (0.15 * location_match.astype(int))
-            + (0.05 * salary_match.astype(int))
-        )
-
-        filtered = filtered.assign(match_score=scores)
-        top_users = filtered[filtered["match_score"] >= 0.4].nlargest(10, "match_score")
-
-        # user_data["match_score"] = scores
-        # filtered_users = user_data[user_data["match_score"] >= 0.4]
-
-        recommendations = [
-            {
-                "user_id": row["user_id"],
-                "user_name": row["user_name"],
-                "skills": row["skills"],
-                "user_location": row["location"],
-                "salary_range": f"{row['min_salary']} - {row['max_salary']} {row['currency_type']}",
-                "years_of_experience": row["years_of_experience"],
-                "experience_level": row["experience_level"],
-                "match_score": round(row["match_score"], 3),
-            }
-            for _, row in top_users.iterrows()
-        ]
-
-        return recommendations
 
     def recommend_users_any_skills(self, skills, location, user_data):
         """
@@ -319,40 +401,33 @@ class JobAppMatching:
         Args:
             skills (List[str]): List of skills from frontend.
             location (str): Location from frontend.
-            user_data (pd.DataFrame): DataFrame with 'skills', 'location', 'user_name', 'user_id'.
+            user_data (CandidateIndex): Candidates from load_users_from_db.
 
         Returns:
             List[dict]: List of matching users.
         """
-        # Normalize input
-        required_skills_set = set(skill.strip().lower() for skill in skills)
-        location = location.strip().lower()
-
-        def has_any_required_skills(user_skills_str):
-            user_skills = set(
-                skill.strip().lower() for skill in user_skills_str.split(";")
-            )
-            return bool(required_skills_set & user_skills)  # intersection not empty
+        # Normalize input the way skills are stored
+        required_skills_set = set(normalize_skills(skills))
 
         # Apply filters
-        matches = user_data[
-            user_data["skills"].apply(has_any_required_skills)
-            & user_data["location"].str.contains(location, case=False, na=False)
-        ]
+        rows = self.candidate_rows(user_data, "skills", required_skills_set)
+        rows = self.location_rows(user_data, rows, location)
 
         # Format output
-        recommendations = []
-        for _, user in matches.iterrows():
-            recommendations.append(
-                {
-                    "user_name": user["user_name"],
-                    "user_id": user["user_id"],
-                    "skills": user["skills"],
-                    "user_location": user["location"],
-                }
+        return [
+            {
+                "user_name": user_name,
+                "user_id": user_id,
+                "skills": user_skills,
+                "user_location": user_location,
+            }
+            for user_name, user_id, user_skills, user_location in zip(
+                user_data.values("user_name", rows),
+                user_data.values("user_id", rows),
+                user_data.values("skills", rows),
+                user_data.values("location", rows),
             )
-
-        return recommendations
+        ]
 
     def recommend_users_any_categories(self, categories, location, user_data):
         """
@@ -362,177 +437,53 @@ class JobAppMatching:
         Args:
             categories (List[str]): List of categories from frontend.
             location (str): Location from frontend.
-            user_data (pd.DataFrame): DataFrame with 'categories', 'location', 'user_name', 'user_id'.
+            user_data (CandidateIndex): Candidates from load_users_from_db.
 
         Returns:
             List[dict]: List of matching users.
         """
         # Normalize input
         required_categories_set = set(cat.strip().lower() for cat in categories)
-        location = location.strip().lower()
-
-        def has_any_required_categories(user_categories):
-            user_categories = set(
-                cat.strip().lower() for cat in user_categories.split(";")
-            )
-            return bool(
-                required_categories_set & user_categories
-            )  # intersection not empty
 
         # Apply filters
-        matches = user_data[
-            user_data["categories"].apply(has_any_required_categories)
-            & user_data["location"].str.contains(location, case=False, na=False)
-        ]
+        rows = self.candidate_rows(user_data, "categories", required_categories_set)
+        rows = self.location_rows(user_data, rows, location)
 
         # Format output
-        recommendations = []
-        for _, user in matches.iterrows():
-            recommendations.append(
-                {
-                    "user_name": user["user_name"],
-                    "user_id": user["user_id"],
-                    "categories": user["categories"],
-                    "user_location": user["location"],
-                }
+        return [
+            {
+                "user_name": user_name,
+                "user_id": user_id,
+                "categories": user_categories,
+                "user_location": user_location,
+            }
+            for user_name, user_id, user_categories, user_location in zip(
+                user_data.values("user_name", rows),
+                user_data.values("user_id", rows),
+                user_data.values("categories", rows),
+                user_data.values("location", rows),
             )
-
-        return recommendations
+        ]
 
     def recommend_users_categories(self, job_profile, user_data):
         """
         Recommend users for a job profile based on categories, experience, location, and salary.
         """
-        # Extract job profile details
-        job_categories = [
-            c.strip().lower() for c in job_profile["categories"].split(";") if c.strip()
-        ]
-        job_experience = job_profile["experience_level"].strip().lower()
-        job_years_of_experience = job_profile["years_of_experience"]
-        job_location = job_profile["location"].strip().lower()
-        job_min_salary = int(job_profile.get("min_salary", 0))
-        job_max_salary = int(job_profile.get("max_salary", 0))
-        job_currency = job_profile["currency_type"]
-
-        # --- Step 1: Category prefilter ---
-        pattern = "|".join(re.escape(cat) for cat in job_categories)
-        filtered = user_data[
-            user_data["categories"].str.lower().str.contains(pattern, na=False)
-        ]
-        if filtered.empty:
+        job_categories, job = self.job_terms_and_features(job_profile, "categories")
+        if not job_categories:
             return []
-
-        # --- Step 2: Category similarity ---
-        tfidf = TfidfVectorizer()
-        user_cat_matrix = tfidf.fit_transform(filtered["categories"])
-        job_cat_vector = tfidf.transform([", ".join(job_categories)])
-        cat_sim = cosine_similarity(job_cat_vector, user_cat_matrix).flatten()
-
-        # Step 2: Experience Level and Years of Experience Match
-        experience_map = {"entry": 1, "mid": 2, "senior": 3, "lead": 4}
-        filtered["experience_numeric"] = (
-            filtered["experience_level"].map(experience_map).fillna(0).astype(int)
+        return self.score_candidates(
+            user_data,
+            "categories",
+            job_categories,
+            job,
+            CATEGORY_WEIGHTS,
+            job_profile,
         )
-        job_experience_numeric = experience_map.get(job_experience, 1)
-
-        experience_match = filtered["experience_numeric"] >= job_experience_numeric
-        years_experience_match = (
-            filtered["years_of_experience"] >= job_years_of_experience
-        )
-
-        # Step 3: Location and Preferred Job Location Match
-        location_match = filtered["location"].str.lower() == job_location
-
-        # Step 4: Salary Match
-        salary_match = (
-            (filtered["min_salary"] <= job_max_salary)
-            & (filtered["max_salary"] >= job_min_salary)
-            & (filtered["currency_type"] == job_currency)
-        )
-
-        # Step 5: Scoring and Recommendations
-        scores = (
-            (0.6 * cat_sim)
-            + (0.15 * experience_match.astype(int))
-            + (0.1 * years_experience_match.astype(int))
-            + (0.1 * location_match.astype(int))
-            + (0.05 * salary_match.astype(int))
-        )
-
-        filtered = filtered.assign(match_score=scores)
-        top_users = filtered[filtered["match_score"] >= 0.4].nlargest(10, "match_score")
-
-        recommendations = [
-            {
-                "user_id": row["user_id"],
-                "user_name": row["user_name"],
-                "categories": row["categories"],
-                "user_location": row["location"],
-                "salary_range": f"{row['min_salary']} - {row['max_salary']} {row['currency_type']}",
-                "years_of_experience": row["years_of_experience"],
-                "experience_level": row["experience_level"],
-                "match_score": round(row["match_score"], 3),
-            }
-            for _, row in top_users.iterrows()
-        ]
-
-        return recommendations
 
     def recommend_boost_jobs_for_user_preferences(self, pref, limit=20):
-        pref_job_types = set(pref.preferred_job_types or [])
-        pref_job_nature = set(pref.preferred_job_nature or [])
-        pref_locations = set([loc.lower() for loc in pref.preferred_locations or []])
-        pref_experience = set(pref.preferred_experience or [])
-        pref_skills = set(pref.preferred_skills.values_list("name", flat=True))
-        pref_categories = set(pref.preferred_categories.values_list("name", flat=True))
-        min_salary = pref.min_salary or 0
-        max_salary = pref.max_salary or 0
-
-        qs = BoostJobs.objects.all()
-
-        if pref_job_types:
-            qs = qs.filter(job_type__in=pref_job_types)
-
-        if pref_job_nature:
-            qs = qs.filter(job_nature__in=pref_job_nature)
-
-        if pref_experience:
-            qs = qs.filter(experience_level__in=pref_experience)
-
-        if pref_locations:
-            qs = qs.filter(location__in=pref_locations)
-
-        qs = qs.prefetch_related("job_skills", "job_categories")
-
-        MAX_SCORE = 150
-        scored = []
-
-        for job in qs:
-            score = 0
-
-            score += 25 if job.job_type in pref_job_types else 0
-            score += 20 if job.job_nature in pref_job_nature else 0
-            score += 25 if (job.location or "").lower() in pref_locations else 0
-            score += 20 if job.experience_level in pref_experience else 0
-
-            if job.min_salary and job.max_salary and min_salary and max_salary:
-                if job.min_salary >= min_salary and job.max_salary <= max_salary:
-                    score += 10
-
-            job_skills = {s.name for s in job.job_skills.all()}
-            matched_skills = job_skills & pref_skills
-            score += min(len(matched_skills) * 5, 30)
-
-            job_categories = {c.name for c in job.job_categories.all()}
-            matched_categories = job_categories & pref_categories
-            score += min(len(matched_categories) * 10, 20)
-
-            if score:
-                normalized = (score / MAX_SCORE) * 100
-                if normalized >= 10:
-                    scored.append((normalized, job))
-
-        # 🔥 NO FULL SORT
-        top = heapq.nlargest(limit, scored, key=lambda x: x[0])
-
-        return [(job, score) for score, job in top]
+        """
+        Top BoostJobs for a user's JobPreference as [(job, score)], with the
+        score normalized to 0-100. Scored and ranked in SQL; see boost_scoring.
+        """
+        return recommend_boost_jobs(pref, limit=limit)
@@ -0,0 +1,49 @@
+import numpy as np
+
+# Scoring kernels shared by CandidateScorer and the shard worker processes.
+# Spawned shard workers import this without Django, so no models here.
+
+
+def top_k_positions(scores, k):
+    """Indices of the k highest scores, best first, via argpartition."""
+    if k <= 0 or not len(scores):
+        return np.empty(0, dtype=np.int64)
+    if len(scores) > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def structured_scores(features, rows, job, weights):
+    """
+    Non-text score terms for candidate `rows`. Job values may be scalars or
+    (n_jobs, 1) columns, in which case the result broadcasts to a matrix.
+    """
+    experience = features["experience"][rows] >= job["experience"]
+    years = features["years"][rows] >= job["years"]
+    location = features["location"][rows] == job["location_code"]
+    salary = (
+        (features["min_salary"][rows] <= job["max_salary"])
+        & (features["max_salary"][rows] >= job["min_salary"])
+        & (features["currency"][rows] == job["currency_code"])
+    )
+    return (
+        weights["experience"] * experience
+        + weights["years"] * years
+        + weights["location"] * location
+        + weights["salary"] * salary
+    )
+
+
+def local_top_k(matrix, features, rows, query, job, weights, k, min_score):
+    """
+    (rows, scores) of the best k among `rows` scoring at least `min_score`;
+    `query` is a dense, L2-normalized vector over the vocabulary.
+    """
+    scores = weights["text"] * (matrix[rows] @ query) + structured_scores(
+        features, rows, job, weights
+    )
+    eligible = np.flatnonzero(scores >= min_score)
+    best = eligible[top_k_positions(scores[eligible], k)]
+    return rows[best], scores[best]
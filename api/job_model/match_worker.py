@@ -0,0 +1,412 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import BoostJobs, IngestedJob, MatchingTask, Profile
+from .boost_feed import update_feeds_for_boost_job
+from .ingest import match_ingested_job, match_ingested_jobs
+from .job_index import rematch_candidate
+from .job_recommender import JobAppMatching
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+
+def recommended_applicant_details(recommended_users):
+    """Expand category matches into the applicant dicts the job endpoints return."""
+    user_ids = [u["user_id"] for u in recommended_users]
+    profiles = (
+        Profile.objects.filter(user_id__in=user_ids)
+        .select_related("user")
+        .prefetch_related("categories")
+    )
+    profile_map = {p.user_id: p for p in profiles}
+
+    applicants = []
+    for user_data in recommended_users:
+        profile = profile_map.get(user_data["user_id"])
+        if not profile:
+            continue
+        applicants.append(
+            {
+                "user_id": profile.user.id,
+                "user_name": profile.user.first_name,
+                "user_email": profile.user.email,
+                "user_bio": profile.bio,
+                "image": profile.image.url if profile.image else None,
+                "match_score": user_data["match_score"],
+                "years_of_experience": profile.years_of_experience,
+                "salary_range": user_data["salary_range"],
+                "currency": profile.currency,
+                "location": profile.location,
+                "employment_choice": profile.employment_type,
+                "job_location_choice": profile.job_location,
+                "categories": [c.name for c in profile.categories.all()],
+            }
+        )
+    return applicants
+
+
+def match_job(job_id, matcher=None):
+    """Category-based matching for a posted Job (see job_create_with_categories)."""
+    matcher = matcher or JobAppMatching()
+    job_data = matcher.load_job_from_db(job_id)
+    if not job_data:
+        raise ValueError("Job data could not be retrieved.")
+
+    user_profiles = matcher.load_users_for_job(job_data)
+    if user_profiles.empty or not user_profiles.has_terms("categories"):
+        return []
+
+    recommended_users = matcher.recommend_users_categories(job_data, user_profiles)
+    return recommended_applicant_details(recommended_users)
+
+
+def enqueue_matching(kind, object_id):
+    """
+    Queue matching for a Job or IngestedJob and return the task. Depending on
+    MATCHING_WORKER_MODE the task is picked up by this process's background
+    thread ("thread"), by `manage.py run_match_worker` ("command"), or run
+    right after the current transaction commits ("sync").
+    """
+    task = MatchingTask.objects.create(kind=kind, object_id=object_id)
+    _schedule()
+    return task
+
+
+def enqueue_matching_many(kind, object_ids):
+    """
+    Queue matching for many objects with one insert. The worker claims
+    pending tasks in batches, so ingested jobs queued together are scored
+    together (see match_ingested_jobs).
+    """
+    tasks = MatchingTask.objects.bulk_create(
+        MatchingTask(kind=kind, object_id=object_id) for object_id in object_ids
+    )
+    if tasks:
+        _schedule()
+    return tasks
+
+
+def enqueue_rematch(user_ids):
+    """
+    Queue reverse matching for candidates whose profile changed. A profile
+    edit fires several signals, so users that already have a pending task
+    are skipped.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return []
+    pending = set(
+        MatchingTask.objects.filter(
+            kind=MatchingTask.Kind.CANDIDATE,
+            status=MatchingTask.Status.PENDING,
+            object_id__in=user_ids,
+        ).values_list("object_id", flat=True)
+    )
+    tasks = MatchingTask.objects.bulk_create(
+        MatchingTask(kind=MatchingTask.Kind.CANDIDATE, object_id=user_id)
+        for user_id in sorted(user_ids - pending)
+    )
+    if tasks:
+        _schedule()
+    return tasks
+
+
+def enqueue_boost_feed_update(boost_job_id):
+    """
+    Queue re-scoring a posted or edited BoostJob against the materialized
+    feeds (see update_feeds_for_boost_job). Skipped if the job already has a
+    pending task, which will read its latest state.
+    """
+    pending = MatchingTask.objects.filter(
+        kind=MatchingTask.Kind.BOOST_JOB,
+        status=MatchingTask.Status.PENDING,
+        object_id=boost_job_id,
+    ).first()
+    if pending is not None:
+        return pending
+    return enqueue_matching(MatchingTask.Kind.BOOST_JOB, boost_job_id)
+
+
+def _schedule():
+    mode = getattr(settings, "MATCHING_WORKER_MODE", "thread")
+    if mode == "thread":
+        transaction.on_commit(background_worker.wake)
+    elif mode == "sync":
+        transaction.on_commit(process_pending)
+
+
+def latest_task(kind, object_id):
+    return (
+        MatchingTask.objects.filter(kind=kind, object_id=object_id)
+        .order_by("-id")
+        .first()
+    )
+
+
+def task_timeout():
+    return getattr(settings, "MATCHING_TASK_TIMEOUT", 600)
+
+
+def requeue_stale_tasks():
+    """
+    Put back running tasks whose heartbeat stopped for MATCHING_TASK_TIMEOUT
+    seconds (their worker died), failing them after MAX_ATTEMPTS.
+    """
+    cutoff = timezone.now() - timedelta(seconds=task_timeout())
+    stale = MatchingTask.objects.filter(
+        status=MatchingTask.Status.RUNNING, updated_at__lt=cutoff
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=MatchingTask.Status.FAILED,
+        error="Timed out",
+        updated_at=timezone.now(),
+    )
+    stale.update(status=MatchingTask.Status.PENDING, updated_at=timezone.now())
+
+
+def claim_tasks(limit):
+    """Atomically move up to `limit` pending tasks to running."""
+    with transaction.atomic():
+        tasks = list(
+            MatchingTask.objects.select_for_update(skip_locked=True)
+            .filter(status=MatchingTask.Status.PENDING)
+            .order_by("id")[:limit]
+        )
+        MatchingTask.objects.filter(id__in=[t.id for t in tasks]).update(
+            status=MatchingTask.Status.RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+    for task in tasks:
+        task.status = MatchingTask.Status.RUNNING
+        task.attempts += 1
+    return tasks
+
+
+def _claimed(tasks):
+    """Q matching `tasks` only while they still run under this claim."""
+    claimed = Q(pk__in=[])
+    for task in tasks:
+        claimed |= Q(id=task.id, attempts=task.attempts)
+    return claimed & Q(status=MatchingTask.Status.RUNNING)
+
+
+class Heartbeat:
+    """
+    Renews updated_at of claimed tasks every third of MATCHING_TASK_TIMEOUT
+    while they run, so requeue_stale_tasks only takes back tasks whose
+    worker died, not slow ones.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="matching-heartbeat", daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stop.wait(task_timeout() / 3):
+                MatchingTask.objects.filter(_claimed(self.tasks)).update(
+                    updated_at=timezone.now()
+                )
+        except Exception:
+            logger.exception("Matching task heartbeat failed")
+        finally:
+            connection.close()
+
+
+def _finish(task, status, result=None, error=None):
+    """
+    Record a task's outcome, unless it was taken back and claimed again
+    (its attempts moved on) meanwhile; that run's outcome wins.
+    """
+    task.status = status
+    task.result = result if result is not None else {}
+    task.error = error
+    finished = MatchingTask.objects.filter(_claimed([task])).update(
+        status=status, result=task.result, error=error, updated_at=timezone.now()
+    )
+    if not finished:
+        logger.warning(f"Matching task {task.id} was taken back before it finished")
+
+
+def _fail(task, error):
+    """
+    Record a failed run: the task goes back to pending for another attempt
+    and fails for good after MAX_ATTEMPTS. Returns whether it failed for good.
+    """
+    final = task.attempts >= MAX_ATTEMPTS
+    status = MatchingTask.Status.FAILED if final else MatchingTask.Status.PENDING
+    _finish(task, status, error=error)
+    return final
+
+
+def _run_ingested_tasks(tasks, matcher):
+    jobs = IngestedJob.objects.in_bulk([t.object_id for t in tasks])
+    found = [jobs[t.object_id] for t in tasks if t.object_id in jobs]
+
+    errors = {}
+    try:
+        matches = match_ingested_jobs(found, matcher)
+    except Exception:
+        # Find the job that broke the batch; the others still get matched.
+        # Jobs saved before the failure are matched again, which is harmless
+        logger.exception("Batch matching failed; matching jobs one by one")
+        matches = {}
+        for job in found:
+            try:
+                matches[job.id] = match_ingested_job(job, matcher)
+            except Exception as e:
+                logger.exception(f"Matching failed for ingested job {job.id}")
+                errors[job.id] = str(e)
+
+    for task in tasks:
+        if task.object_id in errors:
+            if _fail(task, errors[task.object_id]):
+                # save(), not update(), so the job index hears about it; its
+                # previous matches are kept
+                job = jobs[task.object_id]
+                job.status = "failed"
+                job.save(update_fields=["status", "updated_at"])
+            continue
+        if task.object_id not in matches:
+            _finish(task, MatchingTask.Status.FAILED, error="Ingested job not found")
+            continue
+        _finish(
+            task,
+            MatchingTask.Status.DONE,
+            result={"match_count": len(matches[task.object_id])},
+        )
+
+
+def _run_job_task(task, matcher):
+    try:
+        applicants = match_job(task.object_id, matcher)
+    except Exception as e:
+        logger.exception(f"Matching failed for job {task.object_id}")
+        _fail(task, str(e))
+        return
+    _finish(
+        task, MatchingTask.Status.DONE, result={"recommended_applicants": applicants}
+    )
+
+
+def _run_candidate_tasks(tasks):
+    tasks_by_user = {}
+    for task in tasks:
+        tasks_by_user.setdefault(task.object_id, []).append(task)
+
+    for user_id, user_tasks in tasks_by_user.items():
+        try:
+            result = rematch_candidate(user_id)
+        except Exception as e:
+            logger.exception(f"Reverse matching failed for user {user_id}")
+            for task in user_tasks:
+                _fail(task, str(e))
+            continue
+        for task in user_tasks:
+            _finish(task, MatchingTask.Status.DONE, result=result)
+
+
+def _run_boost_tasks(tasks):
+    jobs = BoostJobs.objects.in_bulk({t.object_id for t in tasks})
+    for task in tasks:
+        job = jobs.get(task.object_id)
+        if job is None:
+            _finish(task, MatchingTask.Status.FAILED, error="Boost job not found")
+            continue
+        try:
+            feed_count = update_feeds_for_boost_job(job)
+        except Exception as e:
+            logger.exception(f"Feed update failed for boost job {job.id}")
+            _fail(task, str(e))
+            continue
+        _finish(task, MatchingTask.Status.DONE, result={"feed_count": feed_count})
+
+
+def process_pending(limit=None):
+    """Run one batch of pending tasks. Returns how many tasks were claimed."""
+    limit = limit or getattr(settings, "MATCHING_WORKER_BATCH_SIZE", 50)
+    requeue_stale_tasks()
+    tasks = claim_tasks(limit)
+    if not tasks:
+        return 0
+
+    with Heartbeat(tasks):
+        _run_tasks(tasks)
+    return len(tasks)
+
+
+def _run_tasks(tasks):
+    matcher = JobAppMatching()
+    ingested_tasks = [t for t in tasks if t.kind == MatchingTask.Kind.INGESTED_JOB]
+    if ingested_tasks:
+        _run_ingested_tasks(ingested_tasks, matcher)
+    for task in tasks:
+        if task.kind == MatchingTask.Kind.JOB:
+            _run_job_task(task, matcher)
+    candidate_tasks = [t for t in tasks if t.kind == MatchingTask.Kind.CANDIDATE]
+    if candidate_tasks:
+        _run_candidate_tasks(candidate_tasks)
+    boost_tasks = [t for t in tasks if t.kind == MatchingTask.Kind.BOOST_JOB]
+    if boost_tasks:
+        _run_boost_tasks(boost_tasks)
+
+
+class BackgroundMatcher:
+    """
+    Daemon thread that drains the matching queue inside a web worker. It is
+    started lazily on the first enqueue, i.e. after gunicorn has forked.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def wake(self):
+        self.start()
+        self._event.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="matching-worker", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        interval = getattr(settings, "MATCHING_WORKER_POLL_INTERVAL", 5)
+        while True:
+            self._event.wait(timeout=interval)
+            self._event.clear()
+            try:
+                while process_pending():
+                    pass
+            except Exception:
+                logger.exception("Matching worker iteration failed")
+            finally:
+                close_old_connections()
+
+
+background_worker = BackgroundMatcher()
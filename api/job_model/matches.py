@@ -0,0 +1,66 @@
+from ..models import MatchResult
+
+# Best matches first; id breaks ties so keyset cursors are unique. Both read
+# paths are served by a (owner, -match_score, -id) index on MatchResult
+MATCH_ORDERING = ("-match_score", "-id")
+
+# Stored match fields returned by get_ingested_job_matches
+MATCH_FIELDS = (
+    "id",
+    "user_id",
+    "user_name",
+    "user_email",
+    "match_score",
+    "skills",
+    "location",
+    "years_of_experience",
+    "experience_level",
+    "salary_range",
+)
+
+# IngestedJob fields returned with a user's matches; description and
+# raw_payload are never loaded on this path
+MATCHED_JOB_FIELDS = (
+    "id",
+    "title",
+    "company",
+    "location",
+    "remote",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "required_skills",
+    "preferred_skills",
+    "years_experience",
+    "employment_type",
+)
+
+
+def _min_score(matches, min_score):
+    if min_score is not None:
+        matches = matches.filter(match_score__gte=min_score)
+    return matches
+
+
+def job_matches(ingested_job_id, min_score=None):
+    """Matches of one ingested job, with only the fields the API returns."""
+    matches = MatchResult.objects.filter(ingested_job_id=ingested_job_id).only(
+        *MATCH_FIELDS
+    )
+    return _min_score(matches, min_score)
+
+
+def user_matches(user_id, min_score=None):
+    """A candidate's matches joined to their jobs, skipping the job's text."""
+    matches = (
+        MatchResult.objects.filter(user_id=user_id)
+        .select_related("ingested_job")
+        .only(
+            "id",
+            "match_score",
+            "created_at",
+            "ingested_job",
+            *(f"ingested_job__{name}" for name in MATCHED_JOB_FIELDS),
+        )
+    )
+    return _min_score(matches, min_score)
@@ -0,0 +1,156 @@
+import hashlib
+import io
+import logging
+import threading
+import time
+
+import joblib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import RecommenderModel
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the active version of a name changes, so workers notice at
+# once instead of at their next periodic check (requires a shared cache)
+MODEL_STAMP_KEY = "model_registry_stamp:{name}"
+
+
+class ChecksumMismatch(Exception):
+    pass
+
+
+def serialize_artifact(artifact):
+    buffer = io.BytesIO()
+    joblib.dump(artifact, buffer)
+    return buffer.getvalue()
+
+
+def deserialize_artifact(row):
+    """The artifact stored in `row`, after verifying its checksum."""
+    data = bytes(row.model_data)
+    if row.checksum and hashlib.sha256(data).hexdigest() != row.checksum:
+        raise ChecksumMismatch(f"{row} does not match its checksum")
+    return joblib.load(io.BytesIO(data))
+
+
+def _bump_stamp(name):
+    key = MODEL_STAMP_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def publish_model(name, artifact, activate=True):
+    """
+    Store `artifact` as the next version of `name` and, by default, make it
+    the active one. Returns the new RecommenderModel row.
+    """
+    data = serialize_artifact(artifact)
+    with transaction.atomic():
+        # Lock the name's rows so concurrent publishes get distinct versions
+        # (the name/version constraint covers the very first publish)
+        rows = RecommenderModel.objects.select_for_update().filter(name=name)
+        latest = max(rows.values_list("version", flat=True), default=0)
+        if activate:
+            rows.filter(is_active=True).update(is_active=False)
+        row = RecommenderModel.objects.create(
+            name=name,
+            version=latest + 1,
+            model_data=data,
+            checksum=hashlib.sha256(data).hexdigest(),
+            is_active=activate,
+        )
+        transaction.on_commit(lambda: _bump_stamp(name))
+    return row
+
+
+def activate_model(name, version):
+    """Make an existing version of `name` the active one, e.g. to roll back."""
+    with transaction.atomic():
+        rows = RecommenderModel.objects.select_for_update().filter(name=name)
+        row = rows.get(version=version)
+        rows.filter(is_active=True).exclude(id=row.id).update(is_active=False)
+        if not row.is_active:
+            row.is_active = True
+            row.save(update_fields=["is_active"])
+        transaction.on_commit(lambda: _bump_stamp(name))
+    return row
+
+
+class ModelCache:
+    """
+    Per-worker cache of active registry artifacts. Each artifact is loaded
+    once; a new version is picked up when the shared stamp of its name
+    changes, or at the latest after MODEL_REGISTRY_REFRESH_INTERVAL seconds,
+    by comparing the active row's id (one indexed query, no model_data).
+    """
+
+    def __init__(self):
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _active_id(self, name):
+        return (
+            RecommenderModel.objects.filter(name=name, is_active=True)
+            .values_list("id", flat=True)
+            .first()
+        )
+
+    def get(self, name):
+        """The active artifact of `name`, or None if none was published."""
+        interval = getattr(settings, "MODEL_REGISTRY_REFRESH_INTERVAL", 60)
+        stamp = cache.get(MODEL_STAMP_KEY.format(name=name))
+        now = time.monotonic()
+        with self._lock:
+            loaded = self._loaded.get(name)
+            if (
+                loaded is not None
+                and loaded["stamp"] == stamp
+                and now - loaded["checked_at"] < interval
+            ):
+                return loaded["artifact"]
+
+            active_id = self._active_id(name)
+            if active_id is None:
+                self._loaded.pop(name, None)
+                return None
+            if loaded is None or loaded["row_id"] != active_id:
+                row = RecommenderModel.objects.get(id=active_id)
+                try:
+                    artifact = deserialize_artifact(row)
+                except ChecksumMismatch:
+                    logger.exception("Not loading %s", row)
+                    if loaded is None:
+                        return None
+                    loaded.update(stamp=stamp, checked_at=now)
+                    return loaded["artifact"]
+                loaded = self._loaded[name] = {
+                    "row_id": row.id,
+                    "version": row.version,
+                    "artifact": artifact,
+                }
+            loaded.update(stamp=stamp, checked_at=now)
+            return loaded["artifact"]
+
+    def version(self, name):
+        """Registry version of the artifact this worker has loaded."""
+        loaded = self._loaded.get(name)
+        return loaded["version"] if loaded else None
+
+    def warm_up(self, names=None):
+        """Load the active artifacts of `names` (default: every name)."""
+        if names is None:
+            names = (
+                RecommenderModel.objects.filter(is_active=True)
+                .values_list("name", flat=True)
+                .distinct()
+            )
+        for name in list(names):
+            self.get(name)
+
+
+model_cache = ModelCache()
@@ -0,0 +1,120 @@
+import sys
+
+import numpy as np
+
+
+def normalize_term(term):
+    return term.strip().lower()
+
+
+def split_terms(document, delimiter=";"):
+    """Split a delimited skills/categories string into normalized terms."""
+    if not document:
+        return set()
+    return {normalize_term(t) for t in document.split(delimiter) if t.strip()}
+
+
+class PostingListIndex:
+    """
+    Inverted index from a normalized term (skill or category) to the sorted
+    array of candidate ids that carry it. Lookups are exact term matches, so
+    "java" no longer matches users who only list "javascript".
+    """
+
+    def __init__(self, postings=None):
+        self._postings = postings or {}
+
+    @classmethod
+    def from_documents(cls, ids, documents, delimiter=";"):
+        lists = {}
+        for candidate_id, document in zip(ids, documents):
+            for term in split_terms(document, delimiter):
+                lists.setdefault(term, []).append(candidate_id)
+        return cls(
+            {term: np.unique(np.array(id_list, dtype=np.int64)) for term, id_list in lists.items()}
+        )
+
+    @classmethod
+    def from_csr(cls, terms, indptr, ids):
+        """Inverse of to_csr; the posting arrays are views into `ids`."""
+        return cls(
+            {term: ids[indptr[i] : indptr[i + 1]] for i, term in enumerate(terms)}
+        )
+
+    def to_csr(self):
+        """(terms, indptr, ids): every posting list concatenated, CSR style."""
+        terms = sorted(self._postings)
+        lists = [self._postings[term] for term in terms]
+        indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(posting) for posting in lists], dtype=np.int64)
+        ids = np.concatenate(lists) if lists else np.empty(0, dtype=np.int64)
+        return terms, indptr, ids.astype(np.int64)
+
+    def __contains__(self, term):
+        return normalize_term(term) in self._postings
+
+    def __len__(self):
+        return len(self._postings)
+
+    def terms(self):
+        return self._postings.keys()
+
+    def get(self, term):
+        return self._postings.get(normalize_term(term), np.empty(0, dtype=np.int64))
+
+    def lookup(self, terms):
+        """Sorted ids of candidates carrying at least one of `terms`."""
+        lists = [self._postings.get(normalize_term(t)) for t in terms]
+        lists = [p for p in lists if p is not None and len(p)]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        if len(lists) == 1:
+            return lists[0]
+        return np.unique(np.concatenate(lists))
+
+    def add(self, candidate_id, terms):
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                self._postings[term] = np.array([candidate_id], dtype=np.int64)
+                continue
+            position = np.searchsorted(posting, candidate_id)
+            if position < len(posting) and posting[position] == candidate_id:
+                continue
+            self._postings[term] = np.insert(posting, position, candidate_id)
+
+    def remove(self, candidate_id, terms):
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            position = np.searchsorted(posting, candidate_id)
+            if position < len(posting) and posting[position] == candidate_id:
+                posting = np.delete(posting, position)
+                if len(posting):
+                    self._postings[term] = posting
+                else:
+                    del self._postings[term]
+
+    def nbytes(self):
+        """Approximate heap size of the terms and their posting arrays."""
+        return sum(
+            sys.getsizeof(term) + posting.nbytes
+            for term, posting in self._postings.items()
+        )
+
+    def update(self, candidate_id, old_terms, new_terms):
+        self.remove(candidate_id, old_terms - new_terms)
+        self.add(candidate_id, new_terms - old_terms)
+
+
+def positions_of(ids, wanted, assume_sorted=False):
+    """Positions in `ids` of the values in `wanted` (values not found are dropped)."""
+    if not len(wanted) or not len(ids):
+        return np.empty(0, dtype=np.int64)
+    if not assume_sorted:
+        return np.flatnonzero(np.isin(ids, wanted))
+    positions = np.searchsorted(ids, wanted)
+    found = positions < len(ids)
+    found[found] = ids[positions[found]] == wanted[found]
+    return positions[found]
@@ -0,0 +1,326 @@
+import time
+
+import numpy as np
+from django.utils import timezone
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from ..models import Applicant, IngestedJob, Jobs, MatchResult, User
+from .candidate_index import COLUMNS, fetch_candidate_rows
+from .model_registry import model_cache, publish_model
+from .posting_index import split_terms
+
+# Model registry name of the applicant-ranking model
+RANKER_NAME = "applicant_ranker"
+
+# Job sources a training pair can come from
+POSTED, INGESTED = "job", "ingested_job"
+
+# Shortlist rows reranked between two checks of the rerank deadline
+RERANK_BATCH_SIZE = 64
+
+_SKILLS, _CATEGORIES = COLUMNS.index("skills"), COLUMNS.index("categories")
+_YEARS, _LOCATION = COLUMNS.index("years_of_experience"), COLUMNS.index("location")
+_MIN_SALARY, _MAX_SALARY = COLUMNS.index("min_salary"), COLUMNS.index("max_salary")
+_CURRENCY = COLUMNS.index("currency_type")
+
+
+def document_terms(document):
+    """Analyzer for "a;b" documents (module level, so it pickles)."""
+    return sorted(split_terms(document))
+
+
+class PairFeaturizer:
+    """
+    Sparse features of (candidate, job) pairs: the hashed terms of both
+    sides, their element-wise product (the shared terms) and a few
+    structured matches. Hashing is stateless, so nothing is fitted and
+    training can stream. Each distinct user and job is vectorized once per
+    chunk and gathered per pair by row index, never stacked per user.
+    """
+
+    STRUCTURED = ("overlap", "years", "salary", "location", "bias")
+
+    def __init__(self, n_features=2**18):
+        self.n_features = n_features
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            analyzer=document_terms,
+            alternate_sign=False,
+            norm="l2",
+        )
+
+    def transform(self, user_rows, job_profiles, user_ids, job_ids):
+        """
+        Feature matrix with one row per (user_ids[i], job_ids[i]). Rows come
+        from fetch_candidate_rows and profiles from job_profiles().
+        """
+        users = list(user_rows)
+        jobs = list(job_profiles)
+        user_positions = np.searchsorted(users, user_ids)
+        job_positions = np.searchsorted(jobs, job_ids)
+
+        user_matrix = self.hasher.transform(
+            f"{user_rows[u][_SKILLS]};{user_rows[u][_CATEGORIES]}" for u in users
+        )
+        job_matrix = self.hasher.transform(job_profiles[j]["document"] for j in jobs)
+        user_vectors = user_matrix[user_positions]
+        job_vectors = job_matrix[job_positions]
+        overlap = user_vectors.multiply(job_vectors).tocsr()
+
+        def user_column(position):
+            values = [user_rows[u][position] or 0 for u in users]
+            return np.array(values, dtype=np.int64)[user_positions]
+
+        def job_column(name):
+            values = [job_profiles[j][name] or 0 for j in jobs]
+            return np.array(values, dtype=np.int64)[job_positions]
+
+        def user_labels(position):
+            values = [user_rows[u][position] for u in users]
+            return np.array(values, dtype=object)[user_positions]
+
+        def job_labels(name):
+            values = [job_profiles[j][name] for j in jobs]
+            return np.array(values, dtype=object)[job_positions]
+
+        structured = np.column_stack(
+            [
+                np.asarray(overlap.sum(axis=1)).ravel(),
+                user_column(_YEARS) >= job_column("years"),
+                (user_column(_MIN_SALARY) <= job_column("max_salary"))
+                & (user_column(_MAX_SALARY) >= job_column("min_salary"))
+                & (user_labels(_CURRENCY) == job_labels("currency")),
+                user_labels(_LOCATION) == job_labels("location"),
+                np.ones(len(user_positions)),
+            ]
+        ).astype(np.float64)
+        return sparse.hstack(
+            [user_vectors, job_vectors, overlap, sparse.csr_matrix(structured)],
+            format="csr",
+        )
+
+
+def job_profiles(kind, job_ids):
+    """
+    {job id: profile} with the fields PairFeaturizer reads, in a constant
+    number of queries for any number of jobs.
+    """
+    profiles = {}
+    if kind == INGESTED:
+        for job in (
+            IngestedJob.objects.filter(id__in=job_ids)
+            .values(
+                "id",
+                "required_skills",
+                "preferred_skills",
+                "years_experience",
+                "location",
+                "salary_min",
+                "salary_max",
+                "salary_currency",
+            )
+            .iterator()
+        ):
+            profiles[job["id"]] = {
+                "document": ";".join(
+                    (job["required_skills"] or []) + (job["preferred_skills"] or [])
+                ),
+                "years": job["years_experience"],
+                "location": (job["location"] or "").lower(),
+                "min_salary": job["salary_min"],
+                "max_salary": job["salary_max"],
+                "currency": job["salary_currency"] or "",
+            }
+        return dict(sorted(profiles.items()))
+
+    terms = {}
+    for through, name in (
+        (Jobs.skills.through, "jobskills__name"),
+        (Jobs.categories.through, "usercategories__name"),
+    ):
+        for job_id, term in (
+            through.objects.filter(jobs_id__in=job_ids)
+            .values_list("jobs_id", name)
+            .iterator()
+        ):
+            terms.setdefault(job_id, []).append(term)
+    for job in (
+        Jobs.objects.filter(id__in=job_ids)
+        .values(
+            "id",
+            "years_of_experience",
+            "location",
+            "min_salary",
+            "max_salary",
+            "currency_type",
+        )
+        .iterator()
+    ):
+        profiles[job["id"]] = {
+            "document": ";".join(terms.get(job["id"], ())),
+            "years": job["years_of_experience"],
+            "location": (job["location"] or "").lower(),
+            "min_salary": job["min_salary"],
+            "max_salary": job["max_salary"],
+            "currency": job["currency_type"] or "",
+        }
+    return dict(sorted(profiles.items()))
+
+
+def _keyset(queryset, fields, chunk_size):
+    """values_list() rows of `queryset` in id order, chunk by chunk."""
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", *fields)[:chunk_size]
+        )
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+def applicant_pairs(chunk_size, negatives, rng):
+    """
+    (kind, user_ids, job_ids, labels) chunks from Applicant: every
+    application is a positive, plus `negatives` random candidates per
+    application that did not apply to that job.
+    """
+    candidates = np.fromiter(
+        User.objects.filter(company=False).values_list("id", flat=True).iterator(),
+        dtype=np.int64,
+    )
+    for rows in _keyset(Applicant.objects.all(), ("user_id", "job_id"), chunk_size):
+        user_ids = np.array([row[1] for row in rows], dtype=np.int64)
+        job_ids = np.array([row[2] for row in rows], dtype=np.int64)
+        labels = np.ones(len(rows), dtype=np.int8)
+        if negatives and len(candidates):
+            sampled_jobs = np.repeat(job_ids, negatives)
+            sampled_users = rng.choice(candidates, size=len(sampled_jobs))
+            applied = set(zip(user_ids.tolist(), job_ids.tolist()))
+            keep = np.array(
+                [
+                    (u, j) not in applied
+                    for u, j in zip(sampled_users.tolist(), sampled_jobs.tolist())
+                ],
+                dtype=bool,
+            )
+            user_ids = np.concatenate([user_ids, sampled_users[keep]])
+            job_ids = np.concatenate([job_ids, sampled_jobs[keep]])
+            labels = np.concatenate([labels, np.zeros(keep.sum(), dtype=np.int8)])
+        yield POSTED, user_ids, job_ids, labels
+
+
+def match_result_pairs(chunk_size, threshold):
+    """
+    (kind, user_ids, job_ids, labels) chunks from MatchResult: stored
+    matches scoring at least `threshold` are positives, the rest negatives.
+    """
+    fields = ("user_id", "ingested_job_id", "match_score")
+    for rows in _keyset(MatchResult.objects.all(), fields, chunk_size):
+        yield (
+            INGESTED,
+            np.array([row[1] for row in rows], dtype=np.int64),
+            np.array([row[2] for row in rows], dtype=np.int64),
+            np.array([row[3] >= threshold for row in rows], dtype=np.int8),
+        )
+
+
+def features_for(featurizer, kind, user_ids, job_ids):
+    """
+    Features of the pairs whose user and job still exist, and the mask of
+    those pairs. Costs a constant number of queries per call.
+    """
+    user_rows = fetch_candidate_rows(np.unique(user_ids).tolist())
+    profiles = job_profiles(kind, np.unique(job_ids).tolist())
+    known = np.isin(user_ids, list(user_rows)) & np.isin(job_ids, list(profiles))
+    if not known.any():
+        return None, known
+    matrix = featurizer.transform(user_rows, profiles, user_ids[known], job_ids[known])
+    return matrix, known
+
+
+def new_ranker(featurizer, seed=0):
+    return {
+        "featurizer": featurizer,
+        # Logistic loss, so the ranker outputs probabilities; linear, so
+        # partial_fit over hashed features stays cheap at any vocabulary size
+        "model": SGDClassifier(loss="log_loss", alpha=1e-5, random_state=seed),
+        "pairs": 0,
+    }
+
+
+def partial_fit(ranker, matrix, labels):
+    ranker["model"].partial_fit(matrix, labels, classes=np.array([0, 1]))
+    ranker["pairs"] += matrix.shape[0]
+
+
+def publish_ranker(ranker, metrics):
+    return publish_model(
+        RANKER_NAME,
+        dict(ranker, trained_at=timezone.now().isoformat(), metrics=metrics),
+    )
+
+
+def score_pairs(kind, user_ids, job_ids):
+    """
+    Probability that each user is a good applicant for the paired job under
+    the active ranker, or None if no ranker was published. Pairs whose user
+    or job no longer exists score 0.
+    """
+    ranker = model_cache.get(RANKER_NAME)
+    if ranker is None:
+        return None
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    job_ids = np.asarray(job_ids, dtype=np.int64)
+    scores = np.zeros(len(user_ids))
+    matrix, known = features_for(ranker["featurizer"], kind, user_ids, job_ids)
+    if matrix is not None:
+        scores[known] = ranker["model"].predict_proba(matrix)[:, 1]
+    return scores
+
+
+def index_rows(index, rows):
+    """fetch_candidate_rows-shaped {user id: row} for CandidateIndex `rows`."""
+    columns = [index.values(name, rows) for name in COLUMNS]
+    return dict(sorted((row[0], row) for row in zip(*columns)))
+
+
+def profile_for_ranking(job_profile):
+    """A recommend_users job profile as the profile PairFeaturizer reads."""
+    return {
+        "document": ";".join(
+            filter(None, (job_profile.get("skills"), job_profile.get("categories")))
+        ),
+        "years": job_profile.get("years_of_experience"),
+        "location": (job_profile.get("location") or "").strip().lower(),
+        "min_salary": job_profile.get("min_salary"),
+        "max_salary": job_profile.get("max_salary"),
+        "currency": job_profile.get("currency_type") or "",
+    }
+
+
+def rerank(ranker, index, rows, job_profile, deadline):
+    """
+    Ranker probabilities for CandidateIndex `rows` against one job profile.
+    Rows are scored in order, RERANK_BATCH_SIZE at a time, until the
+    time.perf_counter() `deadline` passes; rows not reached are NaN, so pass
+    the shortlist best first.
+    """
+    scores = np.full(len(rows), np.nan)
+    profiles = {0: profile_for_ranking(job_profile)}
+    for start in range(0, len(rows), RERANK_BATCH_SIZE):
+        if time.perf_counter() >= deadline:
+            break
+        batch = rows[start : start + RERANK_BATCH_SIZE]
+        user_rows = index_rows(index, batch)
+        user_ids = np.asarray(index.values("user_id", batch), dtype=np.int64)
+        matrix = ranker["featurizer"].transform(
+            user_rows, profiles, user_ids, np.zeros(len(batch), dtype=np.int64)
+        )
+        scores[start : start + len(batch)] = ranker["model"].predict_proba(matrix)[:, 1]
+    return scores
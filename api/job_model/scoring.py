@@ -0,0 +1,352 @@
+import threading
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from .kernels import structured_scores, top_k_positions
+from .sharded_scoring import FEATURE_NAMES, get_shard_pool, use_shards
+from .vectorizer_store import vectorizer_store
+
+EXPERIENCE_MAP = {"entry": 1, "mid": 2, "senior": 3, "lead": 4}
+
+# Weights used by recommend_users (skills) and recommend_users_categories
+SKILL_WEIGHTS = {
+    "text": 0.5,
+    "experience": 0.2,
+    "years": 0.1,
+    "location": 0.15,
+    "salary": 0.05,
+}
+CATEGORY_WEIGHTS = {
+    "text": 0.6,
+    "experience": 0.15,
+    "years": 0.1,
+    "location": 0.1,
+    "salary": 0.05,
+}
+
+MIN_MATCH_SCORE = 0.4
+TOP_K = 10
+
+
+class CandidateScorer:
+    """
+    Scoring engine over the resident candidate index: an L2-normalized CSR
+    matrix of every candidate's skill (or category) vector plus dense numpy
+    columns for the structured features. A request costs one sparse mat-vec,
+    a few vectorized comparisons and an argpartition.
+    """
+
+    def __init__(self, index, kind, vectorizer):
+        self.index = index
+        self.kind = kind
+        self.vectorizer = vectorizer
+        self._build(index)
+
+    @classmethod
+    def from_snapshot(cls, index, kind, vectorizer):
+        """
+        Scorer over the memory-mapped matrix of the snapshot `index` was
+        loaded from, patched up to the index's version. Returns None if the
+        snapshot has no matrix for `kind` or was built with another global
+        vectorizer than the current one.
+        """
+        snapshot = index.snapshot
+        info = snapshot.meta["vectorizers"].get(kind) if snapshot else None
+        if info is None:
+            return None
+        if info["version"] is None:
+            # Fitted over the snapshot's own candidates and stored with it
+            if vectorizer is not None:
+                return None
+            vectorizer = snapshot.load_object(f"vectorizer-{kind}")
+        elif vectorizer is None or vectorizer_store.version(kind) != info["version"]:
+            return None
+
+        scorer = cls.__new__(cls)
+        scorer.index, scorer.kind, scorer.vectorizer = index, kind, vectorizer
+        scorer.matrix = sparse.csr_matrix(
+            (
+                snapshot.array(f"matrix-{kind}-data"),
+                snapshot.array(f"matrix-{kind}-indices"),
+                snapshot.array(f"matrix-{kind}-indptr"),
+            ),
+            shape=tuple(info["shape"]),
+            copy=False,
+        )
+        scorer.features = {
+            name: snapshot.array(f"features-{kind}-{name}") for name in FEATURE_NAMES
+        }
+        scorer.version = snapshot.version
+        scorer.sync(index)
+        return scorer
+
+    def to_snapshot(self):
+        """Arrays to store in a snapshot, named for from_snapshot."""
+        arrays = {
+            f"matrix-{self.kind}-data": self.matrix.data,
+            f"matrix-{self.kind}-indices": self.matrix.indices,
+            f"matrix-{self.kind}-indptr": self.matrix.indptr,
+        }
+        for name in FEATURE_NAMES:
+            arrays[f"features-{self.kind}-{name}"] = self.features[name]
+        return arrays
+
+    def _vectors(self, documents):
+        return normalize(self.vectorizer.transform(documents), norm="l2").tocsr()
+
+    def _features(self, index, positions=None):
+        rows = slice(None) if positions is None else positions
+        columns = index.columns
+        # Experience rank per experience_level code
+        ranks = np.array(
+            [
+                EXPERIENCE_MAP.get(level, 0)
+                for level in index.codes["experience_level"].values
+            ],
+            dtype=np.int8,
+        )
+        return {
+            "experience": ranks[columns["experience_level"][rows]],
+            "years": columns["years_of_experience"][rows].astype(np.int32),
+            "min_salary": columns["min_salary"][rows].astype(np.int64),
+            "max_salary": columns["max_salary"][rows].astype(np.int64),
+            "currency": columns["currency_type"][rows].astype(np.int32),
+            "location": columns["location"][rows].astype(np.int32),
+        }
+
+    def _build(self, index):
+        self.matrix = self._vectors(index.documents(self.kind))
+        self.features = self._features(index)
+        self.version = index.version
+
+    def sync(self, index):
+        """Patch in rows that changed in the index since this scorer was built."""
+        if index.version == self.version:
+            return
+        positions = index.changed_since(self.version)
+        if positions is None:
+            # Too far behind for the index's change log
+            self._build(index)
+            return
+        n_rows = len(index.user_ids)
+
+        matrix = self.matrix
+        if matrix.shape[0] < n_rows:
+            padding = sparse.csr_matrix((n_rows - matrix.shape[0], matrix.shape[1]))
+            matrix = sparse.vstack([matrix, padding], format="csr")
+
+        if len(positions):
+            keep = np.ones(n_rows)
+            keep[positions] = 0
+            fresh = self._vectors(index.documents(self.kind, positions))
+            scatter = sparse.csr_matrix(
+                (np.ones(len(positions)), (positions, np.arange(len(positions)))),
+                shape=(n_rows, len(positions)),
+            )
+            matrix = (sparse.diags(keep) @ matrix + scatter @ fresh).tocsr()
+
+            features = self._features(index, positions)
+            for name, values in features.items():
+                column = self.features[name]
+                if len(column) < n_rows:
+                    column = np.resize(column, n_rows)
+                elif not column.flags.writeable:
+                    # Memory-mapped from a snapshot; copy before patching
+                    column = np.array(column)
+                column[positions] = values
+                self.features[name] = column
+
+        self.matrix = matrix
+        self.version = index.version
+
+    def _structured_scores(self, rows, job, weights):
+        return structured_scores(self.features, rows, job, weights)
+
+    def _encode_job(self, job):
+        codes = self.index.codes
+        return dict(
+            job,
+            location_code=codes["location"].lookup(job["location"]),
+            currency_code=codes["currency_type"].lookup(job["currency"]),
+        )
+
+    def score(self, rows, query, job, weights):
+        """Weighted match scores for candidate `rows` against one job."""
+        query_vector = self._vectors([query])
+        text = (self.matrix[rows] @ query_vector.T).toarray().ravel()
+        return weights["text"] * text + self._structured_scores(
+            rows, self._encode_job(job), weights
+        )
+
+    def recommend(
+        self, rows, query, job, weights, k=TOP_K, min_score=MIN_MATCH_SCORE
+    ):
+        """
+        Top-k candidates among `rows` scoring at least `min_score`, in the same
+        output schema as JobAppMatching.recommend_users(_categories).
+        """
+        return self.build_results(
+            *self.shortlist(rows, query, job, weights, k, min_score)
+        )
+
+    def shortlist(
+        self, rows, query, job, weights, k=TOP_K, min_score=MIN_MATCH_SCORE
+    ):
+        """
+        (rows, scores) of the top-k candidates among `rows` scoring at least
+        `min_score`, best first.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return rows, np.empty(0)
+        if use_shards(len(rows)):
+            best = get_shard_pool().top_k(
+                self,
+                rows,
+                self._vectors([query]),
+                self._encode_job(job),
+                weights,
+                k,
+                min_score,
+            )
+            if best is not None:
+                return best
+
+        scores = self.score(rows, query, job, weights)
+        eligible = np.flatnonzero(scores >= min_score)
+        best = eligible[top_k_positions(scores[eligible], k)]
+        return rows[best], scores[best]
+
+    def recommend_batch(
+        self,
+        rows_per_job,
+        queries,
+        jobs,
+        weights,
+        k=TOP_K,
+        min_score=MIN_MATCH_SCORE,
+        memory_budget=64 * 1024 * 1024,
+    ):
+        """
+        Top-k candidates for many jobs at once. Jobs are scored in chunks with
+        one (jobs x vocab) @ (vocab x candidates) product per chunk, the chunk
+        size chosen so the dense score block stays within `memory_budget`.
+        """
+        results = [[] for _ in queries]
+        if not len(queries):
+            return results
+
+        query_matrix = self._vectors(queries)
+        encoded = [self._encode_job(job) for job in jobs]
+        # ~4 dense float64 temporaries of shape (chunk, candidates) are alive at once
+        chunk_size = max(1, memory_budget // (max(1, self.matrix.shape[0]) * 8 * 4))
+
+        for start in range(0, len(queries), chunk_size):
+            stop = min(start + chunk_size, len(queries))
+            chunk_rows = [
+                np.asarray(rows_per_job[j], dtype=np.int64) for j in range(start, stop)
+            ]
+            columns = np.unique(
+                np.concatenate(chunk_rows + [np.empty(0, dtype=np.int64)])
+            )
+            if not len(columns):
+                continue
+
+            text = (query_matrix[start:stop] @ self.matrix[columns].T).toarray()
+            job = {
+                name: np.array([encoded[j][name] for j in range(start, stop)])[:, None]
+                for name in (
+                    "experience",
+                    "years",
+                    "location_code",
+                    "min_salary",
+                    "max_salary",
+                    "currency_code",
+                )
+            }
+            scores = weights["text"] * text + self._structured_scores(
+                columns, job, weights
+            )
+
+            # Only candidates that passed each job's own prefilter are eligible
+            allowed = np.zeros(scores.shape, dtype=bool)
+            for offset, rows in enumerate(chunk_rows):
+                allowed[offset, np.searchsorted(columns, rows)] = True
+            allowed &= scores >= min_score
+
+            for offset in range(stop - start):
+                eligible = np.flatnonzero(allowed[offset])
+                best = eligible[top_k_positions(scores[offset, eligible], k)]
+                results[start + offset] = self.build_results(
+                    columns[best], scores[offset, best]
+                )
+        return results
+
+    def build_results(self, rows, scores):
+        index = self.index
+        user_ids = index.values("user_id", rows)
+        names = index.values("user_name", rows)
+        documents = index.values(self.kind, rows)
+        locations = index.values("location", rows)
+        min_salaries = index.values("min_salary", rows)
+        max_salaries = index.values("max_salary", rows)
+        currencies = index.values("currency_type", rows)
+        years = index.values("years_of_experience", rows)
+        levels = index.values("experience_level", rows)
+        return [
+            {
+                "user_id": user_ids[i],
+                "user_name": names[i],
+                self.kind: documents[i],
+                "user_location": locations[i],
+                "salary_range": f"{min_salaries[i]} - {max_salaries[i]} {currencies[i]}",
+                "years_of_experience": years[i],
+                "experience_level": levels[i],
+                "match_score": round(float(scores[i]), 3),
+            }
+            for i in range(len(rows))
+        ]
+
+
+def build_scorer(index, kind, vectorizer=None):
+    """
+    A new scorer for `kind` over `index`. Without a fitted global vectorizer
+    one is fitted over the index's live candidates; returns None if there is
+    no vocabulary to score with.
+    """
+    if vectorizer is None:
+        vectorizer = TfidfVectorizer()
+        try:
+            vectorizer.fit(index.documents(kind, index.live_rows()))
+        except ValueError:
+            return None
+    return CandidateScorer(index, kind, vectorizer)
+
+
+_scorers = {}
+_lock = threading.Lock()
+
+
+def get_scorer(index, kind):
+    """
+    Scorer for `kind` over `index`, built once and patched incrementally.
+    Returns None if there is no vocabulary to score with.
+    """
+    vectorizer = vectorizer_store.get(kind)
+    with _lock:
+        scorer = _scorers.get(kind)
+        if scorer is not None and scorer.index is index:
+            if vectorizer is None or scorer.vectorizer is vectorizer:
+                scorer.sync(index)
+                return scorer
+
+        # No global vectorizer fitted yet means fitting one over the index
+        scorer = CandidateScorer.from_snapshot(index, kind, vectorizer)
+        if scorer is None:
+            scorer = build_scorer(index, kind, vectorizer)
+        if scorer is not None:
+            _scorers[kind] = scorer
+        return scorer
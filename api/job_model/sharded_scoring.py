@@ -0,0 +1,272 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from .kernels import local_top_k, top_k_positions
+
+# Spawned shard workers import this module without Django, so it must not
+# import models (or anything that does) at module level.
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = (
+    "experience",
+    "years",
+    "min_salary",
+    "max_salary",
+    "currency",
+    "location",
+)
+
+# Rows changed since the shared copy of a scorer was published are scored by
+# the coordinator instead of the shards; past this fraction of all rows the
+# copy is republished
+MAX_DELTA_FRACTION = 0.05
+
+
+def shard_count():
+    return getattr(settings, "MATCHING_SHARDS", 0)
+
+
+def use_shards(n_rows):
+    """Whether a request over `n_rows` candidates is worth fanning out."""
+    return shard_count() > 1 and n_rows >= getattr(
+        settings, "MATCHING_SHARD_MIN_CANDIDATES", 50_000
+    )
+
+
+class SharedArrays:
+    """
+    Numpy arrays copied once into named shared memory segments. `spec` is
+    all a worker process needs to map the same memory without copying it.
+    """
+
+    def __init__(self, arrays):
+        self.generation = uuid.uuid4().hex
+        self.segments = []
+        self.spec = {"generation": self.generation, "arrays": {}}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            segment = shared_memory.SharedMemory(
+                create=True, size=max(1, array.nbytes)
+            )
+            np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+            self.segments.append(segment)
+            self.spec["arrays"][name] = (segment.name, array.dtype.str, array.shape)
+
+    def unlink(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+
+# Worker-process side: per scorer kind, the mapped generation and its views
+_attached = {}
+
+
+def _open_segment(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the segment, but spawned workers
+        # share the coordinator's resource tracker, where it is registered
+        # already; unregistering here would drop the coordinator's entry
+        return shared_memory.SharedMemory(name=name)
+
+
+def _attach(spec):
+    current = _attached.get(spec["kind"])
+    if current is not None and current["generation"] == spec["generation"]:
+        return current["matrix"], current["features"]
+
+    if current is not None:
+        for segment in current["segments"]:
+            segment.close()
+    segments, arrays = [], {}
+    for name, (segment_name, dtype, shape) in spec["arrays"].items():
+        segment = _open_segment(segment_name)
+        segments.append(segment)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=segment.buf)
+
+    matrix = sparse.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]),
+        shape=spec["shape"],
+        copy=False,
+    )
+    features = {name: arrays[name] for name in FEATURE_NAMES}
+    _attached[spec["kind"]] = {
+        "generation": spec["generation"],
+        "segments": segments,
+        "matrix": matrix,
+        "features": features,
+    }
+    return matrix, features
+
+
+def score_shard(spec, rows, query_indices, query_data, job, weights, k, min_score):
+    """Runs in a worker process: local top-k of one shard's candidate rows."""
+    matrix, features = _attach(spec)
+    query = np.zeros(matrix.shape[1])
+    query[query_indices] = query_data
+    return local_top_k(matrix, features, rows, query, job, weights, k, min_score)
+
+
+class ShardPool:
+    """
+    Coordinator side of sharded scoring. The scorer's CSR matrix and feature
+    columns are published to shared memory and the candidate rows are split
+    into `shards` contiguous ranges, each scored by a pool process; the
+    per-shard top-k lists are merged here. Rows patched into the scorer
+    after it was published are scored here, from the scorer itself.
+    """
+
+    def __init__(self, shards):
+        self.shards = shards
+        self.executor = None
+        # scorer kind -> {"scorer", "version", "rows", "arrays": SharedArrays}
+        self.published = {}
+        # One request already keeps every pool process busy, so requests
+        # take turns; this also keeps a generation mapped until it's done
+        self.lock = threading.Lock()
+
+    def _executor(self):
+        if self.executor is None:
+            # spawn rather than fork: the web worker has threads running
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.shards,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.executor
+
+    def _publish(self, scorer):
+        """
+        (SharedArrays of the scorer, rows changed since they were published).
+        The scorer is only copied again once it was rebuilt or more than
+        MAX_DELTA_FRACTION of its rows changed; sync() patches are otherwise
+        left to the coordinator.
+        """
+        current = self.published.get(scorer.kind)
+        if current is not None and current["scorer"] is scorer:
+            changed = scorer.index.changed_since(current["version"])
+            if changed is not None:
+                appended = np.arange(current["rows"], scorer.matrix.shape[0])
+                delta = np.union1d(changed, appended).astype(np.int64)
+                if len(delta) <= MAX_DELTA_FRACTION * scorer.matrix.shape[0]:
+                    return current["arrays"], delta
+
+        matrix = scorer.matrix
+        arrays = {
+            "data": matrix.data,
+            "indices": matrix.indices,
+            "indptr": matrix.indptr,
+        }
+        arrays.update((name, scorer.features[name]) for name in FEATURE_NAMES)
+        published = SharedArrays(arrays)
+        published.spec.update(kind=scorer.kind, shape=matrix.shape)
+
+        # Unlinking only removes the name; workers still mapping the old
+        # generation keep valid memory until they move to the new one
+        if current is not None:
+            current["arrays"].unlink()
+        self.published[scorer.kind] = {
+            "scorer": scorer,
+            "version": scorer.version,
+            "rows": matrix.shape[0],
+            "arrays": published,
+        }
+        return published, np.empty(0, dtype=np.int64)
+
+    def top_k(self, scorer, rows, query_vector, job, weights, k, min_score):
+        """
+        Merged (rows, scores) of the best k candidates among `rows`, or None
+        if the pool failed and the caller should score in-process.
+        """
+        rows = np.sort(rows)
+
+        with self.lock:
+            try:
+                published, delta = self._publish(scorer)
+                spec = published.spec
+                patched = np.isin(rows, delta)
+                delta_rows, rows = rows[patched], rows[~patched]
+                bounds = np.linspace(0, spec["shape"][0], self.shards + 1)
+                splits = np.searchsorted(rows, bounds.astype(np.int64))
+                executor = self._executor()
+                futures = [
+                    executor.submit(
+                        score_shard,
+                        spec,
+                        rows[splits[i] : splits[i + 1]],
+                        query_vector.indices,
+                        query_vector.data,
+                        job,
+                        weights,
+                        k,
+                        min_score,
+                    )
+                    for i in range(self.shards)
+                    if splits[i + 1] > splits[i]
+                ]
+                parts = []
+                if len(delta_rows):
+                    query = np.zeros(scorer.matrix.shape[1])
+                    query[query_vector.indices] = query_vector.data
+                    parts.append(
+                        local_top_k(
+                            scorer.matrix,
+                            scorer.features,
+                            delta_rows,
+                            query,
+                            job,
+                            weights,
+                            k,
+                            min_score,
+                        )
+                    )
+                parts += [future.result() for future in futures]
+            except Exception:
+                logger.exception("Sharded scoring failed; scoring in-process")
+                self._shutdown()
+                return None
+
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        merged_rows = np.concatenate([part[0] for part in parts])
+        merged_scores = np.concatenate([part[1] for part in parts])
+        best = top_k_positions(merged_scores, k)
+        return merged_rows[best], merged_scores[best]
+
+    def _shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        for published in self.published.values():
+            published["arrays"].unlink()
+        self.published = {}
+
+    def close(self):
+        with self.lock:
+            self._shutdown()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_shard_pool():
+    """This web worker's shard pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShardPool(shard_count())
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,36 @@
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache backends private to one process. Index versions, change logs and
+# model stamps kept there are invisible to the other workers
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def shared_cache_configured():
+    """Whether the default cache is shared between processes."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return bool(backend) and backend not in PROCESS_LOCAL_CACHES
+
+
+_warned = set()
+
+
+def warn_if_process_local(component):
+    """
+    Log once per process that `component` can't see changes made by other
+    workers, because the default cache is not shared.
+    """
+    if component in _warned or shared_cache_configured():
+        return
+    _warned.add(component)
+    logger.warning(
+        f"{component}: CACHES['default'] is private to this process, so changes "
+        "made by other workers are only picked up by its periodic rebuild. "
+        "Set REDIS_URL to share it."
+    )
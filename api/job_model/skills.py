@@ -0,0 +1,136 @@
+import re
+
+# Canonical skill name -> aliases. Canonical names are lowercase, as JobSkills
+# names have always been written by the boost job and preference serializers.
+# Aliases only need to differ from the canonical name by more than case,
+# whitespace and "." / "-" / "_" separators; those are folded by skill_key.
+CANONICAL_SKILLS = {
+    "javascript": ["js", "ecmascript", "es6", "vanilla js"],
+    "typescript": ["ts"],
+    "react": ["react.js", "reactjs"],
+    "react native": ["rn"],
+    "angular": ["angular.js", "angularjs", "angular 2"],
+    "vue.js": ["vue", "vuejs", "vue 3"],
+    "next.js": ["nextjs"],
+    "node.js": ["node", "nodejs"],
+    "express.js": ["express", "expressjs"],
+    "nestjs": ["nest.js"],
+    "python": ["python3", "python 3", "py"],
+    "django": ["django framework"],
+    "django rest framework": ["drf", "django-rest-framework"],
+    "flask": [],
+    "fastapi": ["fast api"],
+    "java": [],
+    "spring boot": ["springboot"],
+    "kotlin": [],
+    "swift": [],
+    "objective-c": ["objc", "obj-c"],
+    "c": [],
+    "c++": ["cpp", "cplusplus"],
+    "c#": ["csharp", "c sharp"],
+    ".net": ["dotnet", "dot net", "asp.net", ".net core"],
+    "go": ["golang", "go lang"],
+    "rust": ["rustlang"],
+    "ruby": [],
+    "ruby on rails": ["rails", "ror"],
+    "php": [],
+    "laravel": [],
+    "html": ["html5"],
+    "css": ["css3"],
+    "sass": ["scss"],
+    "tailwind css": ["tailwind", "tailwindcss"],
+    "bootstrap": [],
+    "redux": [],
+    "graphql": ["gql"],
+    "rest api": ["rest", "restful", "rest apis", "restful api", "restful apis"],
+    "sql": [],
+    "postgresql": ["postgres", "psql", "postgre"],
+    "mysql": [],
+    "sqlite": ["sqlite3"],
+    "mongodb": ["mongo"],
+    "redis": [],
+    "elasticsearch": ["elastic search", "elastic"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "amazon web services": ["aws"],
+    "google cloud platform": ["gcp", "google cloud"],
+    "microsoft azure": ["azure"],
+    "terraform": [],
+    "ci/cd": ["cicd", "ci cd", "continuous integration"],
+    "git": [],
+    "linux": [],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "data analysis": ["data analytics"],
+    "data science": [],
+    "pandas": [],
+    "numpy": [],
+    "scikit-learn": ["sklearn", "scikit learn", "scikitlearn"],
+    "tensorflow": [],
+    "pytorch": ["torch"],
+    "power bi": ["powerbi"],
+    "tableau": [],
+    "microsoft excel": ["excel", "ms excel"],
+    "figma": [],
+    "ui/ux design": ["ui/ux", "ux/ui", "ui ux", "ux design", "ui design"],
+    "project management": [],
+    "search engine optimization": ["seo"],
+    "flutter": [],
+    "dart": [],
+}
+
+# Separators that never distinguish two skills ("Node.JS", "node js", "nodejs")
+_SEPARATORS = re.compile(r"[\s._\-]+")
+_WHITESPACE = re.compile(r"\s+")
+# Skills sent as one string instead of a list
+_LIST_SEPARATORS = re.compile(r"[,;]")
+
+
+def skill_key(name):
+    """Lookup key of a skill name: lowercase, separators removed."""
+    return _SEPARATORS.sub("", name.lower())
+
+
+class SkillNormalizer:
+    """
+    Maps free-text skill names onto canonical ones through a single dict of
+    normalized keys, so "React", "react.js" and "ReactJS" all become "react".
+    Unknown skills are kept, lowercased with whitespace collapsed.
+    """
+
+    def __init__(self, canonical=CANONICAL_SKILLS):
+        self.lookup = {}
+        for name, aliases in canonical.items():
+            for alias in (name, *aliases):
+                self.lookup.setdefault(skill_key(alias), name)
+
+    def normalize(self, name):
+        """Canonical form of one skill name, or "" for a blank one."""
+        cleaned = _WHITESPACE.sub(" ", (name or "").strip().lower())
+        if not cleaned:
+            return ""
+        return self.lookup.get(skill_key(cleaned), cleaned)
+
+    def normalize_all(self, names):
+        """Canonical, de-duplicated skill names, in their original order."""
+        if isinstance(names, str):
+            names = _LIST_SEPARATORS.split(names)
+        normalized = {}
+        for name in names or ():
+            canonical = self.normalize(name)
+            if canonical:
+                normalized.setdefault(canonical)
+        return list(normalized)
+
+
+skill_normalizer = SkillNormalizer()
+
+
+def normalize_skill(name):
+    return skill_normalizer.normalize(name)
+
+
+def normalize_skills(names):
+    return skill_normalizer.normalize_all(names)
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from django.conf import settings
+
+from .shared_cache import shared_cache_configured
+
+# Versioned on-disk snapshots of the candidate index and scoring matrices.
+# Each snapshot is a directory of .npy files plus meta.json; CURRENT names the
+# newest complete one. Published directories are never modified, only pruned.
+
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+
+
+def snapshot_root():
+    """The snapshot directory, or None if snapshots are disabled."""
+    return getattr(settings, "CANDIDATE_SNAPSHOT_DIR", "") or None
+
+
+def snapshot_expired(snapshot):
+    """Whether `snapshot` is older than CANDIDATE_SNAPSHOT_MAX_AGE seconds."""
+    max_age = getattr(settings, "CANDIDATE_SNAPSHOT_MAX_AGE", 86400)
+    created_at = snapshot.meta.get("created_at")
+    if not max_age:
+        return False
+    return created_at is None or time.time() - created_at > max_age
+
+
+class Snapshot:
+    """
+    One published snapshot. Arrays are opened with np.load(mmap_mode="r"),
+    so every worker mapping the same file shares its pages in the OS page
+    cache; they are read-only and must be copied before being modified.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+
+    @property
+    def version(self):
+        return self.meta["version"]
+
+    def has(self, name):
+        return os.path.exists(os.path.join(self.path, f"{name}.npy"))
+
+    def array(self, name):
+        path = os.path.join(self.path, f"{name}.npy")
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Empty arrays can't be mapped on every platform
+            return np.load(path)
+
+    def load_object(self, name):
+        return joblib.load(os.path.join(self.path, f"{name}.joblib"))
+
+
+def write_snapshot(arrays, meta, objects=None, keep=None):
+    """
+    Write a new snapshot and make it current. Files go to a staging
+    directory that is renamed into place once complete, then CURRENT is
+    swapped with os.replace, so readers never see a partial snapshot.
+    Returns the published Snapshot.
+    """
+    root = snapshot_root()
+    os.makedirs(root, exist_ok=True)
+    # Zero padded nanoseconds, so names sort in publication order
+    name = f"snapshot-{time.time_ns():020d}"
+
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    try:
+        for key, array in arrays.items():
+            np.save(os.path.join(staging, f"{key}.npy"), np.ascontiguousarray(array))
+        for key, value in (objects or {}).items():
+            joblib.dump(value, os.path.join(staging, f"{key}.joblib"))
+        with open(os.path.join(staging, META_FILE), "w") as f:
+            json.dump(dict(meta, name=name), f)
+        os.rename(staging, os.path.join(root, name))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = os.path.join(root, f".{CURRENT_FILE}-{name}")
+    with open(pointer, "w") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+    prune_snapshots(keep)
+    return Snapshot(os.path.join(root, name))
+
+
+def prune_snapshots(keep=None):
+    """
+    Delete all but the newest `keep` snapshots. Workers still mapping a
+    deleted one keep their pages until they move on (POSIX unlink semantics).
+    """
+    root = snapshot_root()
+    if keep is None:
+        keep = getattr(settings, "CANDIDATE_SNAPSHOT_KEEP", 3)
+    names = sorted(
+        entry.name
+        for entry in os.scandir(root)
+        if entry.is_dir() and entry.name.startswith("snapshot-")
+    )
+    for name in names[: -max(1, keep)]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+# Per-worker: CURRENT's mtime when last read, and the snapshot it named
+_current = {"mtime": None, "snapshot": None}
+
+
+def current_snapshot():
+    """
+    The newest published snapshot, or None if there is none, it is older
+    than CANDIDATE_SNAPSHOT_MAX_AGE or no shared cache is configured. Costs
+    one stat() per call; the metadata is only re-read when CURRENT was
+    replaced.
+    """
+    root = snapshot_root()
+    if not root or not shared_cache_configured():
+        return None
+    pointer = os.path.join(root, CURRENT_FILE)
+    try:
+        mtime = os.stat(pointer).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if mtime != _current["mtime"]:
+        with open(pointer) as f:
+            name = f.read().strip()
+        try:
+            snapshot = Snapshot(os.path.join(root, name))
+        except FileNotFoundError:
+            # Pruned by a newer publication; the next call will see it
+            return _current["snapshot"]
+        _current.update(mtime=mtime, snapshot=snapshot)
+    snapshot = _current["snapshot"]
+    if snapshot is None or snapshot_expired(snapshot):
+        return None
+    return snapshot
@@ -0,0 +1,346 @@
+import csv
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+from ..models import (
+    BoostJobs,
+    JobPreference,
+    Jobs,
+    JobSkills,
+    Profile,
+    User,
+    UserCategories,
+    UserSkills,
+)
+
+# Every generated account uses this email prefix, so a run can be cleared
+SYNTHETIC_EMAIL_PREFIX = "synthetic-"
+
+JOB_LOCATION_CODES = {"remote": "R", "onsite": "O", "hybrid": "H"}
+EXPERIENCE_LEVELS = ["Entry", "Mid", "Senior"]
+
+
+def sample_data_dir():
+    return Path(settings.BASE_DIR) / "sample_data"
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return [
+            {key.strip(): (value or "").strip() for key, value in row.items()}
+            for row in csv.DictReader(f)
+        ]
+
+
+class SampleDistributions:
+    """
+    Value distributions taken from sample_data/users.csv and jobs.csv. Skills
+    and categories are drawn Zipf-style, so a few are very common and most
+    are rare, as they are in real profiles.
+    """
+
+    def __init__(self, directory=None, zipf_exponent=1.1):
+        directory = Path(directory or sample_data_dir())
+        users = _read_csv(directory / "users.csv")
+        jobs = _read_csv(directory / "jobs.csv")
+
+        # JobSkills names are unique case-insensitively, so count by lowercase
+        # and keep the first spelling seen
+        counts, spelling = {}, {}
+        for row in users + jobs:
+            for skill in filter(None, (s.strip() for s in row["skills"].split(";"))):
+                spelling.setdefault(skill.lower(), skill)
+                counts[skill.lower()] = counts.get(skill.lower(), 0) + 1
+        self.skills = [
+            spelling[key] for key in sorted(counts, key=lambda k: (-counts[k], k))
+        ]
+        self.categories = sorted({row["title"] for row in jobs})
+        self.locations = sorted(
+            {row["location"] for row in users} | {row["location"] for row in jobs}
+        )
+        self.currencies = [row["currency_type"] for row in users]
+        self.job_locations = [
+            JOB_LOCATION_CODES.get(row["job_location"].lower(), "R") for row in users
+        ]
+        self.salaries = [
+            (int(row["min_salary"]), int(row["max_salary"])) for row in users
+        ]
+        self.years = [int(row["experience"]) for row in users]
+        self.job_rows = jobs
+
+        self._skill_weights = [
+            1 / (rank + 1) ** zipf_exponent for rank in range(len(self.skills))
+        ]
+        self._category_weights = [
+            1 / (rank + 1) ** zipf_exponent for rank in range(len(self.categories))
+        ]
+
+    def pick_skills(self, rng, low=1, high=8):
+        return self._pick(
+            rng, self.skills, self._skill_weights, rng.randint(low, high)
+        )
+
+    def pick_categories(self, rng, low=1, high=3):
+        return self._pick(
+            rng, self.categories, self._category_weights, rng.randint(low, high)
+        )
+
+    def _pick(self, rng, values, weights, count):
+        picked = set()
+        while len(picked) < min(count, len(values)):
+            picked.update(rng.choices(values, weights=weights, k=count - len(picked)))
+        return sorted(picked)
+
+    def salary_range(self, rng):
+        low, high = rng.choice(self.salaries)
+        factor = rng.lognormvariate(0, 0.35)
+        return int(low * factor), int(high * factor)
+
+    def years_of_experience(self, rng):
+        return max(0, int(rng.gauss(rng.choice(self.years), 1.5)))
+
+    def job_profile(self, rng, column="skills"):
+        """A recommend_users/recommend_users_categories job profile."""
+        row = rng.choice(self.job_rows)
+        min_salary, max_salary = self.salary_range(rng)
+        profile = {
+            "experience_level": row["experience_level"].lower(),
+            "years_of_experience": rng.randint(0, 6),
+            "location": row["location"].lower(),
+            "min_salary": min_salary,
+            "max_salary": max_salary,
+            "currency_type": row["currency_type"],
+        }
+        if column == "skills":
+            profile["skills"] = row["skills"]
+        else:
+            profile["categories"] = ";".join(self.pick_categories(rng))
+        return profile
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def ensure_vocabulary(distributions):
+    """UserCategories and JobSkills rows for the sample vocabulary, by name."""
+    categories = {
+        c.name: c
+        for c in UserCategories.objects.filter(name__in=distributions.categories)
+    }
+    missing = [n for n in distributions.categories if n not in categories]
+    for category in UserCategories.objects.bulk_create(
+        UserCategories(name=name) for name in missing
+    ):
+        categories[category.name] = category
+
+    names = [s.lower() for s in distributions.skills]
+    job_skills = {s.name: s for s in JobSkills.objects.filter(name__in=names)}
+    for skill in JobSkills.objects.bulk_create(
+        JobSkills(name=name) for name in names if name not in job_skills
+    ):
+        job_skills[skill.name] = skill
+    return categories, job_skills
+
+
+def generate_candidates(distributions, categories, total, rng, tag, batch_size):
+    """Bulk insert `total` candidates with profiles, skills and categories."""
+    password = make_password(None)
+    skill_links = Profile.skills.through
+    category_links = Profile.categories.through
+
+    for start, count in _batches(total, batch_size):
+        users = User.objects.bulk_create(
+            User(
+                email=f"{SYNTHETIC_EMAIL_PREFIX}{tag}-{start + i}@example.com",
+                first_name="Synthetic",
+                last_name=f"Candidate {start + i}",
+                password=password,
+                verified=True,
+                has_onboarded=True,
+                company=False,
+            )
+            for i in range(count)
+        )
+
+        profiles, user_skills, picked_categories = [], [], []
+        for user in users:
+            min_salary, max_salary = distributions.salary_range(rng)
+            years = distributions.years_of_experience(rng)
+            profiles.append(
+                Profile(
+                    user=user,
+                    location=rng.choice(distributions.locations),
+                    job_location=rng.choice(distributions.job_locations),
+                    min_salary=min_salary,
+                    max_salary=max_salary,
+                    currency=rng.choice(distributions.currencies),
+                    experience_level=EXPERIENCE_LEVELS[min(years // 3, 2)],
+                    years_of_experience=years,
+                )
+            )
+            user_skills.append(
+                [
+                    UserSkills(user=user, name=name)
+                    for name in distributions.pick_skills(rng)
+                ]
+            )
+            picked_categories.append(distributions.pick_categories(rng))
+
+        profiles = Profile.objects.bulk_create(profiles)
+        created_skills = UserSkills.objects.bulk_create(
+            skill for skills in user_skills for skill in skills
+        )
+        skill_ids = iter(s.pk for s in created_skills)
+        skill_links.objects.bulk_create(
+            skill_links(profile_id=profile.pk, userskills_id=next(skill_ids))
+            for profile, skills in zip(profiles, user_skills)
+            for _ in skills
+        )
+        category_links.objects.bulk_create(
+            category_links(
+                profile_id=profile.pk, usercategories_id=categories[name].pk
+            )
+            for profile, names in zip(profiles, picked_categories)
+            for name in names
+        )
+        yield users
+
+
+def generate_companies(total, tag):
+    password = make_password(None)
+    return User.objects.bulk_create(
+        User(
+            email=f"{SYNTHETIC_EMAIL_PREFIX}{tag}-company-{i}@example.com",
+            first_name=f"Synthetic Company {i}",
+            password=password,
+            verified=True,
+            has_onboarded=True,
+            company=True,
+        )
+        for i in range(total)
+    )
+
+
+def generate_jobs(
+    distributions, categories, job_skills, owners, total, rng, batch_size
+):
+    """Bulk insert posted Jobs modelled on sample_data/jobs.csv."""
+    skill_links = Jobs.skills.through
+    category_links = Jobs.categories.through
+    levels = {"entry": "Entry", "mid": "Mid", "senior": "Senior", "lead": "Senior"}
+
+    for _, count in _batches(total, batch_size):
+        rows = [rng.choice(distributions.job_rows) for _ in range(count)]
+        jobs = Jobs.objects.bulk_create(
+            Jobs(
+                owner=rng.choice(owners),
+                title=row["title"],
+                description=row["description"],
+                location=rng.choice(distributions.locations),
+                min_salary=salary[0],
+                max_salary=salary[1],
+                currency_type=rng.choice(distributions.currencies),
+                employment_type=rng.choice(distributions.job_locations),
+                experience_level=levels.get(row["experience_level"].lower(), "Entry"),
+                years_of_experience=rng.randint(0, 6),
+            )
+            for row, salary in (
+                (row, distributions.salary_range(rng)) for row in rows
+            )
+        )
+        skill_links.objects.bulk_create(
+            skill_links(jobs_id=job.pk, jobskills_id=job_skills[name.lower()].pk)
+            for job in jobs
+            for name in distributions.pick_skills(rng, 2, 6)
+        )
+        category_links.objects.bulk_create(
+            category_links(jobs_id=job.pk, usercategories_id=categories[name].pk)
+            for job in jobs
+            for name in distributions.pick_categories(rng, 1, 2)
+        )
+
+
+def generate_boost_jobs(
+    distributions, categories, job_skills, owners, total, rng, batch_size
+):
+    skill_links = BoostJobs.job_skills.through
+    category_links = BoostJobs.job_categories.through
+    job_types = [c for c, _ in BoostJobs.JobType.choices]
+    natures = [c for c, _ in BoostJobs.JobNature.choices]
+    levels = [c for c, _ in BoostJobs.ExperienceLevel.choices]
+
+    for _, count in _batches(total, batch_size):
+        jobs = BoostJobs.objects.bulk_create(
+            BoostJobs(
+                title=rng.choice(distributions.job_rows)["title"],
+                owner=rng.choice(owners),
+                job_type=rng.choice(job_types),
+                job_nature=rng.choice(natures),
+                location=rng.choice(distributions.locations).lower(),
+                experience_level=rng.choice(levels),
+                min_salary=salary[0],
+                max_salary=salary[1],
+                application_link="https://example.com/apply",
+            )
+            for salary in (distributions.salary_range(rng) for _ in range(count))
+        )
+        skill_links.objects.bulk_create(
+            skill_links(
+                boostjobs_id=job.pk, jobskills_id=job_skills[name.lower()].pk
+            )
+            for job in jobs
+            for name in distributions.pick_skills(rng, 1, 6)
+        )
+        category_links.objects.bulk_create(
+            category_links(
+                boostjobs_id=job.pk, usercategories_id=categories[name].pk
+            )
+            for job in jobs
+            for name in distributions.pick_categories(rng, 0, 2)
+        )
+
+
+def generate_preferences(distributions, categories, job_skills, users, rng):
+    """JobPreference rows (with skills and categories) for `users`."""
+    job_types = [c for c, _ in BoostJobs.JobType.choices]
+    natures = [c for c, _ in BoostJobs.JobNature.choices]
+    levels = [c for c, _ in BoostJobs.ExperienceLevel.choices]
+
+    preferences = JobPreference.objects.bulk_create(
+        JobPreference(
+            user=user,
+            preferred_job_types=rng.sample(job_types, rng.randint(0, 2)),
+            preferred_job_nature=rng.sample(natures, rng.randint(0, 2)),
+            preferred_locations=[],
+            preferred_experience=rng.sample(levels, rng.randint(0, 2)),
+            min_salary=salary[0],
+            max_salary=salary[1],
+        )
+        for user, salary in ((u, distributions.salary_range(rng)) for u in users)
+    )
+    skill_links = JobPreference.preferred_skills.through
+    category_links = JobPreference.preferred_categories.through
+    skill_links.objects.bulk_create(
+        skill_links(
+            jobpreference_id=pref.pk, jobskills_id=job_skills[name.lower()].pk
+        )
+        for pref in preferences
+        for name in distributions.pick_skills(rng, 1, 6)
+    )
+    category_links.objects.bulk_create(
+        category_links(
+            jobpreference_id=pref.pk, usercategories_id=categories[name].pk
+        )
+        for pref in preferences
+        for name in distributions.pick_categories(rng, 1, 2)
+    )
+    return preferences
+
+
+def clear_synthetic_data():
+    """Delete every generated account; jobs, profiles etc. cascade."""
+    return User.objects.filter(email__startswith=SYNTHETIC_EMAIL_PREFIX).delete()
@@ -0,0 +1,76 @@
+from django.utils import timezone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from ..models import IngestedJob, Jobs
+from .candidate_index import fetch_candidate_rows
+from .model_registry import model_cache, publish_model
+
+# Model registry name under which each global vectorizer is published
+VECTORIZER_NAMES = {
+    "skills": "skills_tfidf",
+    "categories": "categories_tfidf",
+}
+
+
+def skills_corpus():
+    """Every skills document the matcher will ever transform."""
+    corpus = [row[2] for row in fetch_candidate_rows().values()]
+    for job in Jobs.objects.prefetch_related("skills"):
+        corpus.append(", ".join(s.name.lower() for s in job.skills.all()))
+    for required, preferred in IngestedJob.objects.values_list(
+        "required_skills", "preferred_skills"
+    ).iterator():
+        corpus.append(";".join((required or []) + (preferred or [])))
+    return [doc for doc in corpus if doc]
+
+
+def categories_corpus():
+    corpus = [row[10] for row in fetch_candidate_rows().values()]
+    for job in Jobs.objects.prefetch_related("categories"):
+        corpus.append(", ".join(c.name.lower() for c in job.categories.all()))
+    return [doc for doc in corpus if doc]
+
+
+CORPORA = {
+    "skills": skills_corpus,
+    "categories": categories_corpus,
+}
+
+
+def fit_vectorizer(kind):
+    """
+    Fit the global vectorizer for `kind` over the whole corpus and publish it
+    to the model registry as the new active version. Returns the stored row.
+    """
+    documents = CORPORA[kind]()
+    vectorizer = TfidfVectorizer()
+    vectorizer.fit(documents)
+    return publish_model(
+        VECTORIZER_NAMES[kind],
+        {
+            "fitted_at": timezone.now().isoformat(),
+            "documents": len(documents),
+            "vectorizer": vectorizer,
+        },
+    )
+
+
+class VectorizerStore:
+    """
+    The global vectorizers, served from this worker's model registry cache:
+    loaded once, and swapped for a newly fitted version without a restart.
+    """
+
+    def __init__(self, models=model_cache):
+        self._models = models
+
+    def get(self, kind):
+        """The current vectorizer for `kind`, or None if none was fitted yet."""
+        payload = self._models.get(VECTORIZER_NAMES[kind])
+        return payload["vectorizer"] if payload else None
+
+    def version(self, kind):
+        return self._models.version(VECTORIZER_NAMES[kind])
+
+
+vectorizer_store = VectorizerStore()
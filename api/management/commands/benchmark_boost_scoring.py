@@ -0,0 +1,154 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.job_model.boost_scoring import (
+    recommend_boost_jobs,
+    recommend_boost_jobs_python,
+)
+from api.models import BoostJobs, JobPreference, JobSkills, User, UserCategories
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark SQL-annotated boost job scoring against the Python reference "
+        "on synthetic BoostJobs. All data is created inside a transaction that "
+        "is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=100_000)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--skills", type=int, default=200, help="Size of the skill vocabulary."
+        )
+        parser.add_argument(
+            "--categories",
+            type=int,
+            default=40,
+            help="Size of the category vocabulary.",
+        )
+
+    def handle(self, *args, **options):
+        # bulk_create has to return primary keys (Postgres, SQLite >= 3.35)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError("This database backend is not supported")
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rng, options):
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            email=f"boost-bench-{tag}@example.com",
+            first_name="Benchmark",
+            company=True,
+        )
+        skills = JobSkills.objects.bulk_create(
+            JobSkills(name=f"bench-{tag}-skill-{i}") for i in range(options["skills"])
+        )
+        categories = UserCategories.objects.bulk_create(
+            UserCategories(name=f"bench-{tag}-category-{i}")
+            for i in range(options["categories"])
+        )
+
+        locations = ["lagos", "abuja", "nairobi", "accra", "london", "remote"]
+        job_types = [c for c, _ in BoostJobs.JobType.choices]
+        natures = [c for c, _ in BoostJobs.JobNature.choices]
+        levels = [c for c, _ in BoostJobs.ExperienceLevel.choices]
+
+        batch_size = 5000
+        skill_links = BoostJobs.job_skills.through
+        category_links = BoostJobs.job_categories.through
+        for start in range(0, options["jobs"], batch_size):
+            count = min(batch_size, options["jobs"] - start)
+            jobs = BoostJobs.objects.bulk_create(
+                BoostJobs(
+                    title=f"Benchmark job {start + i}",
+                    owner=owner,
+                    job_type=rng.choice(job_types),
+                    job_nature=rng.choice(natures),
+                    location=rng.choice(locations),
+                    experience_level=rng.choice(levels),
+                    min_salary=rng.randrange(0, 5000, 100),
+                    max_salary=rng.randrange(5000, 20000, 100),
+                    application_link="https://example.com/apply",
+                )
+                for i in range(count)
+            )
+            skill_links.objects.bulk_create(
+                skill_links(boostjobs_id=job.pk, jobskills_id=skill.pk)
+                for job in jobs
+                for skill in rng.sample(skills, rng.randint(0, 8))
+            )
+            category_links.objects.bulk_create(
+                category_links(boostjobs_id=job.pk, usercategories_id=category.pk)
+                for job in jobs
+                for category in rng.sample(categories, rng.randint(0, 3))
+            )
+
+        pref = JobPreference.objects.create(
+            user=owner,
+            preferred_job_types=rng.sample(job_types, 2),
+            preferred_job_nature=rng.sample(natures, 2),
+            preferred_locations=[],
+            preferred_experience=[],
+            min_salary=1000,
+            max_salary=15000,
+        )
+        pref.preferred_skills.set(rng.sample(skills, 10))
+        pref.preferred_categories.set(rng.sample(categories, 3))
+        return pref
+
+    def measure(self, func, pref, limit, repeat):
+        timings, result = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(pref, limit=limit)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings), result
+
+    def run(self, options):
+        if options["jobs"] <= 0:
+            raise CommandError("--jobs must be positive")
+        rng = random.Random(options["seed"])
+
+        started = time.perf_counter()
+        pref = self.seed(rng, options)
+        self.stdout.write(
+            f"Seeded {options['jobs']} boost jobs on {connection.vendor} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        sql_time, sql_result = self.measure(
+            recommend_boost_jobs, pref, options["limit"], options["repeat"]
+        )
+        python_time, python_result = self.measure(
+            recommend_boost_jobs_python, pref, options["limit"], options["repeat"]
+        )
+
+        self.stdout.write(f"python: {python_time * 1000:.1f} ms (median)")
+        self.stdout.write(f"sql:    {sql_time * 1000:.1f} ms (median)")
+        if sql_time:
+            self.stdout.write(f"speedup: {python_time / sql_time:.1f}x")
+
+        def ranking(result):
+            return [(job.pk, round(score, 6)) for job, score in result]
+
+        if ranking(sql_result) == ranking(python_result):
+            self.stdout.write(self.style.SUCCESS("Rankings match"))
+        else:
+            self.stdout.write(self.style.ERROR("Rankings differ"))
@@ -0,0 +1,186 @@
+import json
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.job_model.matches import MATCH_ORDERING, job_matches, user_matches
+from api.models import IngestedJob, MatchResult
+from api.pagination import keyset_page
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the paginated MatchResult read paths (my_matched_jobs and "
+        "get_ingested_job_matches) on synthetic matches, 10M by default. "
+        "Reports median latency and query count of the first page, a deep "
+        "page and a min_score page, plus the query plans. All data is created "
+        "inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--matches", type=int, default=10_000_000)
+        parser.add_argument("--jobs", type=int, default=50_000)
+        parser.add_argument("--users", type=int, default=200_000)
+        parser.add_argument("--limit", type=int, default=50)
+        parser.add_argument(
+            "--depth", type=int, default=10, help="Page number of the deep page."
+        )
+        parser.add_argument("--min-score", type=float, default=0.8)
+        parser.add_argument("--samples", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["matches"] <= 0 or options["jobs"] <= 0 or options["users"] <= 0:
+            raise CommandError("--matches, --jobs and --users must be positive")
+        # bulk_create has to return primary keys (Postgres, SQLite >= 3.35)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError("This database backend is not supported")
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rng, options):
+        tag = uuid.uuid4().hex[:8]
+        job_ids = []
+        for start in range(0, options["jobs"], options["batch_size"]):
+            count = min(options["batch_size"], options["jobs"] - start)
+            job_ids += [
+                job.pk
+                for job in IngestedJob.objects.bulk_create(
+                    IngestedJob(
+                        source_job_id=f"bench-{tag}-{start + i}",
+                        title=f"Benchmark job {start + i}",
+                        description="x" * 2000,
+                        source="benchmark",
+                        status="matched",
+                    )
+                    for i in range(count)
+                )
+            ]
+
+        if connection.vendor == "postgresql":
+            # Generated server-side: 10M ORM objects would dominate the run
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT setseed(%s)", [rng.uniform(-1, 1)])
+                cursor.execute(
+                    f"""
+                    INSERT INTO {MatchResult._meta.db_table} (
+                        ingested_job_id, user_id, user_name, match_score,
+                        skills, location, years_of_experience,
+                        experience_level, salary_range, created_at
+                    )
+                    SELECT
+                        (%s::bigint[])[1 + g %% %s],
+                        1 + floor(random() * %s)::int,
+                        'Benchmark user', random(), 'python;django', 'lagos',
+                        3, 'mid', '1000 - 2000 USD', now()
+                    FROM generate_series(0, %s - 1) AS g
+                    """,
+                    [job_ids, len(job_ids), options["users"], options["matches"]],
+                )
+                cursor.execute(f"ANALYZE {MatchResult._meta.db_table}")
+            return job_ids
+
+        for start in range(0, options["matches"], options["batch_size"]):
+            count = min(options["batch_size"], options["matches"] - start)
+            MatchResult.objects.bulk_create(
+                MatchResult(
+                    ingested_job_id=job_ids[(start + i) % len(job_ids)],
+                    user_id=rng.randint(1, options["users"]),
+                    user_name="Benchmark user",
+                    match_score=rng.random(),
+                    skills="python;django",
+                    location="lagos",
+                    years_of_experience=3,
+                    experience_level="mid",
+                    salary_range="1000 - 2000 USD",
+                )
+                for i in range(count)
+            )
+        return job_ids
+
+    def read(self, queryset, options, pages=1):
+        """Read `pages` pages the way the endpoints do; returns the last one."""
+        cursor, rows = None, []
+        for _ in range(pages):
+            rows, cursor = keyset_page(
+                queryset, MATCH_ORDERING, options["limit"], cursor
+            )
+            for row in rows:
+                # Touch what the endpoints serialize
+                if hasattr(row, "ingested_job"):
+                    row.ingested_job.title
+            if cursor is None:
+                break
+        return rows
+
+    def measure(self, make_queryset, keys, options, pages=1, min_score=None):
+        timings, queries = [], []
+        for key in keys:
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self.read(make_queryset(key, min_score), options, pages)
+                timings.append((time.perf_counter() - started) * 1000 / pages)
+            queries.append(len(captured.captured_queries) / pages)
+        return {
+            "p50_ms_per_page": statistics.median(timings),
+            "max_ms_per_page": max(timings),
+            "queries_per_page": statistics.median(queries),
+        }
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        job_ids = self.seed(rng, options)
+        self.stderr.write(
+            f"Seeded {options['matches']} matches over {len(job_ids)} jobs on "
+            f"{connection.vendor} in {time.perf_counter() - started:.1f}s"
+        )
+
+        user_ids = [rng.randint(1, options["users"]) for _ in range(options["samples"])]
+        jobs = [rng.choice(job_ids) for _ in range(options["samples"])]
+        paths = {
+            "my_matched_jobs": (user_matches, user_ids),
+            "get_ingested_job_matches": (job_matches, jobs),
+        }
+        results = {}
+        for name, (make_queryset, keys) in paths.items():
+            sample = make_queryset(keys[0], None).order_by(*MATCH_ORDERING)
+            results[name] = {
+                "first_page": self.measure(make_queryset, keys, options),
+                f"page_{options['depth']}": self.measure(
+                    make_queryset, keys, options, pages=options["depth"]
+                ),
+                "min_score": self.measure(
+                    make_queryset, keys, options, min_score=options["min_score"]
+                ),
+                "plan": sample[: options["limit"]].explain(),
+            }
+
+        self.stdout.write(
+            json.dumps(
+                {
+                    "database": connection.vendor,
+                    "matches": options["matches"],
+                    "jobs": len(job_ids),
+                    "users": options["users"],
+                    "limit": options["limit"],
+                    "seed": options["seed"],
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
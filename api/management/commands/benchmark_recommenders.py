@@ -0,0 +1,190 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.job_model.candidate_index import (
+    get_candidate_index,
+    invalidate_candidate_index,
+)
+from api.job_model.job_recommender import JobAppMatching
+from api.job_model.synthetic import SampleDistributions
+from api.models import JobPreference, User
+
+ENTRY_POINTS = [
+    "recommend_users",
+    "recommend_users_categories",
+    "recommend_users_any_skills",
+    "recommend_users_any_categories",
+    "recommend_boost_jobs_for_user_preferences",
+]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the recommender entry points against the current database "
+        "(see generate_synthetic_data) and report p50/p95 latency, peak "
+        "memory and SQL query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entry",
+            action="append",
+            choices=ENTRY_POINTS,
+            help="Entry point to benchmark; repeat for several. Defaults to all.",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--sample-dir", default=None)
+        parser.add_argument(
+            "--label", default="", help="Free-form label stored with the run."
+        )
+        parser.add_argument(
+            "--rerank-model",
+            default=None,
+            help="Registry name of the rerank model (default: RERANK_MODEL; "
+            "'' benchmarks the single-stage ranking).",
+        )
+        parser.add_argument("--shortlist-k", type=int, default=None)
+        parser.add_argument("--rerank-budget-ms", type=float, default=None)
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Append the run as one JSON line to this file instead of "
+            "printing it.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] <= 0:
+            raise CommandError("--iterations must be positive")
+
+        self.matcher = JobAppMatching(
+            rerank_model=options["rerank_model"],
+            shortlist_k=options["shortlist_k"],
+            rerank_budget_ms=options["rerank_budget_ms"],
+        )
+        self.distributions = SampleDistributions(options["sample_dir"])
+        self.preference_ids = list(JobPreference.objects.values_list("id", flat=True))
+
+        results = {}
+        for name in options["entry"] or ENTRY_POINTS:
+            if name == "recommend_boost_jobs_for_user_preferences" and not (
+                self.preference_ids
+            ):
+                self.stderr.write(f"Skipping {name}: no job preferences")
+                continue
+            results[name] = self.benchmark(name, options)
+            self.stderr.write(
+                f"{name}: p50 {results[name]['p50_ms']:.1f} ms, "
+                f"p95 {results[name]['p95_ms']:.1f} ms"
+            )
+
+        run = {
+            "timestamp": timezone.now().isoformat(),
+            "label": options["label"],
+            "database": connection.vendor,
+            "candidates": User.objects.filter(company=False).count(),
+            # Resident candidate index size, including bytes per 100k candidates
+            "candidate_index_memory": get_candidate_index().memory_usage(),
+            "job_preferences": len(self.preference_ids),
+            "iterations": options["iterations"],
+            "seed": options["seed"],
+            "rerank_model": self.matcher.rerank_model,
+            "shortlist_k": self.matcher.shortlist_k,
+            "rerank_budget_ms": self.matcher.rerank_budget_ms,
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "a") as f:
+                f.write(json.dumps(run) + "\n")
+            self.stdout.write(
+                self.style.SUCCESS(f"Appended run to {options['output']}")
+            )
+        else:
+            self.stdout.write(json.dumps(run, indent=2))
+
+    def call(self, name, rng):
+        """One request's worth of work for the entry point `name`."""
+        matcher, distributions = self.matcher, self.distributions
+        if name == "recommend_boost_jobs_for_user_preferences":
+            pref = JobPreference.objects.get(id=rng.choice(self.preference_ids))
+            return matcher.recommend_boost_jobs_for_user_preferences(pref)
+
+        user_data = matcher.load_users_from_db()
+        if name == "recommend_users":
+            return matcher.recommend_users(distributions.job_profile(rng), user_data)
+        if name == "recommend_users_categories":
+            return matcher.recommend_users_categories(
+                distributions.job_profile(rng, "categories"), user_data
+            )
+        location = rng.choice(distributions.locations)
+        if name == "recommend_users_any_skills":
+            return matcher.recommend_users_any_skills(
+                distributions.pick_skills(rng, 1, 3), location, user_data
+            )
+        return matcher.recommend_users_any_categories(
+            distributions.pick_categories(rng, 1, 2), location, user_data
+        )
+
+    def benchmark(self, name, options):
+        rng = random.Random(options["seed"])
+
+        # Cold: the first request after the candidate index was dropped
+        invalidate_candidate_index()
+        started = time.perf_counter()
+        self.call(name, rng)
+        cold = time.perf_counter() - started
+
+        for _ in range(options["warmup"]):
+            self.call(name, rng)
+
+        timings, queries, stages = [], [], {}
+        for _ in range(options["iterations"]):
+            self.matcher.timings = {}
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self.call(name, rng)
+                timings.append(time.perf_counter() - started)
+            queries.append(len(captured.captured_queries))
+            for stage, value in self.matcher.timings.items():
+                stages.setdefault(stage, []).append(value)
+
+        # tracemalloc slows everything down, so memory gets its own pass
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            self.call(name, rng)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings_ms = [t * 1000 for t in timings]
+        return {
+            "cold_ms": cold * 1000,
+            "p50_ms": percentile(timings_ms, 0.5),
+            "p95_ms": percentile(timings_ms, 0.95),
+            "mean_ms": statistics.fmean(timings_ms),
+            "min_ms": min(timings_ms),
+            "max_ms": max(timings_ms),
+            "queries": statistics.median(queries),
+            "max_queries": max(queries),
+            "peak_memory_mb": peak / 2**20,
+            # Medians of the two-stage recommenders' per-stage timings/counts
+            "stages": {
+                stage: statistics.median(values) for stage, values in stages.items()
+            },
+        }
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.job_model.candidate_index import POSTING_COLUMNS, CandidateIndex
+from api.job_model.scoring import build_scorer
+from api.job_model.snapshots import (
+    shared_cache_configured,
+    snapshot_root,
+    write_snapshot,
+)
+from api.job_model.vectorizer_store import vectorizer_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the candidate index and its scoring matrices to a new snapshot "
+        "in CANDIDATE_SNAPSHOT_DIR. Web workers memory-map the newest snapshot "
+        "on their next request, so they share one copy through the page cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=None,
+            help="Snapshots to keep, newest first. Defaults to "
+            "CANDIDATE_SNAPSHOT_KEEP.",
+        )
+
+    def handle(self, *args, **options):
+        if not snapshot_root():
+            raise CommandError("CANDIDATE_SNAPSHOT_DIR is not set")
+        if not shared_cache_configured():
+            # Workers could not replay the changes made after the snapshot
+            raise CommandError(
+                "Candidate snapshots need a cache shared between processes; "
+                "set REDIS_URL"
+            )
+        started = time.perf_counter()
+
+        # Reads the shared version before the rows, so workers replay every
+        # change made while the snapshot was being written
+        index = CandidateIndex.build()
+        arrays, meta = index.to_snapshot()
+        meta["created_at"] = time.time()
+        meta["vectorizers"] = {}
+        objects = {}
+        for kind in POSTING_COLUMNS:
+            vectorizer = vectorizer_store.get(kind)
+            scorer = build_scorer(index, kind, vectorizer)
+            if scorer is None:
+                continue
+            arrays.update(scorer.to_snapshot())
+            meta["vectorizers"][kind] = {
+                "version": (
+                    vectorizer_store.version(kind) if vectorizer is not None else None
+                ),
+                "shape": list(scorer.matrix.shape),
+            }
+            if vectorizer is None:
+                objects[f"vectorizer-{kind}"] = scorer.vectorizer
+
+        snapshot = write_snapshot(arrays, meta, objects, keep=options["keep"])
+        size = sum(array.nbytes for array in arrays.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {snapshot.name}: {meta['rows']} candidates, "
+                f"{size / 2**20:.1f} MB in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,165 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.job_model.candidate_index import invalidate_candidate_index
+from api.job_model.ingest import CONTENT_FIELDS, content_hash
+from api.job_model.job_index import invalidate_job_index
+from api.job_model.skills import normalize_skill, normalize_skills
+from api.models import IngestedJob, JobPreference, JobSkills, Profile, UserSkills
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill canonical skill names (api/job_model/skills.py) into existing "
+        "UserSkills, JobSkills and ingested jobs. Rows that become duplicates "
+        "are merged into one, keeping every profile, job and preference link."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change and roll everything back.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+        self.batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            user_renamed, user_merged = self.canonicalize_user_skills()
+            job_renamed, job_merged = self.canonicalize_job_skills()
+            ingested = self.canonicalize_ingested_jobs()
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"UserSkills: {user_renamed} renamed, {user_merged} merged\n"
+            f"JobSkills: {job_renamed} renamed, {job_merged} merged\n"
+            f"Ingested jobs: {ingested} updated"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run; nothing was saved"))
+            return
+
+        # Renames are bulk updates that bypass signals
+        invalidate_candidate_index()
+        invalidate_job_index("job")
+        invalidate_job_index("ingested_job")
+        JobPreference.objects.update(feed_refreshed_at=None)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Done. Run refit_vectorizers so the TF-IDF vocabulary drops the "
+                "merged spellings."
+            )
+        )
+
+    def canonicalize_user_skills(self):
+        """
+        UserSkills rows are per user, so two spellings of one skill only
+        collide within the same user's rows.
+        """
+        renamed, duplicates = [], {}
+        current_user, kept = None, {}
+        for skill_id, user_id, name in (
+            UserSkills.objects.order_by("user_id", "id")
+            .values_list("id", "user_id", "name")
+            .iterator()
+        ):
+            if user_id != current_user:
+                current_user, kept = user_id, {}
+            canonical = normalize_skill(name) or name
+            keeper = kept.setdefault(canonical, skill_id)
+            if keeper != skill_id:
+                duplicates[skill_id] = keeper
+            elif canonical != name:
+                renamed.append(UserSkills(id=skill_id, name=canonical))
+
+        UserSkills.objects.bulk_update(renamed, ["name"], batch_size=self.batch_size)
+        self.merge(Profile.skills.through, "profile", "userskills", duplicates)
+        for chunk in _chunks(duplicates, self.batch_size):
+            # Deleting fires the candidate signals, so these users are
+            # refreshed and re-matched like any other profile change
+            UserSkills.objects.filter(id__in=chunk).delete()
+        return len(renamed), len(duplicates)
+
+    def canonicalize_job_skills(self):
+        """JobSkills names are unique, so spellings merge across all jobs."""
+        by_name = dict(JobSkills.objects.values_list("name", "id"))
+        renamed, duplicates = [], {}
+        for skill_id, name in JobSkills.objects.order_by("id").values_list(
+            "id", "name"
+        ):
+            canonical = normalize_skill(name) or name
+            if canonical == name:
+                continue
+            keeper = by_name.setdefault(canonical, skill_id)
+            if keeper == skill_id:
+                renamed.append(JobSkills(id=skill_id, name=canonical))
+            else:
+                duplicates[skill_id] = keeper
+
+        for relation in JobSkills._meta.related_objects:
+            if relation.many_to_many:
+                self.merge(
+                    relation.through,
+                    relation.field.m2m_field_name(),
+                    relation.field.m2m_reverse_field_name(),
+                    duplicates,
+                )
+        for chunk in _chunks(duplicates, self.batch_size):
+            JobSkills.objects.filter(id__in=chunk).delete()
+        JobSkills.objects.bulk_update(renamed, ["name"], batch_size=self.batch_size)
+        return len(renamed), len(duplicates)
+
+    def merge(self, through, owner, skill, duplicates):
+        """Point `through` rows at the kept skill of each duplicate."""
+        for chunk in _chunks(duplicates, self.batch_size):
+            links = through.objects.filter(**{f"{skill}_id__in": chunk}).values_list(
+                f"{owner}_id", f"{skill}_id"
+            )
+            through.objects.bulk_create(
+                [
+                    through(**{f"{owner}_id": owner_id, f"{skill}_id": duplicates[s]})
+                    for owner_id, s in links
+                ],
+                ignore_conflicts=True,
+            )
+
+    def canonicalize_ingested_jobs(self):
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(
+                IngestedJob.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", *CONTENT_FIELDS)[: self.batch_size]
+            )
+            if not batch:
+                return updated
+            last_id = batch[-1].id
+
+            changed = []
+            for job in batch:
+                required = normalize_skills(job.required_skills)
+                preferred = normalize_skills(job.preferred_skills)
+                if (required, preferred) != (
+                    job.required_skills,
+                    job.preferred_skills,
+                ):
+                    job.required_skills, job.preferred_skills = required, preferred
+                    # Keep the hash equal to that of a re-sent payload
+                    job.content_hash = content_hash(job)
+                    changed.append(job)
+            IngestedJob.objects.bulk_update(
+                changed, ["required_skills", "preferred_skills", "content_hash"]
+            )
+            updated += len(changed)
@@ -0,0 +1,136 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.job_model.candidate_index import invalidate_candidate_index
+from api.job_model.job_index import invalidate_job_index
+from api.job_model.synthetic import (
+    SampleDistributions,
+    clear_synthetic_data,
+    ensure_vocabulary,
+    generate_boost_jobs,
+    generate_candidates,
+    generate_companies,
+    generate_jobs,
+    generate_preferences,
+)
+from api.models import JobPreference
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic candidates, jobs, boost jobs and job preferences "
+        "whose skill, category, location and salary distributions are seeded "
+        "from sample_data/*.csv. Rows are bulk inserted, so signals do not "
+        "fire; the resident indexes are invalidated at the end instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=10_000,
+            help="Number of candidates, e.g. 10000, 100000 or 1000000.",
+        )
+        parser.add_argument("--jobs", type=int, default=None)
+        parser.add_argument("--boost-jobs", type=int, default=None)
+        parser.add_argument("--companies", type=int, default=None)
+        parser.add_argument(
+            "--preferences-ratio",
+            type=float,
+            default=0.1,
+            help="Share of candidates that get a JobPreference.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--sample-dir", default=None, help="Defaults to BASE_DIR/sample_data."
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated data before generating.",
+        )
+
+    def handle(self, *args, **options):
+        # bulk_create has to return primary keys (Postgres, SQLite >= 3.35)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError("This database backend is not supported")
+        if options["users"] < 0 or options["batch_size"] <= 0:
+            raise CommandError("--users and --batch-size must be positive")
+
+        users = options["users"]
+        jobs = options["jobs"] if options["jobs"] is not None else users // 100
+        boost_jobs = options["boost_jobs"]
+        if boost_jobs is None:
+            boost_jobs = users // 50
+        companies = options["companies"] or max(1, jobs // 20)
+        batch_size = options["batch_size"]
+
+        if options["clear"]:
+            deleted, _ = clear_synthetic_data()
+            self.stdout.write(f"Deleted {deleted} synthetic rows")
+
+        rng = random.Random(options["seed"])
+        distributions = SampleDistributions(options["sample_dir"])
+        tag = uuid.uuid4().hex[:8]
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            categories, job_skills = ensure_vocabulary(distributions)
+            owners = generate_companies(companies, tag)
+
+        created = preferences = 0
+        batches = generate_candidates(
+            distributions, categories, users, rng, tag, batch_size
+        )
+        while True:
+            with transaction.atomic():
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                with_preference = [
+                    user
+                    for user in batch
+                    if rng.random() < options["preferences_ratio"]
+                ]
+                generate_preferences(
+                    distributions, categories, job_skills, with_preference, rng
+                )
+            created += len(batch)
+            preferences += len(with_preference)
+            self.stdout.write(
+                f"{created}/{users} candidates "
+                f"({time.perf_counter() - started:.1f}s)"
+            )
+
+        with transaction.atomic():
+            generate_jobs(
+                distributions, categories, job_skills, owners, jobs, rng, batch_size
+            )
+        with transaction.atomic():
+            generate_boost_jobs(
+                distributions,
+                categories,
+                job_skills,
+                owners,
+                boost_jobs,
+                rng,
+                batch_size,
+            )
+
+        invalidate_candidate_index()
+        invalidate_job_index("job")
+        # New boost jobs are not in any materialized feed yet
+        JobPreference.objects.update(feed_refreshed_at=None)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {created} candidates, {preferences} job preferences, "
+                f"{companies} companies, {jobs} jobs and {boost_jobs} boost jobs "
+                f"in {time.perf_counter() - started:.1f}s (tag {tag})"
+            )
+        )
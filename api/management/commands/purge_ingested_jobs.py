@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import IngestedJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete ingested jobs whose content has not changed for "
+        "INGESTED_JOB_RETENTION_DAYS days (or --days), together with their "
+        "matches and stored payloads. Off unless a retention is configured; "
+        "recommendations already skip jobs older than INGESTED_JOB_MAX_AGE_DAYS "
+        "without deleting anything."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Retention in days. Defaults to INGESTED_JOB_RETENTION_DAYS.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many jobs would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = getattr(settings, "INGESTED_JOB_RETENTION_DAYS", 0)
+        if not days or days < 0:
+            raise CommandError(
+                "No retention configured; pass --days or set "
+                "INGESTED_JOB_RETENTION_DAYS"
+            )
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        # updated_at only moves when the upsert sees changed content
+        cutoff = timezone.now() - timedelta(days=days)
+        expired = IngestedJob.objects.filter(updated_at__lt=cutoff)
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} ingested jobs would be deleted")
+            return
+
+        deleted = 0
+        while True:
+            ids = list(
+                expired.order_by("id").values_list("id", flat=True)[
+                    : options["batch_size"]
+                ]
+            )
+            if not ids:
+                break
+            # One transaction per batch; post_delete keeps the job index current
+            with transaction.atomic():
+                IngestedJob.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} ingested jobs unchanged for {days} days"
+            )
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.job_model.vectorizer_store import VECTORIZER_NAMES, fit_vectorizer
+
+
+class Command(BaseCommand):
+    help = (
+        "Refit the global skills/categories TF-IDF vectorizers over the whole "
+        "corpus and publish them as the new active model registry version. "
+        "Running workers pick the new version up without a restart."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            choices=sorted(VECTORIZER_NAMES),
+            action="append",
+            help="Only refit this vectorizer (may be repeated). Defaults to all.",
+        )
+
+    def handle(self, *args, **options):
+        for kind in options["kind"] or sorted(VECTORIZER_NAMES):
+            row = fit_vectorizer(kind)
+            self.stdout.write(
+                self.style.SUCCESS(f"Published {row.name} v{row.version}")
+            )
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.job_model.match_worker import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the DB-backed matching queue. Use with MATCHING_WORKER_MODE=command "
+        "to run matching in a separate process instead of the web workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process whatever is pending and exit.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Tasks claimed per iteration (default MATCHING_WORKER_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        interval = getattr(settings, "MATCHING_WORKER_POLL_INTERVAL", 5)
+        while True:
+            processed = process_pending(options["batch_size"])
+            close_old_connections()
+            if processed:
+                self.stdout.write(f"Processed {processed} matching task(s)")
+                continue
+            if options["once"]:
+                return
+            time.sleep(interval)
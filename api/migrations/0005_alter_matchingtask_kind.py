@@ -0,0 +1,25 @@
+# Generated by Django 6.0.3 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_matchingtask"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="matchingtask",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("job", "Job"),
+                    ("ingested_job", "Ingested Job"),
+                    ("candidate", "Candidate"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
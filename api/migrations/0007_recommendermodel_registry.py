@@ -0,0 +1,65 @@
+# Generated by Django 6.0.3 on 2026-10-18 12:00
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def number_existing_versions(apps, schema_editor):
+    """Version existing rows per name by age and activate the newest."""
+    RecommenderModel = apps.get_model("api", "RecommenderModel")
+    versions = {}
+    latest = {}
+    for row in RecommenderModel.objects.order_by("id").iterator():
+        versions[row.name] = versions.get(row.name, 0) + 1
+        row.version = versions[row.name]
+        row.checksum = hashlib.sha256(bytes(row.model_data)).hexdigest()
+        row.save(update_fields=["version", "checksum"])
+        latest[row.name] = row.id
+    RecommenderModel.objects.filter(id__in=latest.values()).update(is_active=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_boostfeedentry_jobpreference_feed_refreshed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recommendermodel",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="recommendermodel",
+            name="checksum",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="recommendermodel",
+            name="is_active",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(number_existing_versions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="recommendermodel",
+            constraint=models.UniqueConstraint(
+                fields=("name", "version"), name="recommendermodel_name_version"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="recommendermodel",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("name",),
+                name="recommendermodel_one_active",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recommendermodel",
+            index=models.Index(
+                fields=["name", "is_active"], name="recommendermodel_active_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.3 on 2026-10-18 13:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_recommendermodel_registry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["experience_level", "years_of_experience"],
+                name="profile_experience_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["currency", "min_salary", "max_salary"],
+                name="profile_salary_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                django.db.models.functions.text.Lower("location"),
+                name="profile_location_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0.3 on 2026-10-18 14:00
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# Frozen copy of api.job_model.ingest.CONTENT_FIELDS/content_hash as of this
+# migration
+CONTENT_FIELDS = (
+    "title",
+    "company",
+    "location",
+    "remote",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "required_skills",
+    "preferred_skills",
+    "years_experience",
+    "employment_type",
+)
+
+
+def content_hash(job):
+    normalized = {}
+    for name in CONTENT_FIELDS:
+        value = getattr(job, name)
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, (list, tuple)):
+            value = sorted(set(value))
+        normalized[name] = value
+    document = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def hash_existing_jobs(apps, schema_editor):
+    """Hash the stored jobs in id-ordered batches."""
+    IngestedJob = apps.get_model("api", "IngestedJob")
+    last_id = 0
+    while True:
+        batch = list(
+            IngestedJob.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", *CONTENT_FIELDS)[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_id = batch[-1].id
+        for job in batch:
+            job.content_hash = content_hash(job)
+        IngestedJob.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_profile_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingestedjob",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.RunPython(hash_existing_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.3 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_ingestedjob_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ingestedjob",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="ingestedjob_recent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingestedjob",
+            index=models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="ingestedjob_status_recent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingestedjob",
+            index=models.Index(
+                fields=["source", "-created_at", "-id"],
+                name="ingestedjob_source_recent_idx",
+            ),
+        ),
+    ]
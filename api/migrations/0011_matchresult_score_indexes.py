@@ -0,0 +1,27 @@
+# Generated by Django 6.0.3 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_ingestedjob_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="matchresult",
+            index=models.Index(
+                fields=["user_id", "-match_score", "-id"],
+                name="matchresult_user_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="matchresult",
+            index=models.Index(
+                fields=["ingested_job", "-match_score", "-id"],
+                name="matchresult_job_score_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 6.0.3 on 2026-10-18 17:00
+
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+
+
+def move_payloads(apps, schema_editor):
+    """
+    Copy raw_payload into compressed IngestedJobPayload rows, one committed
+    id-ordered batch at a time, so a large table is never locked in one
+    transaction and an interrupted run resumes where it stopped.
+    """
+    IngestedJob = apps.get_model("api", "IngestedJob")
+    IngestedJobPayload = apps.get_model("api", "IngestedJobPayload")
+    last_id = (
+        IngestedJobPayload.objects.order_by("-ingested_job_id")
+        .values_list("ingested_job_id", flat=True)
+        .first()
+        or 0
+    )
+    while True:
+        batch = list(
+            IngestedJob.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "raw_payload")[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        records = []
+        for job_id, payload in batch:
+            document = json.dumps(payload or {}, separators=(",", ":")).encode()
+            records.append(
+                IngestedJobPayload(
+                    ingested_job_id=job_id,
+                    codec="zlib",
+                    data=zlib.compress(document),
+                    size=len(document),
+                )
+            )
+        with transaction.atomic():
+            IngestedJobPayload.objects.bulk_create(records, ignore_conflicts=True)
+
+
+def restore_payloads(apps, schema_editor):
+    IngestedJob = apps.get_model("api", "IngestedJob")
+    IngestedJobPayload = apps.get_model("api", "IngestedJobPayload")
+    last_id = 0
+    while True:
+        batch = list(
+            IngestedJobPayload.objects.filter(ingested_job_id__gt=last_id).order_by(
+                "ingested_job_id"
+            )[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_id = batch[-1].ingested_job_id
+        jobs = [
+            IngestedJob(
+                id=record.ingested_job_id,
+                raw_payload=json.loads(zlib.decompress(bytes(record.data))),
+            )
+            for record in batch
+        ]
+        with transaction.atomic():
+            IngestedJob.objects.bulk_update(jobs, ["raw_payload"])
+
+
+class Migration(migrations.Migration):
+
+    # Each batch of move_payloads commits on its own
+    atomic = False
+
+    dependencies = [
+        ("api", "0011_matchresult_score_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestedJobPayload",
+            fields=[
+                (
+                    "ingested_job",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="payload_record",
+                        serialize=False,
+                        to="api.ingestedjob",
+                    ),
+                ),
+                ("codec", models.CharField(default="zlib", max_length=10)),
+                ("data", models.BinaryField()),
+                ("size", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(move_payloads, restore_payloads),
+    ]
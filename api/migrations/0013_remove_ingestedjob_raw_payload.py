@@ -0,0 +1,19 @@
+# Generated by Django 6.0.3 on 2026-10-18 17:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # Separate from 0012: PostgreSQL refuses to ALTER a table with pending
+    # deferred foreign key checks from the rows inserted there
+    dependencies = [
+        ("api", "0012_ingestedjobpayload"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="ingestedjob",
+            name="raw_payload",
+        ),
+    ]
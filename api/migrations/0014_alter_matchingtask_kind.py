@@ -0,0 +1,26 @@
+# Generated by Django 6.0.3 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_remove_ingestedjob_raw_payload"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="matchingtask",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("job", "Job"),
+                    ("ingested_job", "Ingested Job"),
+                    ("candidate", "Candidate"),
+                    ("boost_job", "Boost Job"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -6,16 +6,17 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import accuracy_score
-import joblib
-import os
 
 # Importing the Django models
-from ..models import User, Jobs, AllSkills, UserSkills, UserCategories, CompanyProfile, Profile, Resume, Cover_Letter, Image, EmailVerication_Keys, PasswordReset_keys, JobSkills, Applicants, Assits, AssitSkills
+from ..models import User, Jobs, UserSkills, Profile, JobSkills
+from ..job_model.model_registry import model_cache, publish_model
+
+# Model registry name of the trained classifier and its vectorizer
+MODEL_NAME = 'job_app_mlp'
 
 class JobAppMatching:
-    def __init__(self, model_path='model.pkl', vectorizer_path='vectorizer.pkl'):
-        self.model_path = model_path
-        self.vectorizer_path = vectorizer_path
+    def __init__(self, model_name=MODEL_NAME):
+        self.model_name = model_name
         self.vectorizer = None
         self.model = None
         self.label_encoder = None
@@ -54,7 +55,6 @@ class JobAppMatching:
         if not self.vectorizer:
             self.vectorizer = TfidfVectorizer()
             skill_matrix = self.vectorizer.fit_transform(skills)
-            joblib.dump(self.vectorizer, self.vectorizer_path)
         else:
             skill_matrix = self.vectorizer.transform(skills)
         return skill_matrix
@@ -75,16 +75,25 @@ class JobAppMatching:
         X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=0.2, random_state=42)
         self.model = MLPClassifier(hidden_layer_sizes=(512, 256), activation='relu', max_iter=300)
         self.model.fit(X_train, y_train)
-        joblib.dump(self.model, self.model_path)
+        # Published as one artifact, so workers never pair a model with
+        # another version's vectorizer
+        publish_model(self.model_name, {
+            'model': self.model,
+            'vectorizer': self.vectorizer,
+            'label_encoder': self.label_encoder,
+        })
 
         y_pred = self.model.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
         print(f"Model training completed with accuracy: {accuracy}")
 
     def load_model(self):
-        if os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path):
-            self.model = joblib.load(self.model_path)
-            self.vectorizer = joblib.load(self.vectorizer_path)
+        # Cached per worker; only reloaded when a new version is activated
+        artifact = model_cache.get(self.model_name)
+        if artifact:
+            self.model = artifact['model']
+            self.vectorizer = artifact['vectorizer']
+            self.label_encoder = artifact['label_encoder']
         else:
             print("Model or vectorizer not found. Please train the model first.")
 
@@ -1,11 +1,14 @@
 from os import name
 from unicodedata import category
 from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser, PermissionsMixin
 from django.urls import translate_url
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+import json
 import uuid
+import zlib
 from decimal import Decimal
 from .managers import CustomUserManager
 from cloudinary.models import CloudinaryField
@@ -118,6 +121,20 @@ class Profile(models.Model):
     )
     image = CloudinaryField("image", null=True, blank=True)
 
+    class Meta:
+        # Back the hard candidate filters pushed into SQL (CandidateFilter)
+        indexes = [
+            models.Index(
+                fields=["experience_level", "years_of_experience"],
+                name="profile_experience_idx",
+            ),
+            models.Index(
+                fields=["currency", "min_salary", "max_salary"],
+                name="profile_salary_idx",
+            ),
+            models.Index(Lower("location"), name="profile_location_lower_idx"),
+        ]
+
     def __str__(self):
         return self.user.first_name
 
@@ -264,12 +281,37 @@ class Subscription(models.Model):
 
 
 class RecommenderModel(models.Model):
+    """
+    Model registry entry: one serialized artifact version per row. At most
+    one version per name is active; see api/job_model/model_registry.py.
+    """
+
     name = models.CharField(max_length=255)
+    version = models.PositiveIntegerField(default=1)
     model_data = models.BinaryField()  # This will store the serialized model
+    checksum = models.CharField(max_length=64, blank=True)  # sha256 of model_data
+    is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "version"], name="recommendermodel_name_version"
+            ),
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(is_active=True),
+                name="recommendermodel_one_active",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["name", "is_active"], name="recommendermodel_active_idx"
+            ),
+        ]
+
     def __str__(self):
-        return self.name
+        return f"{self.name} v{self.version}"
 
 
 class Message(models.Model):
@@ -506,10 +548,41 @@ class JobPreference(models.Model):
     min_salary = models.IntegerField(default=0)
     max_salary = models.IntegerField(default=0)
 
+    # When the materialized BoostFeedEntry rows were last rebuilt
+    feed_refreshed_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class BoostFeedEntry(models.Model):
+    """One row of a user's precomputed boost job recommendations."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="boost_feed"
+    )
+    boost_job = models.ForeignKey(
+        BoostJobs, on_delete=models.CASCADE, related_name="feed_entries"
+    )
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "boost_job"], name="boostfeed_user_job_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-score", "boost_job"], name="boostfeed_user_score_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.boost_job_id} ({self.score:.1f})"
+
+
 class IngestedJob(models.Model):
     source_job_id = models.CharField(max_length=1000, unique=True)
     title = models.CharField(max_length=500)
@@ -525,13 +598,116 @@ class IngestedJob(models.Model):
     employment_type = models.CharField(max_length=50, null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     source = models.CharField(max_length=50)
-    raw_payload = models.JSONField(default=dict)
+    # SHA-256 of the normalized job content (see ingest.content_hash), so a
+    # re-sent identical job is recognized without comparing fields
+    content_hash = models.CharField(max_length=64, blank=True, default="")
     status = models.CharField(max_length=20, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        # Keyset pagination of list_ingested_jobs, unfiltered and per filter
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="ingestedjob_recent_idx"),
+            models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="ingestedjob_status_recent_idx",
+            ),
+            models.Index(
+                fields=["source", "-created_at", "-id"],
+                name="ingestedjob_source_recent_idx",
+            ),
+        ]
+
+    @property
+    def raw_payload(self):
+        """
+        The upstream payload, stored compressed in IngestedJobPayload so it
+        stays out of the rows list and match queries read. Loaded (one
+        query) and decompressed on first access, then cached on the instance.
+        """
+        if "_raw_payload" not in self.__dict__:
+            record = None
+            if self.pk is not None:
+                record = IngestedJobPayload.objects.filter(ingested_job=self).first()
+            self._raw_payload = record.load() if record else {}
+        return self._raw_payload
+
+    @raw_payload.setter
+    def raw_payload(self, value):
+        self._raw_payload = value
+        self._raw_payload_changed = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """
+        Reload from the database; the cached payload is dropped too, and
+        reloaded on next access, unless `fields` leaves "raw_payload" out.
+        """
+        if fields is None or "raw_payload" in fields:
+            self.__dict__.pop("_raw_payload", None)
+            self.__dict__.pop("_raw_payload_changed", None)
+        if fields is not None:
+            fields = [f for f in fields if f != "raw_payload"]
+            if not fields:
+                return
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def save(self, *args, **kwargs):
+        """
+        Save the job and, if it was assigned, its raw payload. "raw_payload"
+        may be listed in update_fields like a regular field.
+        """
+        update_fields = kwargs.get("update_fields")
+        store_payload = self.__dict__.get("_raw_payload_changed", False)
+        if update_fields is not None:
+            store_payload = store_payload and "raw_payload" in update_fields
+            kwargs["update_fields"] = [f for f in update_fields if f != "raw_payload"]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if store_payload:
+                IngestedJobPayload.store({self.pk: self._raw_payload})
+                self._raw_payload_changed = False
+
+
+class IngestedJobPayload(models.Model):
+    """Cold storage for IngestedJob.raw_payload: zlib-compressed JSON."""
+
+    ingested_job = models.OneToOneField(
+        IngestedJob,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="payload_record",
+    )
+    codec = models.CharField(max_length=10, default="zlib")
+    data = models.BinaryField()
+    # Uncompressed size in bytes
+    size = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def compress(cls, ingested_job_id, payload):
+        """An unsaved record of `payload` for the job `ingested_job_id`."""
+        document = json.dumps(payload, separators=(",", ":")).encode()
+        return cls(
+            ingested_job_id=ingested_job_id,
+            data=zlib.compress(document),
+            size=len(document),
+        )
+
+    @classmethod
+    def store(cls, payloads):
+        """Insert or replace the payloads of {ingested job id: payload}."""
+        return cls.objects.bulk_create(
+            [cls.compress(job_id, payload) for job_id, payload in payloads.items()],
+            update_conflicts=True,
+            unique_fields=["ingested_job"],
+            update_fields=["codec", "data", "size"],
+        )
+
+    def load(self):
+        if self.codec != "zlib":
+            raise ValueError(f"Unknown payload codec {self.codec!r}")
+        return json.loads(zlib.decompress(bytes(self.data)))
 
 
 class MatchResult(models.Model):
@@ -551,3 +727,50 @@ class MatchResult(models.Model):
 
     class Meta:
         ordering = ["-match_score"]
+        # Best-first, keyset-paginated reads per candidate and per job
+        indexes = [
+            models.Index(
+                fields=["user_id", "-match_score", "-id"],
+                name="matchresult_user_score_idx",
+            ),
+            models.Index(
+                fields=["ingested_job", "-match_score", "-id"],
+                name="matchresult_job_score_idx",
+            ),
+        ]
+
+
+class MatchingTask(models.Model):
+    """DB-backed queue entry for matching that runs outside the request."""
+
+    class Kind(models.TextChoices):
+        JOB = "job", "Job"
+        INGESTED_JOB = "ingested_job", "Ingested Job"
+        CANDIDATE = "candidate", "Candidate"
+        BOOST_JOB = "boost_job", "Boost Job"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="matchingtask_status_idx"),
+            models.Index(fields=["kind", "object_id"], name="matchingtask_object_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} ({self.status})"
@@ -0,0 +1,69 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Opaque cursor for the keyset `values` (datetimes, ints, strings)."""
+    document = json.dumps(
+        [
+            {"dt": value.isoformat()} if hasattr(value, "isoformat") else value
+            for value in values
+        ]
+    )
+    return base64.urlsafe_b64encode(document.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """The keyset values of a cursor from encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        decoded = [
+            parse_datetime(value["dt"]) if isinstance(value, dict) else value
+            for value in values
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or None in decoded:
+        raise InvalidCursor("Invalid cursor")
+    return decoded
+
+
+def keyset_page(queryset, ordering, limit, cursor=None):
+    """
+    One page of `queryset` in `ordering` (field names, "-" for descending,
+    the last one unique, e.g. ("-created_at", "-id")), starting after
+    `cursor`. Seeks with a row comparison on the ordering fields instead of
+    an OFFSET, so every page costs the same. Returns (rows, next cursor or
+    None) with one query.
+    """
+    names = [field.lstrip("-") for field in ordering]
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(names):
+            raise InvalidCursor("Invalid cursor")
+        # (a, b) after (x, y)  <=>  a > x OR (a = x AND b > y), per direction
+        after = Q()
+        for position, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{names[position]}__{lookup}": values[position]})
+            for name, value in zip(names[:position], values):
+                step &= Q(**{name: value})
+            after |= step
+        queryset = queryset.filter(after)
+
+    rows = list(queryset.order_by(*ordering)[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor([last[name] for name in names])
+    return rows, encode_cursor([getattr(last, name) for name in names])
@@ -30,6 +30,8 @@ from rest_framework.serializers import ModelSerializer
 
 from rest_framework import serializers
 
+from .job_model.skills import normalize_skills
+
 # from pathlib import Path
 
 # BASE_DIR = Path(__file__).resolve().parent.parent
@@ -380,9 +382,8 @@ class BoostJobSerializer(serializers.ModelSerializer):
         job = BoostJobs.objects.create(**validated_data)
 
         # Attach skills
-        for name in skill_names:
-            normalized = name.strip().lower()
-            skill, _ = JobSkills.objects.get_or_create(name=normalized)
+        for name in normalize_skills(skill_names):
+            skill, _ = JobSkills.objects.get_or_create(name=name)
             job.job_skills.add(skill)
 
         # Attach categories
@@ -407,10 +408,8 @@ class BoostJobSerializer(serializers.ModelSerializer):
         if skill_names is not None:
             instance.job_skills.clear()
 
-            for name in skill_names:
-                normalized = name.strip().lower()
-
-                skill, _ = JobSkills.objects.get_or_create(name=normalized)
+            for name in normalize_skills(skill_names):
+                skill, _ = JobSkills.objects.get_or_create(name=name)
                 instance.job_skills.add(skill)
 
         # Update categories (replace, not append)
@@ -486,9 +485,8 @@ class JobPreferenceSerializer(serializers.ModelSerializer):
 
         if skills is not None:
             instance.preferred_skills.clear()
-            for name in skills:
-                normalized = name.strip().lower()
-                skill, _ = JobSkills.objects.get_or_create(name=normalized)
+            for name in normalize_skills(skills):
+                skill, _ = JobSkills.objects.get_or_create(name=name)
                 instance.preferred_skills.add(skill)
 
     def create(self, validated_data):
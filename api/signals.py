@@ -1,13 +1,16 @@
 # from django.shortcuts import get_object_or_404, get_list_or_404
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 
 from .models import (
     User,
     Profile,
+    UserSkills,
     Wallet,
     CompanyProfile,
+    Jobs,
+    IngestedJob,
 )
 from django.dispatch import receiver
 from scuibai.settings import BASE_DIR
@@ -15,7 +18,11 @@ from .models import Message
 import resend
 
 
-from .custom_signal import job_created
+from .custom_signal import job_created, boost_job_posted, job_preference_updated
+from .job_model.boost_feed import refresh_boost_feed
+from .job_model.candidate_index import refresh_candidates
+from .job_model.job_index import refresh_jobs
+from .job_model.match_worker import enqueue_boost_feed_update, enqueue_rematch
 
 
 @receiver(post_save, sender=User)
@@ -109,3 +116,108 @@ def send_message_email(sender, instance, created, **kwargs):
 def create_user_wallet(sender, instance, created, **kwargs):
     if created:
         Wallet.objects.create(user=instance)
+
+
+def _refresh_candidates_on_commit(user_ids, rematch=True):
+    """
+    Patch the candidate index once the transaction commits and, for profile
+    changes, queue reverse matching of those users against the open jobs.
+    """
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: refresh_candidates(user_ids))
+    if rematch:
+        transaction.on_commit(lambda: enqueue_rematch(user_ids))
+
+
+@receiver(post_init, sender=User)
+def remember_candidate_state(sender, instance, **kwargs):
+    # Whether the user was a candidate when loaded, so a save can tell if the
+    # index holds them. Read from __dict__: a deferred field would cost a query
+    instance._was_candidate = instance.__dict__.get("company") is False
+
+
+@receiver(post_save, sender=User)
+def update_candidate_index_for_user(sender, instance, update_fields=None, **kwargs):
+    # Matching only depends on the name and whether the user is a candidate;
+    # logins save last_login alone
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    was_candidate = getattr(instance, "_was_candidate", False)
+    instance._was_candidate = instance.company is False
+    if instance.company is not False and not was_candidate:
+        # Company accounts that never were candidates are not indexed
+        return
+    _refresh_candidates_on_commit([instance.id], rematch=False)
+
+
+@receiver(post_delete, sender=User)
+def remove_candidate_from_index(sender, instance, **kwargs):
+    _refresh_candidates_on_commit([instance.id])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=UserSkills)
+@receiver(post_delete, sender=UserSkills)
+def update_candidate_index_for_profile(sender, instance, **kwargs):
+    _refresh_candidates_on_commit([instance.user_id])
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+@receiver(m2m_changed, sender=Profile.categories.through)
+def update_candidate_index_for_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        _refresh_candidates_on_commit([instance.user_id])
+    elif pk_set:
+        _refresh_candidates_on_commit(
+            Profile.objects.filter(pk__in=pk_set).values_list("user_id", flat=True)
+        )
+
+
+def _refresh_jobs_on_commit(kind, job_ids, deleted=False):
+    job_ids = list(job_ids)
+    transaction.on_commit(lambda: refresh_jobs(kind, job_ids, deleted=deleted))
+
+
+@receiver(post_save, sender=Jobs)
+def update_job_index_for_job(sender, instance, **kwargs):
+    _refresh_jobs_on_commit("job", [instance.id])
+
+
+@receiver(post_delete, sender=Jobs)
+def remove_job_from_index(sender, instance, **kwargs):
+    _refresh_jobs_on_commit("job", [instance.id], deleted=True)
+
+
+@receiver(m2m_changed, sender=Jobs.categories.through)
+def update_job_index_for_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        _refresh_jobs_on_commit("job", [instance.id])
+    elif pk_set:
+        _refresh_jobs_on_commit("job", pk_set)
+
+
+@receiver(post_save, sender=IngestedJob)
+def update_job_index_for_ingested_job(sender, instance, **kwargs):
+    # Jobs enter the index once their matches are published (status "matched")
+    _refresh_jobs_on_commit("ingested_job", [instance.id])
+
+
+@receiver(post_delete, sender=IngestedJob)
+def remove_ingested_job_from_index(sender, instance, **kwargs):
+    _refresh_jobs_on_commit("ingested_job", [instance.id], deleted=True)
+
+
+@receiver(job_preference_updated)
+def refresh_feed_for_preference(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_boost_feed(instance))
+
+
+@receiver(boost_job_posted)
+def update_feeds_for_posted_boost_job(sender, instance, **kwargs):
+    # Re-scores every materialized feed, so it runs on the matching queue
+    enqueue_boost_feed_update(instance.id)
@@ -1,25 +0,0 @@
-import string
-from django.test import TestCase
-from random import randint 
-
-name = False
-
-if not name:
-    print(name)
-else:
-    print("")
-
-# key = [randint(0, 9) for x in range(4)]
-# print(key)
-# # Join the digits into a single string without brackets and commas
-# print(''.join(map(str, key)))
-
-# with open('key.txt', 'r') as f:
-#     key = f.read()
-#     print(key)
-# with open('key.txt', 'w') as f:
-#     new_key = f.write("A New Key")
-    
-# with open('key.txt', 'r') as f:
-#     key = f.read()
-#     print(key)
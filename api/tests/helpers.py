@@ -0,0 +1,25 @@
+from ..models import Profile, User, UserSkills
+
+
+def make_candidate(email, skills=(), **profile):
+    user = User.objects.create(
+        email=email, first_name=email.split("@")[0], company=False
+    )
+    Profile.objects.create(user=user, **profile)
+    for name in skills:
+        UserSkills.objects.create(user=user, name=name)
+    return user
+
+
+def job_payload(job_id, **overrides):
+    payload = {
+        "job_id": job_id,
+        "job_title": "Backend Engineer",
+        "company": "Scuib",
+        "location": "Lagos",
+        "required_skills": ["Python", "Django"],
+        "years_experience": 3,
+        "description": "Build the matching API.",
+    }
+    payload.update(overrides)
+    return payload
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..job_model.boost_feed import (
+    boost_feed_for,
+    refresh_boost_feed,
+    update_feeds_for_boost_job,
+)
+from ..job_model.boost_scoring import recommend_boost_jobs
+from ..models import BoostFeedEntry, BoostJobs, JobPreference, JobSkills, User
+
+
+@override_settings(BOOST_FEED_SIZE=2)
+class BoostFeedTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(email="hr@example.com", company=True)
+        self.skills = [JobSkills.objects.create(name=f"skill-{n}") for n in range(4)]
+        self.user = User.objects.create(email="ada@example.com", company=False)
+        self.pref = JobPreference.objects.create(
+            user=self.user, preferred_job_types=["FULL_TIME"]
+        )
+        self.pref.preferred_skills.set(self.skills)
+        self.one = self.boost_job(1)
+        self.two = self.boost_job(2)
+
+    def boost_job(self, matched_skills, job_type="FULL_TIME"):
+        job = BoostJobs.objects.create(
+            title=f"{matched_skills} skills",
+            owner=self.owner,
+            job_type=job_type,
+            job_nature="REMOTE",
+            location="lagos",
+            experience_level="MID",
+            min_salary=0,
+            max_salary=0,
+            application_link="https://example.com/apply",
+        )
+        job.job_skills.set(self.skills[:matched_skills])
+        return job
+
+    def feed(self):
+        return list(
+            BoostFeedEntry.objects.filter(user=self.user)
+            .order_by("-score", "boost_job_id")
+            .values_list("boost_job_id", flat=True)
+        )
+
+    def assert_feed_is_fresh(self):
+        expected = [job.id for job, _ in recommend_boost_jobs(self.pref, limit=2)]
+        self.assertEqual(self.feed(), expected)
+
+    def test_refresh_materializes_the_top_jobs(self):
+        refresh_boost_feed(self.pref)
+        self.assertEqual(self.feed(), [self.two.id, self.one.id])
+        self.pref.refresh_from_db()
+        self.assertIsNotNone(self.pref.feed_refreshed_at)
+
+    def test_better_job_evicts_the_lowest_entry(self):
+        refresh_boost_feed(self.pref)
+
+        three = self.boost_job(3)
+        self.assertEqual(update_feeds_for_boost_job(three), 1)
+        self.assertEqual(self.feed(), [three.id, self.two.id])
+        self.assert_feed_is_fresh()
+
+    def test_worse_job_does_not_enter_a_full_feed(self):
+        refresh_boost_feed(self.pref)
+
+        self.assertEqual(update_feeds_for_boost_job(self.boost_job(0)), 0)
+        self.assertEqual(self.feed(), [self.two.id, self.one.id])
+
+    def test_edited_job_is_rescored_or_dropped(self):
+        refresh_boost_feed(self.pref)
+
+        self.one.job_skills.set(self.skills)
+        update_feeds_for_boost_job(self.one)
+        self.assertEqual(self.feed(), [self.one.id, self.two.id])
+
+        self.one.job_type = "CONTRACT"
+        self.one.save()
+        update_feeds_for_boost_job(self.one)
+        self.assertEqual(self.feed(), [self.two.id])
+
+    def test_feeds_never_built_are_left_alone(self):
+        self.assertEqual(update_feeds_for_boost_job(self.boost_job(3)), 0)
+        self.assertFalse(BoostFeedEntry.objects.exists())
+
+    @override_settings(BOOST_FEED_MAX_AGE=60)
+    def test_stale_feeds_are_refreshed_on_read(self):
+        refresh_boost_feed(self.pref)
+        self.pref.refresh_from_db()
+        three = self.boost_job(3)
+
+        # Fresh: served as stored, without the job posted meanwhile
+        self.assertEqual(
+            [job.id for job, _ in boost_feed_for(self.pref)],
+            [self.two.id, self.one.id],
+        )
+
+        self.pref.feed_refreshed_at = timezone.now() - timedelta(seconds=61)
+        self.assertEqual(
+            [job.id for job, _ in boost_feed_for(self.pref)], [three.id, self.two.id]
+        )
+        self.assert_feed_is_fresh()
@@ -0,0 +1,110 @@
+import random
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models.functions import Lower
+from django.test import TestCase
+
+from ..job_model.boost_scoring import (
+    boost_score_expression,
+    filtered_boost_jobs,
+    preference_terms,
+    recommend_boost_jobs,
+    recommend_boost_jobs_python,
+    score_boost_job,
+)
+from ..models import BoostJobs, JobPreference, JobSkills, User, UserCategories
+
+
+def make_boost_jobs(owner, skills, categories, count, seed=0):
+    rng = random.Random(seed)
+    jobs = []
+    for number in range(count):
+        job = BoostJobs.objects.create(
+            title=f"Boost job {number}",
+            owner=owner,
+            job_type=rng.choice(BoostJobs.JobType.values),
+            job_nature=rng.choice(BoostJobs.JobNature.values),
+            location=rng.choice(["Lagos", "lagos", "Nairobi", "remote"]),
+            experience_level=rng.choice(BoostJobs.ExperienceLevel.values),
+            min_salary=rng.choice([0, 1000, 2000]),
+            max_salary=rng.choice([0, 5000, 9000]),
+            application_link="https://example.com/apply",
+        )
+        job.job_skills.set(rng.sample(skills, rng.randint(0, len(skills))))
+        job.job_categories.set(rng.sample(categories, rng.randint(0, 3)))
+        jobs.append(job)
+    return jobs
+
+
+class BoostScoringTests(TestCase):
+    """The SQL score expression agrees with the Python reference."""
+
+    def setUp(self):
+        self.owner = User.objects.create(email="hr@example.com", company=True)
+        self.skills = [JobSkills.objects.create(name=f"skill-{n}") for n in range(10)]
+        self.categories = [
+            UserCategories.objects.create(name=f"category-{n}") for n in range(4)
+        ]
+        make_boost_jobs(self.owner, self.skills, self.categories, 40)
+
+    def preference(self, **fields):
+        pref = JobPreference.objects.create(user=self.owner, **fields)
+        pref.preferred_skills.set(self.skills[:8])
+        pref.preferred_categories.set(self.categories[:3])
+        return pref
+
+    def assert_scores_agree(self, pref):
+        terms = preference_terms(pref)
+        jobs = (
+            filtered_boost_jobs(terms)
+            .annotate(location_lower=Lower("location"))
+            .annotate(boost_score=boost_score_expression(terms))
+            .prefetch_related("job_skills", "job_categories")
+        )
+        self.assertTrue(jobs)
+        for job in jobs:
+            expected = score_boost_job(
+                job,
+                terms,
+                {s.name for s in job.job_skills.all()},
+                {c.name for c in job.job_categories.all()},
+            )
+            self.assertEqual(job.boost_score, expected, f"job {job.id}")
+
+        def ranking(result):
+            return [(job.id, round(score, 6)) for job, score in result]
+
+        self.assertEqual(
+            ranking(recommend_boost_jobs(pref, limit=10)),
+            ranking(recommend_boost_jobs_python(pref, limit=10)),
+        )
+
+    def test_scores_every_preference_term(self):
+        self.assert_scores_agree(
+            self.preference(
+                preferred_job_types=["FULL_TIME", "CONTRACT"],
+                preferred_job_nature=["REMOTE"],
+                preferred_locations=["Lagos", "remote"],
+                min_salary=500,
+                max_salary=6000,
+            )
+        )
+
+    def test_empty_preferences_only_score_skills_and_categories(self):
+        self.assert_scores_agree(self.preference())
+
+    def test_hard_filters_narrow_both_versions(self):
+        self.assert_scores_agree(
+            self.preference(
+                preferred_experience=["MID", "SENIOR"],
+                preferred_job_types=["FULL_TIME"],
+            )
+        )
+
+    def test_benchmark_reports_matching_rankings(self):
+        stdout = StringIO()
+        call_command(
+            "benchmark_boost_scoring", "--jobs", "200", "--repeat", "1", stdout=stdout
+        )
+        self.assertIn("Rankings match", stdout.getvalue())
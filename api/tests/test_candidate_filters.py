@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..job_model import candidate_index
+from ..job_model.candidate_filters import CandidateFilter
+from ..job_model.job_recommender import JobAppMatching
+from ..models import Profile, User
+from .helpers import make_candidate
+
+
+class CandidateFilterTests(TestCase):
+    def setUp(self):
+        self.ada = make_candidate(
+            "ada@example.com",
+            experience_level="Senior",
+            years_of_experience=8,
+            location="Lagos",
+            job_location=Profile.JobLocationChoices.REMOTE,
+            min_salary=3000,
+            max_salary=5000,
+            currency="USD",
+        )
+        self.grace = make_candidate(
+            "grace@example.com",
+            experience_level="Entry",
+            years_of_experience=1,
+            location="Nairobi",
+            job_location=Profile.JobLocationChoices.ONSITE,
+            min_salary=500,
+            max_salary=1000,
+            currency="USD",
+        )
+        self.linus = make_candidate(
+            "linus@example.com",
+            experience_level="Mid",
+            years_of_experience=4,
+            location="lagos",
+            job_location=Profile.JobLocationChoices.HYBRID,
+            min_salary=2000,
+            max_salary=3000,
+            currency="NGN",
+        )
+
+    def matching(self, candidate_filter):
+        users = candidate_filter.apply(User.objects.filter(company=False))
+        return set(users.values_list("id", flat=True))
+
+    def test_constraints(self):
+        self.assertEqual(
+            self.matching(CandidateFilter(min_experience="mid", min_years=3)),
+            {self.ada.id, self.linus.id},
+        )
+        self.assertEqual(
+            self.matching(CandidateFilter(location=" LAGOS ")),
+            {self.ada.id, self.linus.id},
+        )
+        self.assertEqual(
+            self.matching(
+                CandidateFilter(min_salary=2500, max_salary=4000, currency="USD")
+            ),
+            {self.ada.id},
+        )
+        self.assertEqual(
+            self.matching(CandidateFilter(remote=True)), {self.ada.id, self.linus.id}
+        )
+        self.assertEqual(
+            self.matching(CandidateFilter(remote=False)),
+            {self.grace.id, self.linus.id},
+        )
+
+    def test_empty_filter_matches_everyone(self):
+        self.assertFalse(CandidateFilter())
+        self.assertEqual(
+            self.matching(CandidateFilter()),
+            {self.ada.id, self.grace.id, self.linus.id},
+        )
+
+    def test_filters_are_applied_in_sql(self):
+        candidate_filter = CandidateFilter(min_experience="senior", location="lagos")
+        users = candidate_filter.apply(User.objects.filter(company=False))
+        sql = str(users.query)
+        self.assertIn("experience_level", sql)
+        self.assertIn("location", sql)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(users.values_list("id", flat=True)), [self.ada.id])
+
+    def test_remote_job_ignores_location(self):
+        job_profile = {
+            "experience_level": "entry",
+            "years_of_experience": 0,
+            "location": "nairobi",
+            "remote": True,
+        }
+        candidate_filter = CandidateFilter.for_job(job_profile, ["location", "remote"])
+        self.assertIsNone(candidate_filter.location)
+        self.assertEqual(self.matching(candidate_filter), {self.ada.id, self.linus.id})
+        with self.assertRaises(ValueError):
+            CandidateFilter.for_job(job_profile, ["shoe_size"])
+
+    def test_jobs_load_only_candidates_meeting_their_constraints(self):
+        cache.clear()
+        candidate_index._index = None
+        self.addCleanup(setattr, candidate_index, "_index", None)
+        job_profile = {
+            "experience_level": "mid",
+            "years_of_experience": 3,
+            "location": "lagos",
+            "remote": False,
+        }
+
+        with override_settings(CANDIDATE_HARD_FILTERS=()):
+            index = JobAppMatching().load_users_for_job(job_profile)
+            self.assertEqual(len(index), 3)
+        with override_settings(CANDIDATE_HARD_FILTERS=("experience", "location")):
+            index = JobAppMatching().load_users_for_job(job_profile)
+            self.assertEqual(
+                sorted(index.values("user_id", index.live_rows())),
+                sorted([self.ada.id, self.linus.id]),
+            )
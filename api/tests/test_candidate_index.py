@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..job_model import candidate_index
+from ..job_model.candidate_index import CandidateIndex, refresh_candidates
+from ..models import User, UserSkills
+from .helpers import make_candidate
+
+
+class CandidateIndexTests(TestCase):
+    """Incremental updates of the resident index and the scorer built on it."""
+
+    def setUp(self):
+        cache.clear()
+        candidate_index._index = None
+        self.ada = make_candidate("ada@example.com", ["python"])
+        self.grace = make_candidate("grace@example.com", ["django"])
+
+    def tearDown(self):
+        candidate_index._index = None
+
+    def skills_of(self, index, user):
+        return index.values("skills", [index.row_of(user.id)])[0]
+
+    def test_refresh_patches_the_resident_index(self):
+        index = candidate_index._index = CandidateIndex.build()
+
+        UserSkills.objects.create(user=self.ada, name="django")
+        refresh_candidates([self.ada.id])
+
+        self.assertEqual(self.skills_of(index, self.ada), "django;python")
+        self.assertEqual(index.version, 1)
+        self.assertEqual(index.changed_since(0).tolist(), [index.row_of(self.ada.id)])
+
+    def test_removed_candidate_is_no_longer_live(self):
+        index = candidate_index._index = CandidateIndex.build()
+        position = index.row_of(self.grace.id)
+
+        self.grace.company = True
+        self.grace.save()
+        refresh_candidates([self.grace.id])
+
+        self.assertFalse(index.alive[position])
+        self.assertEqual(len(index), 1)
+
+
+@mock.patch("api.signals.refresh_candidates")
+class CandidateIndexSignalTests(TestCase):
+    """Which User saves refresh the candidate index."""
+
+    def save(self, user, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(**kwargs)
+
+    def test_candidate_changes_refresh_the_index(self, refresh):
+        ada = make_candidate("ada@example.com")
+        refresh.reset_mock()
+
+        ada.first_name = "Ada"
+        self.save(ada)
+        refresh.assert_called_once_with([ada.id])
+
+    def test_logins_are_skipped(self, refresh):
+        ada = make_candidate("ada@example.com")
+        refresh.reset_mock()
+
+        self.save(ada, update_fields=["last_login"])
+        refresh.assert_not_called()
+
+    def test_company_accounts_are_skipped(self, refresh):
+        with self.captureOnCommitCallbacks(execute=True):
+            company = User.objects.create(email="hr@example.com", company=True)
+        self.save(User.objects.get(id=company.id))
+        refresh.assert_not_called()
+
+    def test_candidate_turning_company_is_removed(self, refresh):
+        ada = make_candidate("ada@example.com")
+        refresh.reset_mock()
+
+        ada = User.objects.get(id=ada.id)
+        ada.company = True
+        self.save(ada)
+        refresh.assert_called_once_with([ada.id])
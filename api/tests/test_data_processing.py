@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+
+from ..job_model.data_processing import DataPreprocessor
+from ..models import Jobs, JobSkills, Profile, User, UserCategories, UserSkills
+from .helpers import make_candidate
+
+# (skills, categories, min_salary, max_salary, years_of_experience)
+PROFILES = [
+    (["python", "django"], ["backend"], 1000, 3000, 4),
+    (["react"], ["frontend"], 100, 500, 1),
+    ([], [], 2000, 4000, 3),
+    (["python"], ["backend", "data"], 6000, 9000, 0),
+    (["go"], ["devops"], 10, 10, 8),
+]
+
+
+def row_by_row_scores(job, min_score=1):
+    """The original per-profile loading and apply() matchers, as a reference."""
+    job_categories = set(c.name for c in job.categories.all())
+    rows = []
+    for profile in Profile.objects.order_by("id"):
+        rows.append(
+            {
+                "id": profile.user.id,
+                "skills": " ".join(profile.skills.values_list("name", flat=True)),
+                "category": " ".join(profile.categories.values_list("name", flat=True)),
+                "min_salary": profile.min_salary,
+                "max_salary": profile.max_salary,
+                "experience": profile.years_of_experience,
+            }
+        )
+    users = pd.DataFrame(rows)
+    exp_match = users["experience"].apply(
+        lambda x: job.years_of_experience <= x <= np.inf
+    )
+    category_match = users["category"].apply(
+        lambda x: bool(set(x.split()) & job_categories)
+    )
+    salary_match = (users["min_salary"] <= job.max_salary) & (
+        users["max_salary"] >= job.min_salary
+    )
+    users["total_match"] = (
+        exp_match.astype(int) + category_match.astype(int) + salary_match.astype(int)
+    )
+    return scores_of(users[users["total_match"] >= min_score])
+
+
+def scores_of(frame):
+    return sorted(
+        zip(frame["id"].tolist(), frame["total_match"].tolist()),
+        key=lambda row: (-row[1], row[0]),
+    )
+
+
+class DataPreprocessorTests(TestCase):
+    def setUp(self):
+        for number, (skills, categories, low, high, years) in enumerate(PROFILES):
+            user = make_candidate(
+                f"user{number}@example.com",
+                skills,
+                min_salary=low,
+                max_salary=high,
+                years_of_experience=years,
+            )
+            profile = user.profile
+            profile.skills.set(UserSkills.objects.filter(user=user))
+            profile.categories.set(
+                [UserCategories.objects.create(name=name) for name in categories]
+            )
+
+        owner = User.objects.create(email="hr@example.com", company=True)
+        self.job = Jobs.objects.create(
+            owner=owner,
+            title="Backend Engineer",
+            description="Build the matching API",
+            location="Lagos",
+            min_salary=2500,
+            max_salary=5000,
+            employment_type="R",
+            years_of_experience=3,
+        )
+        self.job.skills.set(
+            [JobSkills.objects.create(name=name) for name in ("python", "django")]
+        )
+        self.job.categories.set(UserCategories.objects.filter(name="backend"))
+
+    def test_scores_match_the_row_by_row_pipeline(self):
+        preprocessor = DataPreprocessor()
+        preprocessor.load_data(self.job.id)
+        for min_score in (1, 2, 3):
+            self.assertEqual(
+                scores_of(preprocessor.get_matching_scores(min_score)),
+                row_by_row_scores(self.job, min_score),
+            )
+
+    def test_loading_costs_a_constant_number_of_queries(self):
+        # job, its skills and categories, profiles, all skills, all categories
+        with self.assertNumQueries(6):
+            _, users = DataPreprocessor().load_data(self.job.id)
+        self.assertEqual(len(users), len(PROFILES))
+
+        make_candidate("late@example.com", ["python"])
+        with self.assertNumQueries(6):
+            _, users = DataPreprocessor().load_data(self.job.id)
+        self.assertEqual(len(users), len(PROFILES) + 1)
+
+    def test_chunked_scores_match_loading_everything(self):
+        preprocessor = DataPreprocessor()
+        preprocessor.load_data(self.job.id)
+        expected = scores_of(preprocessor.get_matching_scores())
+
+        for chunk_size in (1, 2, len(PROFILES)):
+            chunked = DataPreprocessor().get_matching_scores_chunked(
+                self.job.id, chunk_size=chunk_size
+            )
+            self.assertEqual(scores_of(chunked), expected)
+
+    def test_preprocess_builds_feature_matrices(self):
+        preprocessor = DataPreprocessor()
+        preprocessor.load_data(self.job.id)
+        preprocessor.preprocess_data()
+        users, job = preprocessor.get_feature_matrices()
+        self.assertEqual(users.shape[0], len(PROFILES))
+        self.assertEqual(job.shape[0], 1)
+
+        # Only the first and fourth users share words with the job
+        overlap = (users @ job.T).toarray().ravel()
+        self.assertEqual(np.flatnonzero(overlap).tolist(), [0, 3])
+
+    def test_scoring_before_loading_is_an_error(self):
+        with self.assertRaises(ValueError):
+            DataPreprocessor().preprocess_data()
@@ -0,0 +1,206 @@
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..job_model import candidate_index
+from ..job_model.ingest import (
+    ingest_batch,
+    ingested_fields_from_payload,
+    match_ingested_job,
+    upsert_ingested_job,
+)
+from ..models import IngestedJob, MatchingTask, MatchResult
+from .helpers import job_payload, make_candidate
+
+
+@override_settings(MATCHING_WORKER_MODE="command")
+class IngestBulkTests(TestCase):
+    url = "/api/jobs/ingest/bulk/"
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def post_json(self, data):
+        return self.client.post(self.url, data, format="json")
+
+    def post_ndjson(self, lines):
+        return self.client.post(
+            self.url, "\n".join(lines), content_type="application/x-ndjson"
+        )
+
+    def statuses(self, response):
+        return [result["status"] for result in response.data["results"]]
+
+    def test_json_array_is_ingested_and_queued_together(self):
+        response = self.post_json([job_payload(f"job-{n}") for n in range(3)])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(self.statuses(response), ["created"] * 3)
+        self.assertEqual(
+            sorted(
+                MatchingTask.objects.filter(
+                    kind=MatchingTask.Kind.INGESTED_JOB
+                ).values_list("object_id", flat=True)
+            ),
+            sorted(r["ingested_job_id"] for r in response.data["results"]),
+        )
+
+        response = self.post_json({"jobs": [job_payload("job-0")]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(response), ["unchanged"])
+        self.assertEqual(MatchingTask.objects.count(), 3)
+
+    def test_ndjson_lines_are_reported_one_by_one(self):
+        response = self.post_ndjson(
+            [
+                json.dumps(job_payload("job-1")),
+                "",
+                "{not json",
+                json.dumps(job_payload("")),
+                json.dumps(["not", "an", "object"]),
+                json.dumps(job_payload("job-2")),
+            ]
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            self.statuses(response),
+            ["created", "invalid", "invalid", "invalid", "created"],
+        )
+        self.assertEqual(
+            [r["index"] for r in response.data["results"]], [0, 1, 2, 3, 4]
+        )
+        self.assertIn("Malformed JSON line", response.data["results"][1]["error"])
+        self.assertEqual(
+            set(IngestedJob.objects.values_list("source_job_id", flat=True)),
+            {"job-1", "job-2"},
+        )
+
+    def test_repeats_within_a_request_are_stored_once(self):
+        response = self.post_json(
+            [job_payload("job-1"), job_payload("job-1", years_experience=6)]
+        )
+        self.assertEqual(self.statuses(response), ["created", "unchanged"])
+        job = IngestedJob.objects.get()
+        # The last version sent wins
+        self.assertEqual(job.years_experience, 6)
+        self.assertEqual(MatchingTask.objects.count(), 1)
+
+    @override_settings(INGEST_BATCH_SIZE=2, INGEST_MAX_JOBS=3)
+    def test_requests_are_read_in_batches_up_to_the_limit(self):
+        response = self.post_json([job_payload(f"job-{n}") for n in range(4)])
+        self.assertEqual(response.data["count"], 3)
+        self.assertTrue(response.data["truncated"])
+        self.assertEqual([r["index"] for r in response.data["results"]], [0, 1, 2])
+        self.assertEqual(IngestedJob.objects.count(), 3)
+
+    def test_bodies_that_are_not_job_lists_are_rejected(self):
+        for data in ({"jobs": "job-1"}, {"job_id": "job-1"}):
+            self.assertEqual(self.post_json(data).status_code, 400)
+
+    def test_batches_cost_a_constant_number_of_queries(self):
+        def queries(count, prefix):
+            payloads = [job_payload(f"{prefix}-{n}") for n in range(count)]
+            with CaptureQueriesContext(connection) as context:
+                ingest_batch(payloads)
+            return len(context)
+
+        self.assertEqual(queries(2, "small"), queries(20, "large"))
+
+
+class UpsertIngestedJobTests(TestCase):
+    def test_outcomes_follow_the_content_hash(self):
+        job, outcome = upsert_ingested_job(
+            ingested_fields_from_payload(job_payload("job-1"))
+        )
+        self.assertEqual(outcome, "created")
+
+        same, outcome = upsert_ingested_job(
+            ingested_fields_from_payload(job_payload("job-1"))
+        )
+        self.assertEqual((same.id, outcome), (job.id, "unchanged"))
+
+        IngestedJob.objects.filter(id=job.id).update(status="matched")
+        changed, outcome = upsert_ingested_job(
+            ingested_fields_from_payload(job_payload("job-1", years_experience=5))
+        )
+        self.assertEqual((changed.id, outcome), (job.id, "updated"))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(job.years_experience, 5)
+        self.assertEqual(job.raw_payload["years_experience"], 5)
+
+    def test_skill_spelling_does_not_change_the_hash(self):
+        first = ingested_fields_from_payload(job_payload("job-1"))
+        second = ingested_fields_from_payload(
+            job_payload("job-1", required_skills=["python3", "django"])
+        )
+        self.assertEqual(first["content_hash"], second["content_hash"])
+
+    @override_settings(MATCHING_WORKER_MODE="command")
+    def test_only_changed_jobs_are_rematched(self):
+        client = APIClient()
+
+        def ingest(payload):
+            return client.post("/api/jobs/ingest/", payload, format="json")
+
+        self.assertEqual(ingest(job_payload("job-1")).status_code, 202)
+        self.assertEqual(ingest(job_payload("job-1")).status_code, 200)
+        self.assertEqual(MatchingTask.objects.count(), 1)
+
+        response = ingest(job_payload("job-1", salary_max=9000))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(
+            MatchingTask.objects.filter(
+                kind=MatchingTask.Kind.INGESTED_JOB,
+                object_id=response.data["ingested_job_id"],
+            ).count(),
+            2,
+        )
+
+    def test_batch_matches_created_and_updated_jobs_only(self):
+        ingest_batch([job_payload("job-1"), job_payload("job-2")])
+
+        results, to_match = ingest_batch(
+            [
+                job_payload("job-1"),
+                job_payload("job-2", location="Nairobi"),
+                job_payload("job-3"),
+                "not a job",
+            ]
+        )
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["unchanged", "updated", "created", "invalid"],
+        )
+        self.assertEqual(
+            sorted(to_match), sorted(r["ingested_job_id"] for r in results[1:3])
+        )
+
+    def test_rematching_replaces_the_stored_matches(self):
+        cache.clear()
+        candidate_index._index = None
+        self.addCleanup(setattr, candidate_index, "_index", None)
+        profile = {"experience_level": "Mid", "years_of_experience": 3}
+        pythonista = make_candidate("ada@example.com", ["python"], **profile)
+        gopher = make_candidate("rob@example.com", ["go"], **profile)
+
+        job, _ = upsert_ingested_job(ingested_fields_from_payload(job_payload("job-1")))
+        match_ingested_job(job)
+        self.assertEqual(
+            list(job.matches.values_list("user_id", flat=True)), [pythonista.id]
+        )
+
+        job, outcome = upsert_ingested_job(
+            ingested_fields_from_payload(job_payload("job-1", required_skills=["Go"]))
+        )
+        self.assertEqual(outcome, "updated")
+        match_ingested_job(job)
+        self.assertEqual(
+            list(job.matches.values_list("user_id", flat=True)), [gopher.id]
+        )
+        self.assertEqual(MatchResult.objects.count(), 1)
@@ -0,0 +1,326 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..job_model import job_index
+from ..job_model.candidate_filters import HARD_FILTERS, CandidateFilter
+from ..job_model.candidate_index import fetch_candidate_rows
+from ..job_model.ingest import infer_experience_level, job_profile_for_ingested
+from ..job_model.job_index import (
+    JobMatrix,
+    _sync_match_results,
+    ingested_job_profiles,
+    recommend_ingested_jobs,
+)
+from ..job_model.job_recommender import JobAppMatching
+from ..job_model.scoring import SKILL_WEIGHTS
+from ..models import IngestedJob, MatchResult, Profile, User
+from .helpers import make_candidate
+
+
+def matched_job(source_job_id, **fields):
+    fields.setdefault("title", "Job")
+    fields.setdefault("required_skills", ["python"])
+    return IngestedJob.objects.create(
+        source_job_id=source_job_id, status="matched", **fields
+    )
+
+
+def ingested_matrix():
+    return JobMatrix(ingested_job_profiles(), "skills", SKILL_WEIGHTS)
+
+
+class ReverseMatchingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ada = make_candidate(
+            "ada@example.com",
+            ["python"],
+            experience_level="Senior",
+            years_of_experience=6,
+            location="Lagos",
+            job_location=Profile.JobLocationChoices.ONSITE,
+            min_salary=3000,
+            max_salary=5000,
+            currency="USD",
+        )
+
+    def sync(self, user, **kwargs):
+        row = fetch_candidate_rows([user.id])[user.id]
+        return _sync_match_results(user.id, row, ingested_matrix(), **kwargs)
+
+    def add_match(self, job, score):
+        return MatchResult.objects.create(
+            ingested_job=job, user_id=0, user_name="other", match_score=score
+        )
+
+    def test_matches_are_upserted_and_dropped(self):
+        job = matched_job("job-1", location="Lagos", years_experience=2)
+        matched_job("job-2", required_skills=["cobol"])
+
+        self.assertEqual(self.sync(self.ada, min_score=0.0), 1)
+        match = MatchResult.objects.get(user_id=self.ada.id)
+        self.assertEqual(match.ingested_job_id, job.id)
+
+        job.required_skills = ["cobol"]
+        job.save()
+        self.assertEqual(self.sync(self.ada, min_score=0.0), 0)
+        self.assertFalse(MatchResult.objects.filter(user_id=self.ada.id).exists())
+
+    def test_new_match_evicts_the_lowest_of_a_full_job(self):
+        job = matched_job("job-1")
+        lowest = self.add_match(job, 0.01)
+        self.add_match(job, 0.99)
+
+        self.assertEqual(self.sync(self.ada, k=2, min_score=0.0), 1)
+        self.assertFalse(MatchResult.objects.filter(id=lowest.id).exists())
+        self.assertEqual(MatchResult.objects.filter(ingested_job=job).count(), 2)
+
+    def test_full_job_keeps_better_matches(self):
+        job = matched_job("job-1")
+        kept = {self.add_match(job, 2.0).id, self.add_match(job, 3.0).id}
+
+        self.assertEqual(self.sync(self.ada, k=2, min_score=0.0), 0)
+        self.assertEqual(set(MatchResult.objects.values_list("id", flat=True)), kept)
+
+    @override_settings(CANDIDATE_HARD_FILTERS=["years", "location"])
+    def test_hard_filters_apply_in_reverse(self):
+        matched_job("too-senior", location="Lagos", years_experience=10)
+        matched_job("elsewhere", location="Nairobi", years_experience=2)
+        fits = matched_job("fits", location="Lagos", years_experience=2)
+
+        self.assertEqual(self.sync(self.ada, min_score=0.0), 1)
+        self.assertEqual(
+            list(
+                MatchResult.objects.filter(user_id=self.ada.id).values_list(
+                    "ingested_job_id", flat=True
+                )
+            ),
+            [fits.id],
+        )
+
+
+class JobMatrixFilterTests(TestCase):
+    """JobMatrix.admits agrees with CandidateFilter.for_job in SQL."""
+
+    def test_admits_matches_the_forward_prefilter(self):
+        Choices = Profile.JobLocationChoices
+        candidates = [
+            make_candidate(
+                "ada@example.com",
+                experience_level="Senior",
+                years_of_experience=6,
+                location="Lagos",
+                job_location=Choices.ONSITE,
+                min_salary=3000,
+                max_salary=5000,
+                currency="USD",
+            ),
+            make_candidate(
+                "grace@example.com",
+                experience_level="Entry",
+                years_of_experience=1,
+                location="Nairobi",
+                job_location=Choices.REMOTE,
+                min_salary=500,
+                max_salary=900,
+                currency="NGN",
+            ),
+            make_candidate(
+                "linus@example.com",
+                experience_level="Mid",
+                years_of_experience=3,
+                location="lagos",
+                job_location=Choices.HYBRID,
+                min_salary=1000,
+                max_salary=2500,
+                currency="USD",
+            ),
+        ]
+        jobs = [
+            matched_job("lagos", location="Lagos", years_experience=2),
+            matched_job("remote", location="Berlin", remote=True),
+            matched_job(
+                "senior",
+                location="Nairobi",
+                years_experience=8,
+                salary_min=4000,
+                salary_max=6000,
+            ),
+            matched_job("naira", location="", salary_min=600, salary_currency="NGN"),
+        ]
+        matrix = ingested_matrix()
+        rows = fetch_candidate_rows([user.id for user in candidates])
+
+        for constraints in [[name] for name in HARD_FILTERS] + [HARD_FILTERS]:
+            for job in jobs:
+                candidate_filter = CandidateFilter.for_job(
+                    job_profile_for_ingested(job), constraints
+                )
+                expected = set(
+                    candidate_filter.apply(
+                        User.objects.filter(company=False)
+                    ).values_list("id", flat=True)
+                )
+                position = matrix.position[job.id]
+                admitted = {
+                    user.id
+                    for user in candidates
+                    if matrix.admits(rows[user.id], constraints)[position]
+                }
+                self.assertEqual(
+                    admitted, expected, f"{job.source_job_id} {constraints}"
+                )
+
+        with self.assertRaises(ValueError):
+            matrix.admits(rows[candidates[0].id], ["shoe_size"])
+
+
+class JobMatrixTests(TestCase):
+    def setUp(self):
+        self.jobs = [
+            matched_job("job-1", required_skills=["python"]),
+            matched_job("job-2", required_skills=["django"]),
+            matched_job("job-3", required_skills=["rust"]),
+        ]
+
+    def test_apply_appends_new_versions_and_masks_old_rows(self):
+        matrix = ingested_matrix()
+        first, second, third = (job.id for job in self.jobs)
+        old_position = matrix.position[first]
+
+        IngestedJob.objects.filter(id=first).update(required_skills=["go"])
+        self.assertTrue(matrix.apply({first, third}, ingested_job_profiles({first})))
+
+        self.assertEqual(len(matrix), 2)
+        self.assertFalse(matrix.alive[old_position])
+        self.assertEqual(matrix.position[first], len(matrix.alive) - 1)
+        self.assertNotIn(third, matrix.position)
+        self.assertEqual(matrix.columns["document"][matrix.position[first]], "go")
+        self.assertEqual(
+            sorted(matrix.job_ids[matrix.live()].tolist()), sorted([first, second])
+        )
+
+    def test_apply_asks_for_a_rebuild_once_most_rows_are_dead(self):
+        matrix = ingested_matrix()
+        self.assertFalse(matrix.apply([job.id for job in self.jobs[:2]], {}))
+
+    def test_expired_jobs_are_not_live(self):
+        IngestedJob.objects.filter(id=self.jobs[0].id).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        matrix = JobMatrix(
+            ingested_job_profiles(), "skills", SKILL_WEIGHTS, max_age=30 * 86400
+        )
+        self.assertEqual(
+            sorted(matrix.job_ids[matrix.live()].tolist()),
+            sorted(job.id for job in self.jobs[1:]),
+        )
+
+
+class RecommendIngestedJobsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        job_index._matrices.clear()
+        fields = [
+            ("python;django", "Lagos", 3, 1000, 4000),
+            ("python;flask", "Nairobi", 6, 2000, 9000),
+            ("go", "Lagos", 1, 500, 1500),
+            ("django;postgres", "Lagos", 3, 5000, 8000),
+        ]
+        self.jobs = [
+            matched_job(
+                f"job-{number}",
+                title=f"Job {number}",
+                company="Scuib",
+                required_skills=skills.split(";"),
+                location=location,
+                years_experience=years,
+                salary_min=salary_min,
+                salary_max=salary_max,
+            )
+            for number, (skills, location, years, salary_min, salary_max) in (
+                enumerate(fields)
+            )
+        ]
+        self.user_profile = {
+            "skills": ["python", "django"],
+            "experience": "mid",
+            "location": "lagos",
+            "min_salary": 2000,
+            "max_salary": 4500,
+        }
+
+    def tearDown(self):
+        job_index._matrices.clear()
+
+    def test_same_ranking_as_recommend_jobs(self):
+        job_data = [
+            {
+                "title": job.title,
+                "owner": job.company,
+                "skills": ";".join(sorted(job.required_skills)),
+                "experience_level": infer_experience_level(job.years_experience),
+                "location": job.location.lower(),
+                "min_salary": job.salary_min,
+                "max_salary": job.salary_max,
+            }
+            for job in self.jobs
+        ]
+        expected = JobAppMatching().recommend_jobs(self.user_profile, job_data, k=3)
+
+        results = recommend_ingested_jobs(self.user_profile, k=3)
+        self.assertEqual(
+            [(r["job_title"], round(r["score"], 6)) for r in results],
+            [(r["job_title"], round(r["score"], 6)) for r in expected],
+        )
+
+    @override_settings(INGESTED_JOB_MAX_AGE_DAYS=30)
+    def test_expired_and_unmatched_jobs_are_skipped(self):
+        IngestedJob.objects.filter(id=self.jobs[0].id).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        IngestedJob.objects.filter(id=self.jobs[3].id).update(status="pending")
+
+        titles = {r["job_title"] for r in recommend_ingested_jobs(self.user_profile)}
+        self.assertEqual(titles, {"Job 1", "Job 2"})
+
+
+class PurgeIngestedJobsTests(TestCase):
+    def setUp(self):
+        self.old = matched_job("old")
+        self.recent = matched_job("recent")
+        MatchResult.objects.create(
+            ingested_job=self.old, user_id=1, user_name="Ada", match_score=0.9
+        )
+        IngestedJob.objects.filter(id=self.old.id).update(
+            updated_at=timezone.now() - timedelta(days=10)
+        )
+
+    def purge(self, *args):
+        stdout = StringIO()
+        call_command("purge_ingested_jobs", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_deletes_jobs_unchanged_for_the_retention(self):
+        self.assertIn(
+            "1 ingested jobs would be deleted", self.purge("--dry-run", "--days", "7")
+        )
+        self.assertEqual(IngestedJob.objects.count(), 2)
+
+        self.purge("--days", "7", "--batch-size", "1")
+        self.assertEqual(
+            list(IngestedJob.objects.values_list("id", flat=True)), [self.recent.id]
+        )
+        self.assertFalse(MatchResult.objects.exists())
+
+    @override_settings(INGESTED_JOB_RETENTION_DAYS=0)
+    def test_requires_a_retention(self):
+        with self.assertRaises(CommandError):
+            self.purge()
+        self.assertEqual(IngestedJob.objects.count(), 2)
@@ -0,0 +1,254 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import IngestedJob, MatchResult
+from ..pagination import InvalidCursor, encode_cursor, keyset_page
+from .helpers import make_candidate
+
+
+class KeysetPageTests(TestCase):
+    ordering = ("-created_at", "-id")
+
+    def setUp(self):
+        for number in range(5):
+            IngestedJob.objects.create(
+                source_job_id=f"job-{number}", title=f"Job {number}", source="test"
+            )
+
+    def test_pages_cover_every_row_once_in_order(self):
+        queryset = IngestedJob.objects.all()
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(queryset, self.ordering, 2, cursor)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+        expected = list(queryset.order_by(*self.ordering).values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_values_rows_and_last_page(self):
+        queryset = IngestedJob.objects.values("id", "created_at")
+        rows, cursor = keyset_page(queryset, self.ordering, 5)
+        self.assertEqual(len(rows), 5)
+        self.assertIsNone(cursor)
+
+        rows, cursor = keyset_page(queryset, self.ordering, 4)
+        self.assertIsNotNone(cursor)
+        rows, cursor = keyset_page(queryset, self.ordering, 4, cursor)
+        self.assertEqual(len(rows), 1)
+        self.assertIsNone(cursor)
+
+    def test_each_page_is_one_query(self):
+        _, cursor = keyset_page(IngestedJob.objects.all(), self.ordering, 2)
+        with self.assertNumQueries(1):
+            keyset_page(IngestedJob.objects.all(), self.ordering, 2, cursor)
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in ("not-a-cursor", encode_cursor([1])):
+            with self.assertRaises(InvalidCursor):
+                keyset_page(IngestedJob.objects.all(), self.ordering, 2, cursor)
+
+
+class ListIngestedJobsTests(TestCase):
+    url = "/api/jobs/ingested/"
+
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        self.jobs = []
+        for number in range(5):
+            job = IngestedJob.objects.create(
+                source_job_id=f"job-{number}",
+                title=f"Job {number}",
+                description="A long description",
+                source="greenhouse" if number % 2 else "lever",
+                status="matched" if number < 3 else "pending",
+            )
+            IngestedJob.objects.filter(id=job.id).update(
+                created_at=now - timedelta(days=5 - number)
+            )
+            for user_id in range(number):
+                MatchResult.objects.create(
+                    ingested_job=job,
+                    user_id=user_id + 1,
+                    user_name="",
+                    match_score=0.5,
+                )
+            self.jobs.append(job)
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, data):
+        return [job["id"] for job in data["results"]]
+
+    def test_pages_are_newest_first_with_match_counts(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.get(**params)
+            seen += data["results"]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual([job["id"] for job in seen], [j.id for j in self.jobs[::-1]])
+        self.assertEqual([job["match_count"] for job in seen], [4, 3, 2, 1, 0])
+
+    def test_each_page_is_two_queries(self):
+        for limit in (1, 5):
+            with self.assertNumQueries(2):
+                self.client.get(self.url, {"limit": limit})
+
+    def test_summary_leaves_out_the_job_text(self):
+        full = self.get(limit=1)["results"][0]
+        summary = self.get(limit=1, fields="summary")["results"][0]
+        self.assertEqual(full["description"], "A long description")
+        self.assertNotIn("description", summary)
+        self.assertNotIn("required_skills", summary)
+        self.assertNotIn("raw_payload", full)
+        self.assertEqual(summary["match_count"], full["match_count"])
+
+    def test_filters(self):
+        self.assertEqual(
+            self.ids(self.get(status="pending")), [self.jobs[4].id, self.jobs[3].id]
+        )
+        self.assertEqual(
+            self.ids(self.get(source="greenhouse")), [self.jobs[3].id, self.jobs[1].id]
+        )
+        created = [job.created_at for job in IngestedJob.objects.order_by("id")]
+        data = self.get(
+            created_after=created[1].isoformat(),
+            created_before=timezone.localdate(created[3]).isoformat(),
+        )
+        self.assertEqual(
+            self.ids(data), [self.jobs[3].id, self.jobs[2].id, self.jobs[1].id]
+        )
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in (
+            {"fields": "everything"},
+            {"limit": "many"},
+            {"created_after": "yesterday"},
+            {"cursor": "not-a-cursor"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class MatchReadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.ada = make_candidate("ada@example.com")
+        self.jobs = [
+            IngestedJob.objects.create(
+                source_job_id=f"job-{number}",
+                title=f"Job {number}",
+                description="A long description",
+                status="matched",
+            )
+            for number in range(3)
+        ]
+        # Ada matches every job; the first job also matches four others
+        for job, score in zip(self.jobs, (0.9, 0.5, 0.7)):
+            MatchResult.objects.create(
+                ingested_job=job,
+                user_id=self.ada.id,
+                user_name="Ada",
+                match_score=score,
+            )
+        for user_id, score in zip(range(100, 104), (0.8, 0.8, 0.6, 0.4)):
+            MatchResult.objects.create(
+                ingested_job=self.jobs[0],
+                user_id=user_id,
+                user_name="",
+                match_score=score,
+            )
+
+    def pages(self, url, **params):
+        pages, cursor = [], None
+        while True:
+            query = dict(params, cursor=cursor) if cursor else params
+            response = self.client.get(url, query)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                return pages
+
+    def test_job_matches_are_paginated_best_first(self):
+        url = f"/api/jobs/ingested/{self.jobs[0].id}/matches/"
+        pages = self.pages(url, limit=2)
+        self.assertEqual([len(page["matches"]) for page in pages], [2, 2, 1])
+        scores = [m["match_score"] for page in pages for m in page["matches"]]
+        self.assertEqual(scores, [0.9, 0.8, 0.8, 0.6, 0.4])
+
+        (page,) = self.pages(url, min_score=0.6)
+        self.assertEqual(
+            [m["match_score"] for m in page["matches"]], [0.9, 0.8, 0.8, 0.6]
+        )
+
+    def test_job_match_errors(self):
+        response = self.client.get("/api/jobs/ingested/999/matches/")
+        self.assertEqual(response.status_code, 404)
+        url = f"/api/jobs/ingested/{self.jobs[0].id}/matches/"
+        for params in ({"min_score": "high"}, {"cursor": "not-a-cursor"}):
+            self.assertEqual(self.client.get(url, params).status_code, 400)
+
+    def test_my_matches_are_paginated_without_the_job_text(self):
+        url = "/api/jobs/my-matches/"
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+
+        self.client.force_authenticate(self.ada)
+        pages = self.pages(url, limit=2)
+        matches = [m for page in pages for m in page["matches"]]
+        self.assertEqual(
+            [m["job"]["id"] for m in matches],
+            [self.jobs[0].id, self.jobs[2].id, self.jobs[1].id],
+        )
+        self.assertNotIn("description", matches[0]["job"])
+
+        (page,) = self.pages(url, min_score=0.7)
+        self.assertEqual(len(page["matches"]), 2)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {"limit": 2})
+        (match_query,) = [
+            query["sql"]
+            for query in context.captured_queries
+            if MatchResult._meta.db_table in query["sql"]
+        ]
+        self.assertNotIn('"description"', match_query)
+        self.assertNotIn('"raw_payload"', match_query)
+
+    def test_benchmark_command_runs(self):
+        stdout = StringIO()
+        call_command(
+            "benchmark_match_reads",
+            "--matches",
+            "200",
+            "--jobs",
+            "5",
+            "--users",
+            "20",
+            "--samples",
+            "1",
+            "--depth",
+            "2",
+            "--limit",
+            "5",
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+        self.assertIn("my_matched_jobs", stdout.getvalue())
+        self.assertEqual(MatchResult.objects.count(), 7)
@@ -0,0 +1,138 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ..job_model import match_worker
+from ..job_model.match_worker import (
+    MAX_ATTEMPTS,
+    Heartbeat,
+    _finish,
+    claim_tasks,
+    process_pending,
+    requeue_stale_tasks,
+)
+from ..models import IngestedJob, MatchingTask
+
+Kind, Status = MatchingTask.Kind, MatchingTask.Status
+
+
+def make_task(kind=Kind.JOB, object_id=1, **fields):
+    return MatchingTask.objects.create(kind=kind, object_id=object_id, **fields)
+
+
+@override_settings(MATCHING_WORKER_MODE="command", MATCHING_TASK_TIMEOUT=600)
+class MatchingQueueTests(TestCase):
+    def test_claim_takes_pending_tasks_in_order(self):
+        first, second, third = (make_task(object_id=n) for n in range(3))
+        done = make_task(object_id=9, status=Status.DONE)
+
+        claimed = claim_tasks(2)
+
+        self.assertEqual([t.id for t in claimed], [first.id, second.id])
+        self.assertTrue(all(t.status == Status.RUNNING for t in claimed))
+        self.assertTrue(all(t.attempts == 1 for t in claimed))
+        self.assertEqual(
+            dict(MatchingTask.objects.values_list("id", "status")),
+            {
+                first.id: Status.RUNNING,
+                second.id: Status.RUNNING,
+                third.id: Status.PENDING,
+                done.id: Status.DONE,
+            },
+        )
+
+    def test_stale_tasks_are_requeued_then_failed(self):
+        retried = make_task(status=Status.RUNNING, attempts=1)
+        exhausted = make_task(status=Status.RUNNING, attempts=MAX_ATTEMPTS)
+        fresh = make_task(status=Status.RUNNING, attempts=1)
+        MatchingTask.objects.exclude(id=fresh.id).update(
+            updated_at=timezone.now() - timedelta(seconds=601)
+        )
+
+        requeue_stale_tasks()
+
+        statuses = dict(MatchingTask.objects.values_list("id", "status"))
+        self.assertEqual(statuses[retried.id], Status.PENDING)
+        self.assertEqual(statuses[exhausted.id], Status.FAILED)
+        self.assertEqual(statuses[fresh.id], Status.RUNNING)
+
+    def test_outcome_of_a_superseded_run_is_ignored(self):
+        make_task()
+        [stale] = claim_tasks(1)
+        # Taken back by requeue_stale_tasks and claimed by another worker
+        MatchingTask.objects.filter(id=stale.id).update(status=Status.PENDING)
+        [current] = claim_tasks(1)
+
+        with self.assertLogs(match_worker.logger, "WARNING"):
+            _finish(stale, Status.DONE, result={"from": "stale"})
+        current.refresh_from_db()
+        self.assertEqual((current.status, current.attempts), (Status.RUNNING, 2))
+
+        _finish(current, Status.DONE, result={"from": "current"})
+        current.refresh_from_db()
+        self.assertEqual(current.result, {"from": "current"})
+
+    @mock.patch.object(match_worker, "match_job", side_effect=ValueError("boom"))
+    def test_failed_tasks_are_retried_up_to_max_attempts(self, match_job):
+        task = make_task()
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            with self.assertLogs(match_worker.logger, "ERROR"):
+                self.assertEqual(process_pending(), 1)
+            task.refresh_from_db()
+            self.assertEqual(task.attempts, attempt)
+            self.assertEqual(task.error, "boom")
+        self.assertEqual(task.status, Status.FAILED)
+        self.assertEqual(process_pending(), 0)
+        self.assertEqual(match_job.call_count, MAX_ATTEMPTS)
+
+    def test_a_failing_ingested_job_does_not_fail_the_batch(self):
+        good, bad = (
+            IngestedJob.objects.create(source_job_id=f"job-{n}", title="Job")
+            for n in range(2)
+        )
+        good_task = make_task(Kind.INGESTED_JOB, good.id)
+        bad_task = make_task(Kind.INGESTED_JOB, bad.id)
+
+        def match_one(job, matcher):
+            if job.id == bad.id:
+                raise ValueError("bad job")
+            return ["match"]
+
+        with mock.patch.object(
+            match_worker, "match_ingested_jobs", side_effect=ValueError("batch")
+        ), mock.patch.object(match_worker, "match_ingested_job", match_one):
+            for _ in range(MAX_ATTEMPTS):
+                with self.assertLogs(match_worker.logger, "ERROR"):
+                    process_pending()
+
+        good_task.refresh_from_db()
+        bad_task.refresh_from_db()
+        self.assertEqual(good_task.status, Status.DONE)
+        self.assertEqual(good_task.result, {"match_count": 1})
+        self.assertEqual(
+            (bad_task.status, bad_task.attempts, bad_task.error),
+            (Status.FAILED, MAX_ATTEMPTS, "bad job"),
+        )
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, "failed")
+
+
+@override_settings(MATCHING_WORKER_MODE="command", MATCHING_TASK_TIMEOUT=0.03)
+class HeartbeatTests(TransactionTestCase):
+    def test_heartbeat_renews_claimed_tasks_only(self):
+        make_task()
+        make_task(object_id=2, status=Status.RUNNING)
+        [task] = claim_tasks(1)
+        old = timezone.now() - timedelta(hours=1)
+        MatchingTask.objects.update(updated_at=old)
+
+        with Heartbeat([task]):
+            time.sleep(0.1)
+
+        updated = dict(MatchingTask.objects.values_list("id", "updated_at"))
+        self.assertGreater(updated.pop(task.id), old)
+        self.assertEqual(list(updated.values()), [old])
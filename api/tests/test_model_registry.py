@@ -0,0 +1,116 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..job_model.model_registry import (
+    ChecksumMismatch,
+    ModelCache,
+    activate_model,
+    deserialize_artifact,
+    publish_model,
+)
+from ..models import RecommenderModel
+
+
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def publish(self, artifact, activate=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            return publish_model("ranker", artifact, activate=activate)
+
+    def active_versions(self):
+        return list(
+            RecommenderModel.objects.filter(name="ranker", is_active=True).values_list(
+                "version", flat=True
+            )
+        )
+
+    def test_publish_adds_versions_and_activates_the_newest(self):
+        first = self.publish({"weights": [1]})
+        second = self.publish({"weights": [2]})
+        self.assertEqual((first.version, second.version), (1, 2))
+        self.assertEqual(self.active_versions(), [2])
+        self.assertEqual(deserialize_artifact(second), {"weights": [2]})
+
+        self.publish({"weights": [3]}, activate=False)
+        self.assertEqual(self.active_versions(), [2])
+
+    def test_activate_rolls_back_to_an_older_version(self):
+        self.publish("first")
+        self.publish("second")
+        with self.captureOnCommitCallbacks(execute=True):
+            activate_model("ranker", 1)
+        self.assertEqual(self.active_versions(), [1])
+
+        with self.assertRaises(RecommenderModel.DoesNotExist):
+            activate_model("ranker", 9)
+
+    def test_corrupted_artifacts_fail_their_checksum(self):
+        row = self.publish("artifact")
+        row.model_data = bytes(row.model_data) + b"\0"
+        with self.assertRaises(ChecksumMismatch):
+            deserialize_artifact(row)
+
+
+@override_settings(MODEL_REGISTRY_REFRESH_INTERVAL=3600)
+class ModelCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.models = ModelCache()
+
+    def publish(self, artifact):
+        with self.captureOnCommitCallbacks(execute=True):
+            return publish_model("ranker", artifact)
+
+    def test_active_artifact_is_loaded_once(self):
+        self.assertIsNone(self.models.get("ranker"))
+        self.publish("first")
+
+        self.assertEqual(self.models.get("ranker"), "first")
+        self.assertEqual(self.models.version("ranker"), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.models.get("ranker"), "first")
+
+    def test_new_version_is_picked_up_through_the_stamp(self):
+        self.publish("first")
+        self.models.get("ranker")
+
+        self.publish("second")
+        self.assertEqual(self.models.get("ranker"), "second")
+        self.assertEqual(self.models.version("ranker"), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            activate_model("ranker", 1)
+        self.assertEqual(self.models.get("ranker"), "first")
+
+    @override_settings(MODEL_REGISTRY_REFRESH_INTERVAL=0)
+    def test_versions_are_rechecked_without_a_stamp(self):
+        self.publish("first")
+        self.models.get("ranker")
+
+        # Activated behind the cache's back: no stamp bump
+        RecommenderModel.objects.update(is_active=False)
+        row = publish_model("ranker", "second", activate=False)
+        RecommenderModel.objects.filter(id=row.id).update(is_active=True)
+        self.assertEqual(self.models.get("ranker"), "second")
+
+    def test_corrupted_version_keeps_the_loaded_artifact(self):
+        self.publish("first")
+        self.models.get("ranker")
+
+        row = self.publish("second")
+        RecommenderModel.objects.filter(id=row.id).update(checksum="0" * 64)
+        with self.assertLogs("api.job_model.model_registry", "ERROR"):
+            self.assertEqual(self.models.get("ranker"), "first")
+        self.assertEqual(self.models.version("ranker"), 1)
+
+    def test_warm_up_loads_every_active_artifact(self):
+        self.publish("ranker artifact")
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_model("vectorizer", "vectorizer artifact")
+
+        self.models.warm_up()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.models.get("ranker"), "ranker artifact")
+            self.assertEqual(self.models.get("vectorizer"), "vectorizer artifact")
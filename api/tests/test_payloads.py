@@ -0,0 +1,116 @@
+import json
+import zlib
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from ..models import IngestedJob, IngestedJobPayload
+
+PAYLOAD = {"job_id": "job-1", "skills": ["python"], "description": "x" * 500}
+
+
+class IngestedJobPayloadTests(TestCase):
+    def setUp(self):
+        self.job = IngestedJob.objects.create(
+            source_job_id="job-1", title="Job", raw_payload=PAYLOAD
+        )
+
+    def test_payloads_are_stored_compressed(self):
+        record = IngestedJobPayload.objects.get(ingested_job=self.job)
+        self.assertEqual(record.codec, "zlib")
+        self.assertEqual(record.size, len(json.dumps(PAYLOAD, separators=(",", ":"))))
+        self.assertLess(len(bytes(record.data)), record.size)
+        self.assertEqual(record.load(), PAYLOAD)
+
+        record.codec = "zstd"
+        with self.assertRaises(ValueError):
+            record.load()
+
+    def test_payload_is_loaded_once_on_access(self):
+        with self.assertNumQueries(1):
+            job = IngestedJob.objects.get(id=self.job.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(job.raw_payload, PAYLOAD)
+        with self.assertNumQueries(0):
+            self.assertEqual(job.raw_payload, PAYLOAD)
+
+        self.assertEqual(
+            IngestedJob.objects.create(source_job_id="job-2").raw_payload, {}
+        )
+
+    def test_payload_is_saved_only_when_assigned_and_listed(self):
+        self.job.raw_payload = {"job_id": "job-1", "v": 2}
+        self.job.save(update_fields=["title"])
+        self.assertEqual(IngestedJob.objects.get(id=self.job.id).raw_payload, PAYLOAD)
+
+        self.job.save(update_fields=["raw_payload"])
+        self.assertEqual(
+            IngestedJob.objects.get(id=self.job.id).raw_payload,
+            {"job_id": "job-1", "v": 2},
+        )
+
+    def test_refresh_from_db_drops_the_cached_payload(self):
+        IngestedJobPayload.store({self.job.id: {"job_id": "job-1", "v": 3}})
+
+        self.job.refresh_from_db(fields=["title"])
+        self.assertEqual(self.job.raw_payload, PAYLOAD)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.raw_payload, {"job_id": "job-1", "v": 3})
+
+        self.job.raw_payload = {"stale": True}
+        with self.assertNumQueries(0):
+            self.job.refresh_from_db(fields=["raw_payload"])
+        self.job.save()
+        self.assertEqual(
+            IngestedJob.objects.get(id=self.job.id).raw_payload,
+            {"job_id": "job-1", "v": 3},
+        )
+
+
+class IngestedJobPayloadMigrationTests(TransactionTestCase):
+    """0012 moves raw_payload into compressed IngestedJobPayload rows."""
+
+    before = [("api", "0011_matchresult_score_indexes")]
+    after = [("api", "0013_remove_ingestedjob_raw_payload")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        executor.loader.build_graph()
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_payloads_move_and_restore(self):
+        apps = self.migrate(self.before)
+        OldIngestedJob = apps.get_model("api", "IngestedJob")
+        payloads = {
+            OldIngestedJob.objects.create(
+                source_job_id=f"job-{number}",
+                title="Job",
+                source="test",
+                raw_payload={"job_id": f"job-{number}", "skills": ["python"]},
+            ).id: {"job_id": f"job-{number}", "skills": ["python"]}
+            for number in range(3)
+        }
+
+        apps = self.migrate(self.after)
+        IngestedJobPayload = apps.get_model("api", "IngestedJobPayload")
+        records = IngestedJobPayload.objects.all()
+        self.assertEqual(
+            {
+                record.ingested_job_id: json.loads(zlib.decompress(bytes(record.data)))
+                for record in records
+            },
+            payloads,
+        )
+        self.assertTrue(all(record.codec == "zlib" for record in records))
+
+        apps = self.migrate(self.before)
+        OldIngestedJob = apps.get_model("api", "IngestedJob")
+        self.assertEqual(
+            dict(OldIngestedJob.objects.values_list("id", "raw_payload")), payloads
+        )
@@ -0,0 +1,285 @@
+import json
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..job_model import candidate_index, ranking, scoring
+from ..job_model.candidate_index import CandidateIndex
+from ..job_model.job_recommender import JobAppMatching
+from ..job_model.model_registry import model_cache, publish_model
+from ..job_model.ranking import (
+    INGESTED,
+    POSTED,
+    RANKER_NAME,
+    PairFeaturizer,
+    features_for,
+    match_result_pairs,
+    score_pairs,
+)
+from ..models import (
+    Applicant,
+    IngestedJob,
+    Jobs,
+    JobSkills,
+    MatchResult,
+    RecommenderModel,
+    User,
+)
+from .helpers import make_candidate
+
+N_FEATURES = 2**10
+
+
+class RankerTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        model_cache._loaded.clear()
+        self.addCleanup(model_cache._loaded.clear)
+        self.ada = make_candidate(
+            "ada@example.com",
+            ["python", "django"],
+            years_of_experience=5,
+            location="Lagos",
+            min_salary=1000,
+            max_salary=3000,
+        )
+        self.grace = make_candidate("grace@example.com", ["react"], location="Abuja")
+        self.linus = make_candidate("linus@example.com", ["go"])
+        self.owner = User.objects.create(email="hr@example.com", company=True)
+        self.backend = self.job("Backend", ["python", "django"])
+        self.frontend = self.job("Frontend", ["react"])
+
+    def job(self, title, skills):
+        job = Jobs.objects.create(
+            owner=self.owner,
+            title=title,
+            description=title,
+            location="Lagos",
+            min_salary=2000,
+            max_salary=5000,
+            employment_type="R",
+            years_of_experience=3,
+        )
+        job.skills.set([JobSkills.objects.create(name=name) for name in skills])
+        return job
+
+
+class PairFeaturizerTests(RankerTestCase):
+    def test_pairs_gather_user_and_job_vectors(self):
+        featurizer = PairFeaturizer(N_FEATURES)
+        missing = self.linus.id + 100
+        user_ids = np.array([self.ada.id, self.grace.id, self.ada.id, missing])
+        job_ids = np.array([self.backend.id] * 2 + [self.frontend.id] * 2)
+
+        matrix, known = features_for(featurizer, POSTED, user_ids, job_ids)
+        self.assertEqual(known.tolist(), [True, True, True, False])
+        self.assertEqual(matrix.shape, (3, 3 * N_FEATURES + 5))
+
+        users = matrix[:, :N_FEATURES].toarray()
+        jobs = matrix[:, N_FEATURES : 2 * N_FEATURES].toarray()
+        np.testing.assert_array_equal(users[0], users[2])
+        np.testing.assert_array_equal(jobs[0], jobs[1])
+
+        overlap, years, salary, location, bias = matrix[:, 3 * N_FEATURES :].T
+        overlap, years, salary, location, bias = (
+            column.toarray().ravel()
+            for column in (overlap, years, salary, location, bias)
+        )
+        self.assertAlmostEqual(overlap[0], 1.0)
+        self.assertEqual(overlap[1:].tolist(), [0, 0])
+        self.assertEqual(years.tolist(), [1, 0, 1])
+        self.assertEqual(salary.tolist(), [1, 0, 1])
+        self.assertEqual(location.tolist(), [1, 0, 1])
+        self.assertEqual(bias.tolist(), [1, 1, 1])
+
+    def test_match_results_are_labelled_by_threshold(self):
+        job = IngestedJob.objects.create(source_job_id="job-1", title="Job")
+        for user, score in ((self.ada, 0.9), (self.grace, 0.2)):
+            MatchResult.objects.create(
+                ingested_job=job, user_id=user.id, user_name="", match_score=score
+            )
+
+        chunks = list(match_result_pairs(chunk_size=1, threshold=0.6))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual({chunk[0] for chunk in chunks}, {INGESTED})
+        labels = {int(chunk[1][0]): int(chunk[3][0]) for chunk in chunks}
+        self.assertEqual(labels, {self.ada.id: 1, self.grace.id: 0})
+
+
+class TrainApplicantRankerTests(RankerTestCase):
+    def setUp(self):
+        super().setUp()
+        Applicant.objects.create(user=self.ada, job=self.backend)
+        Applicant.objects.create(user=self.grace, job=self.frontend)
+
+    def train(self, *args):
+        stdout = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "train_applicant_ranker",
+                "--n-features",
+                str(N_FEATURES),
+                "--chunk-size",
+                "1",
+                *args,
+                stdout=stdout,
+            )
+        return stdout.getvalue()
+
+    def test_dry_run_reports_without_publishing(self):
+        output = self.train("--epochs", "2", "--dry-run")
+        metrics = json.loads(output[output.index("{") : output.rindex("}") + 1])
+        self.assertEqual(len(metrics["epochs"]), 2)
+        self.assertGreaterEqual(metrics["pairs"], 4)
+        self.assertIn("pairs_per_second", metrics)
+        self.assertIn("peak_rss_mb", metrics)
+        self.assertFalse(RecommenderModel.objects.exists())
+        self.assertIsNone(score_pairs(POSTED, [self.ada.id], [self.backend.id]))
+
+    def test_published_ranker_scores_pairs(self):
+        self.train("--epochs", "20", "--negatives", "2")
+        row = RecommenderModel.objects.get(name=RANKER_NAME)
+        self.assertTrue(row.is_active)
+
+        scores = score_pairs(
+            POSTED,
+            [self.ada.id, self.linus.id, self.ada.id + 100],
+            [self.backend.id] * 3,
+        )
+        self.assertTrue(np.all((scores >= 0) & (scores <= 1)))
+        self.assertGreater(scores[0], scores[1])
+        self.assertEqual(scores[2], 0)
+
+    def test_no_pairs_is_an_error(self):
+        Applicant.objects.all().delete()
+        with self.assertRaises(CommandError):
+            self.train("--source", "applicants")
+        with self.assertRaises(CommandError):
+            self.train("--chunk-size", "0")
+
+
+class InverseOverlap:
+    """Stand-in rerank model: prefers candidates sharing fewer job skills."""
+
+    def __init__(self, n_features):
+        self.column = 3 * n_features
+
+    def predict_proba(self, matrix):
+        overlap = matrix[:, self.column].toarray().ravel()
+        probability = 1 / (1 + overlap)
+        return np.column_stack([1 - probability, probability])
+
+
+class RerankTests(TestCase):
+    job_profile = {
+        "skills": "python;django;postgresql",
+        "experience_level": "mid",
+        "years_of_experience": 2,
+        "location": "lagos",
+        "min_salary": 1000,
+        "max_salary": 4000,
+        "currency_type": "USD",
+    }
+
+    def setUp(self):
+        cache.clear()
+        candidate_index._index = None
+        scoring._scorers.clear()
+        model_cache._loaded.clear()
+        self.addCleanup(model_cache._loaded.clear)
+        self.addCleanup(scoring._scorers.clear)
+        self.addCleanup(setattr, candidate_index, "_index", None)
+        skill_sets = [
+            ["python", "django", "postgresql"],
+            ["python", "django"],
+            ["python"],
+            ["python", "go"],
+        ]
+        self.users = [
+            make_candidate(
+                f"user{number}@example.com",
+                skills,
+                experience_level="Mid",
+                years_of_experience=3,
+                location="Lagos",
+                min_salary=1500,
+                max_salary=3000,
+            )
+            for number, skills in enumerate(skill_sets)
+        ]
+        self.index = candidate_index._index = CandidateIndex.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_model(
+                "reranker",
+                {
+                    "featurizer": PairFeaturizer(N_FEATURES),
+                    "model": InverseOverlap(N_FEATURES),
+                },
+            )
+
+    def recommend(self, **options):
+        matcher = JobAppMatching(**options)
+        return matcher, matcher.recommend_users(self.job_profile, self.index)
+
+    def user_ids(self, results):
+        return [result["user_id"] for result in results]
+
+    def test_without_a_model_the_weighted_score_ranks(self):
+        matcher, results = self.recommend(rerank_model="")
+        self.assertEqual(self.user_ids(results), [user.id for user in self.users])
+        self.assertNotIn("rerank_score", results[0])
+        self.assertEqual(set(matcher.timings), {"candidates", "retrieve_ms"})
+
+    def test_model_reranks_the_shortlist(self):
+        _, weighted = self.recommend(rerank_model="")
+        matcher, results = self.recommend(
+            rerank_model="reranker", rerank_budget_ms=10_000
+        )
+        # The stand-in model reverses the (normalized) skill-overlap order
+        self.assertEqual(
+            self.user_ids(results), [self.users[i].id for i in (3, 2, 1, 0)]
+        )
+        scores = [result["rerank_score"] for result in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        weighted_scores = {r["user_id"]: r["match_score"] for r in weighted}
+        for result in results:
+            self.assertEqual(result["match_score"], weighted_scores[result["user_id"]])
+        self.assertEqual(matcher.timings["shortlist"], 4)
+        self.assertEqual(matcher.timings["reranked"], 4)
+        self.assertIn("rerank_ms", matcher.timings)
+
+    @mock.patch.object(ranking, "RERANK_BATCH_SIZE", 1)
+    def test_budget_bounds_the_reranked_rows(self):
+        clock = mock.Mock()
+        # Two batches fit in the budget; the third check finds it spent
+        clock.perf_counter.side_effect = [0, 0, float("inf")]
+        with mock.patch.object(ranking, "time", clock), self.assertLogs(
+            "api.job_model.job_recommender", "INFO"
+        ):
+            matcher, results = self.recommend(
+                rerank_model="reranker", rerank_budget_ms=10_000
+            )
+
+        # The two best weighted rows are reranked; the rest keep their order
+        self.assertEqual(
+            self.user_ids(results), [self.users[i].id for i in (1, 0, 2, 3)]
+        )
+        self.assertEqual(
+            ["rerank_score" in result for result in results],
+            [True, True, False, False],
+        )
+        self.assertEqual(matcher.timings["reranked"], 2)
+
+    def test_spent_budget_keeps_the_weighted_order(self):
+        _, weighted = self.recommend(rerank_model="")
+        with self.assertLogs("api.job_model.job_recommender", "INFO"):
+            matcher, results = self.recommend(
+                rerank_model="reranker", rerank_budget_ms=0
+            )
+        self.assertEqual(results, weighted)
+        self.assertEqual(matcher.timings["reranked"], 0)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..job_model import candidate_index
+from ..job_model.candidate_index import CandidateIndex, refresh_candidates
+from ..job_model.scoring import SKILL_WEIGHTS, build_scorer
+from ..models import UserSkills
+from .helpers import make_candidate
+
+JOB = {
+    "experience": 2,
+    "years": 3,
+    "location": "lagos",
+    "min_salary": 1000,
+    "max_salary": 4000,
+    "currency": "USD",
+}
+
+
+class CandidateScorerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        candidate_index._index = None
+        self.ada = make_candidate(
+            "ada@example.com",
+            ["python", "django"],
+            experience_level="Senior",
+            years_of_experience=6,
+            location="Lagos",
+        )
+        self.grace = make_candidate(
+            "grace@example.com", ["django"], experience_level="Mid", location="Abuja"
+        )
+        self.linus = make_candidate("linus@example.com", ["python", "c"])
+        self.index = candidate_index._index = CandidateIndex.build()
+
+    def tearDown(self):
+        candidate_index._index = None
+
+    def test_recommend_keeps_the_best_k_above_the_minimum(self):
+        scorer = build_scorer(self.index, "skills")
+        rows = self.index.live_rows()
+        scores = scorer.score(rows, "python, django", JOB, SKILL_WEIGHTS)
+
+        results = scorer.recommend(
+            rows, "python, django", JOB, SKILL_WEIGHTS, k=2, min_score=0.0
+        )
+        expected = rows[np.argsort(-scores, kind="stable")[:2]]
+        self.assertEqual(
+            [r["user_id"] for r in results],
+            list(self.index.values("user_id", expected)),
+        )
+        self.assertEqual(results[0]["user_id"], self.ada.id)
+
+        cutoff = float(np.sort(scores)[-1])
+        results = scorer.recommend(
+            rows, "python, django", JOB, SKILL_WEIGHTS, min_score=cutoff
+        )
+        self.assertEqual([r["user_id"] for r in results], [self.ada.id])
+
+    def test_sync_patches_changed_rows(self):
+        scorer = build_scorer(self.index, "skills")
+
+        UserSkills.objects.create(user=self.grace, name="python")
+        refresh_candidates([self.grace.id])
+
+        scorer.sync(self.index)
+        position = self.index.row_of(self.grace.id)
+        column = scorer.vectorizer.vocabulary_["python"]
+        self.assertGreater(scorer.matrix[position, column], 0)
+        self.assertEqual(scorer.version, self.index.version)
+
+    @mock.patch.object(candidate_index, "MAX_CHANGELOG_ENTRIES", 2)
+    def test_sync_rebuilds_once_the_change_log_is_trimmed(self):
+        scorer = build_scorer(self.index, "skills")
+
+        for user in (self.ada, self.grace, self.linus):
+            UserSkills.objects.create(user=user, name="rust")
+            refresh_candidates([user.id])
+
+        self.assertEqual(len(self.index.changelog), 2)
+        self.assertIsNone(self.index.changed_since(0))
+        self.assertIsNotNone(self.index.changed_since(1))
+
+        scorer.sync(self.index)
+        self.assertEqual(scorer.version, 3)
+        self.assertEqual(
+            scorer.matrix.shape[0], build_scorer(self.index, "skills").matrix.shape[0]
+        )
+        ada = self.index.row_of(self.ada.id)
+        python = scorer.vectorizer.vocabulary_["python"]
+        self.assertGreater(scorer.matrix[ada, python], 0)
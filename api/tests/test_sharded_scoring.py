@@ -0,0 +1,102 @@
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..job_model import candidate_index, sharded_scoring
+from ..job_model.candidate_index import CandidateIndex, refresh_candidates
+from ..job_model.scoring import SKILL_WEIGHTS, build_scorer
+from ..job_model.sharded_scoring import ShardPool
+from ..models import UserSkills
+from .helpers import make_candidate
+
+SKILLS = [["python"], ["python", "django"], ["django"], ["go"], ["python", "go"]]
+
+
+class ShardPoolTests(TestCase):
+    """Sharded top-k agrees with scoring every row in-process."""
+
+    query = "python, django"
+    job = {
+        "experience": 1,
+        "years": 0,
+        "location": "lagos",
+        "min_salary": 0,
+        "max_salary": 0,
+        "currency": "USD",
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            make_candidate(f"user{number}@example.com", skills, location="Lagos")
+            for number, skills in enumerate(SKILLS * 2)
+        ]
+        self.index = candidate_index._index = CandidateIndex.build()
+        self.scorer = build_scorer(self.index, "skills")
+        self.pool = ShardPool(2)
+
+    def tearDown(self):
+        self.pool.close()
+        candidate_index._index = None
+
+    def in_process(self, rows, k):
+        scores = self.scorer.score(rows, self.query, self.job, SKILL_WEIGHTS)
+        order = np.lexsort((rows, -scores))[:k]
+        return rows[order].tolist(), scores[order].round(6).tolist()
+
+    def sharded(self, rows, k):
+        rows, scores = self.pool.top_k(
+            self.scorer,
+            rows,
+            self.scorer._vectors([self.query]),
+            self.scorer._encode_job(self.job),
+            SKILL_WEIGHTS,
+            k,
+            0.0,
+        )
+        # Ties may come back in any order across shards
+        order = np.lexsort((rows, -scores))
+        return rows[order].tolist(), scores[order].round(6).tolist()
+
+    def test_merged_top_k_matches_in_process_scoring(self):
+        rows = self.index.live_rows()
+        for k in (1, 3, len(rows)):
+            self.assertEqual(self.sharded(rows, k), self.in_process(rows, k))
+
+    @mock.patch.object(sharded_scoring, "MAX_DELTA_FRACTION", 0.5)
+    def test_patched_rows_are_scored_from_the_scorer(self):
+        self.sharded(self.index.live_rows(), 3)
+        generation = self.pool.published["skills"]["arrays"].generation
+
+        go_user = self.users[3]
+        UserSkills.objects.create(user=go_user, name="django")
+        refresh_candidates([go_user.id])
+        self.scorer.sync(self.index)
+
+        published, delta = self.pool._publish(self.scorer)
+        self.assertEqual(published.generation, generation)
+        self.assertEqual(delta.tolist(), [self.index.row_of(go_user.id)])
+
+        rows = self.index.live_rows()
+        self.assertEqual(
+            self.sharded(rows, len(rows)), self.in_process(rows, len(rows))
+        )
+
+    def test_rebuilt_or_heavily_patched_scorer_is_republished(self):
+        self.sharded(self.index.live_rows(), 3)
+        generation = self.pool.published["skills"]["arrays"].generation
+
+        for user in self.users[:2]:
+            UserSkills.objects.create(user=user, name="rust")
+        refresh_candidates([user.id for user in self.users[:2]])
+        self.scorer.sync(self.index)
+        published, delta = self.pool._publish(self.scorer)
+        self.assertNotEqual(published.generation, generation)
+        self.assertEqual(len(delta), 0)
+
+        rebuilt = build_scorer(self.index, "skills")
+        self.assertNotEqual(
+            self.pool._publish(rebuilt)[0].generation, published.generation
+        )
@@ -0,0 +1,119 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from ..job_model.ingest import content_hash
+from ..job_model.job_recommender import JobAppMatching
+from ..job_model.skills import normalize_skill, normalize_skills
+from ..models import (
+    BoostJobs,
+    IngestedJob,
+    JobSkills,
+    Profile,
+    User,
+    UserSkills,
+)
+from .helpers import make_candidate
+
+
+class NormalizeSkillsTests(SimpleTestCase):
+    def test_aliases_case_and_separators_fold_to_one_name(self):
+        for spelling in ("React", "react.js", "ReactJS", " React JS ", "react_js"):
+            self.assertEqual(normalize_skill(spelling), "react")
+        self.assertEqual(normalize_skill("Node.JS"), "node.js")
+        self.assertEqual(normalize_skill("k8s"), "kubernetes")
+
+    def test_unknown_skills_are_kept_lowercased(self):
+        self.assertEqual(
+            normalize_skill("  Quantum   Basket Weaving "), "quantum basket weaving"
+        )
+        self.assertEqual(normalize_skill("   "), "")
+        self.assertEqual(normalize_skill(None), "")
+
+    def test_lists_are_deduplicated_in_order(self):
+        self.assertEqual(
+            normalize_skills(["Python3", "Django", "py", "", "ReactJS", "react"]),
+            ["python", "django", "react"],
+        )
+        self.assertEqual(
+            normalize_skills("golang, Postgres;python"), ["go", "postgresql", "python"]
+        )
+        self.assertEqual(normalize_skills(None), [])
+
+    def test_job_terms_use_canonical_names(self):
+        terms, _ = JobAppMatching().job_terms_and_features(
+            {
+                "skills": "ReactJS;Python3;react",
+                "experience_level": "mid",
+                "years_of_experience": 2,
+                "location": "Lagos",
+                "currency_type": "USD",
+            }
+        )
+        self.assertEqual(terms, ["react", "python"])
+
+
+class CanonicalizeSkillsTests(TestCase):
+    def run_command(self, *args):
+        stdout = StringIO()
+        call_command("canonicalize_skills", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_merges_spellings_and_keeps_links(self):
+        ada = make_candidate("ada@example.com")
+        profile = Profile.objects.get(user=ada)
+        skills = [
+            UserSkills.objects.create(user=ada, name=name)
+            for name in ("ReactJS", "react", "Python3")
+        ]
+        profile.skills.set(skills)
+
+        owner = User.objects.create(email="hr@example.com", company=True)
+        boost_job = BoostJobs.objects.create(
+            title="Frontend",
+            owner=owner,
+            job_type="FULL_TIME",
+            job_nature="REMOTE",
+            location="lagos",
+            experience_level="MID",
+            min_salary=0,
+            max_salary=0,
+            application_link="https://example.com/apply",
+        )
+        boost_job.job_skills.set(
+            [JobSkills.objects.create(name=name) for name in ("reactjs", "react.js")]
+        )
+        job = IngestedJob.objects.create(
+            source_job_id="job-1", title="Job", required_skills=["ReactJS"]
+        )
+
+        output = self.run_command()
+        self.assertIn("UserSkills: 2 renamed, 1 merged", output)
+        self.assertIn("JobSkills: 1 renamed, 1 merged", output)
+        self.assertIn("Ingested jobs: 1 updated", output)
+
+        self.assertEqual(
+            sorted(UserSkills.objects.filter(user=ada).values_list("name", flat=True)),
+            ["python", "react"],
+        )
+        self.assertEqual(
+            sorted(profile.skills.values_list("name", flat=True)), ["python", "react"]
+        )
+        self.assertEqual(
+            list(JobSkills.objects.values_list("name", flat=True)), ["react"]
+        )
+        self.assertEqual(
+            list(boost_job.job_skills.values_list("name", flat=True)), ["react"]
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.required_skills, ["react"])
+        self.assertEqual(job.content_hash, content_hash(job))
+
+    def test_dry_run_changes_nothing(self):
+        ada = make_candidate("ada@example.com", ["ReactJS"])
+        self.run_command("--dry-run")
+        self.assertEqual(
+            list(UserSkills.objects.filter(user=ada).values_list("name", flat=True)),
+            ["ReactJS"],
+        )
@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from ..job_model import candidate_index, scoring, snapshots
+from ..job_model.candidate_index import (
+    CandidateIndex,
+    get_candidate_index,
+    refresh_candidates,
+)
+from ..job_model.scoring import build_scorer, get_scorer
+from ..models import UserSkills
+from .helpers import make_candidate
+
+
+class CandidateIndexCatchUpTests(TestCase):
+    """Workers replay the changes other workers published."""
+
+    def setUp(self):
+        cache.clear()
+        candidate_index._index = None
+        self.ada = make_candidate("ada@example.com", ["python"])
+        self.grace = make_candidate("grace@example.com", ["django"])
+
+    def tearDown(self):
+        candidate_index._index = None
+
+    def skills_of(self, index, user):
+        return index.values("skills", [index.row_of(user.id)])[0]
+
+    def test_catch_up_replays_changes_published_by_another_worker(self):
+        index = CandidateIndex.build()
+
+        # No resident index here, so the change is only published
+        UserSkills.objects.create(user=self.ada, name="django")
+        refresh_candidates([self.ada.id])
+
+        self.assertEqual(self.skills_of(index, self.ada), "python")
+        self.assertTrue(index.catch_up(candidate_index._shared_version()))
+        self.assertEqual(self.skills_of(index, self.ada), "django;python")
+        self.assertEqual(index.changed_since(0).tolist(), [index.row_of(self.ada.id)])
+
+    def test_patch_made_while_behind_reaches_the_scorer(self):
+        index = candidate_index._index = CandidateIndex.build()
+        scorer = build_scorer(index, "skills")
+
+        # Published by another worker; this one has not caught up yet
+        UserSkills.objects.create(user=self.grace, name="python")
+        candidate_index._publish_changes({self.grace.id})
+        UserSkills.objects.create(user=self.ada, name="django")
+        refresh_candidates([self.ada.id])
+        self.assertEqual(index.version, 0)
+
+        self.assertIs(get_candidate_index(), index)
+        ada, grace = index.row_of(self.ada.id), index.row_of(self.grace.id)
+        self.assertEqual(index.version, 2)
+        self.assertEqual(sorted(index.changed_since(0).tolist()), sorted([ada, grace]))
+
+        scorer.sync(index)
+        vocabulary = scorer.vectorizer.vocabulary_
+        self.assertGreater(scorer.matrix[ada, vocabulary["django"]], 0)
+        self.assertGreater(scorer.matrix[grace, vocabulary["python"]], 0)
+
+
+class CandidateSnapshotTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        shared_cache = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": os.path.join(self.root, "cache"),
+            }
+        }
+        settings = override_settings(
+            CACHES=shared_cache,
+            CANDIDATE_SNAPSHOT_DIR=os.path.join(self.root, "snapshots"),
+            CANDIDATE_SNAPSHOT_MAX_AGE=3600,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+
+        candidate_index._index = None
+        self.addCleanup(setattr, candidate_index, "_index", None)
+        scoring._scorers.clear()
+        self.addCleanup(scoring._scorers.clear)
+        snapshots._current.update(mtime=None, snapshot=None)
+        self.ada = make_candidate("ada@example.com", ["python"])
+        self.grace = make_candidate("grace@example.com", ["django"])
+
+    def build_snapshot(self):
+        call_command("build_candidate_snapshot", stdout=StringIO())
+        return snapshots.current_snapshot()
+
+    def skills_of(self, index, user):
+        return index.values("skills", [index.row_of(user.id)])[0]
+
+    def test_workers_map_the_current_snapshot(self):
+        snapshot = self.build_snapshot()
+
+        index = get_candidate_index()
+        self.assertEqual(index.snapshot_name, snapshot.name)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(self.skills_of(index, self.ada), "python")
+
+        scorer = get_scorer(index, "skills")
+        self.assertEqual(
+            list(scorer.matrix.shape), snapshot.meta["vectorizers"]["skills"]["shape"]
+        )
+        python = scorer.vectorizer.vocabulary_["python"]
+        self.assertGreater(scorer.matrix[index.row_of(self.ada.id), python], 0)
+
+    def test_changes_made_after_the_snapshot_are_replayed(self):
+        self.build_snapshot()
+        UserSkills.objects.create(user=self.ada, name="django")
+        refresh_candidates([self.ada.id])
+
+        index = get_candidate_index()
+        self.assertIsNotNone(index.snapshot)
+        self.assertEqual(self.skills_of(index, self.ada), "django;python")
+
+    def test_workers_move_to_a_newer_snapshot(self):
+        first = self.build_snapshot()
+        self.assertEqual(get_candidate_index().snapshot_name, first.name)
+
+        second = self.build_snapshot()
+        self.assertNotEqual(second.name, first.name)
+        self.assertEqual(get_candidate_index().snapshot_name, second.name)
+
+    def test_expired_snapshots_are_ignored(self):
+        snapshot = self.build_snapshot()
+        meta_path = os.path.join(snapshot.path, snapshots.META_FILE)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        meta["created_at"] = time.time() - 7200
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        snapshots._current.update(mtime=None, snapshot=None)
+
+        self.assertIsNone(snapshots.current_snapshot())
+        index = get_candidate_index()
+        self.assertIsNone(index.snapshot)
+        self.assertEqual(len(index), 2)
+
+    def test_snapshots_need_a_shared_cache(self):
+        self.build_snapshot()
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            }
+        ):
+            self.assertIsNone(snapshots.current_snapshot())
+            with self.assertRaises(CommandError):
+                call_command("build_candidate_snapshot", stdout=StringIO())
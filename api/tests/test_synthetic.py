@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..job_model import candidate_index
+from ..job_model.synthetic import SYNTHETIC_EMAIL_PREFIX
+from ..models import BoostJobs, JobPreference, Jobs, Profile, User
+
+
+class GenerateSyntheticDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        candidate_index._index = None
+
+    def tearDown(self):
+        candidate_index._index = None
+
+    def generate(self, *args):
+        call_command("generate_synthetic_data", *args, stdout=StringIO())
+
+    def test_generates_the_requested_rows(self):
+        self.generate("--users", "40", "--jobs", "5", "--boost-jobs", "3")
+
+        candidates = User.objects.filter(
+            company=False, email__startswith=SYNTHETIC_EMAIL_PREFIX
+        )
+        self.assertEqual(candidates.count(), 40)
+        self.assertEqual(Profile.objects.filter(user__in=candidates).count(), 40)
+        self.assertEqual(Jobs.objects.count(), 5)
+        self.assertEqual(BoostJobs.objects.count(), 3)
+        self.assertTrue(
+            candidates.filter(user_skills__isnull=False).exists(),
+            "candidates should get skills from the sample distributions",
+        )
+
+    def test_clear_removes_earlier_runs(self):
+        self.generate("--users", "20", "--jobs", "2", "--boost-jobs", "2")
+        self.generate("--users", "10", "--jobs", "2", "--boost-jobs", "2", "--clear")
+        self.assertEqual(User.objects.filter(company=False).count(), 10)
+
+    def test_rejects_bad_sizes(self):
+        with self.assertRaises(CommandError):
+            self.generate("--users", "-1")
+        with self.assertRaises(CommandError):
+            self.generate("--batch-size", "0")
+
+
+class BenchmarkRecommendersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        candidate_index._index = None
+        call_command(
+            "generate_synthetic_data",
+            "--users",
+            "30",
+            "--jobs",
+            "3",
+            "--boost-jobs",
+            "5",
+            "--preferences-ratio",
+            "0.5",
+            stdout=StringIO(),
+        )
+
+    def tearDown(self):
+        candidate_index._index = None
+
+    def benchmark(self, *args):
+        stdout = StringIO()
+        call_command(
+            "benchmark_recommenders",
+            "--iterations",
+            "2",
+            "--warmup",
+            "0",
+            *args,
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+        return stdout.getvalue()
+
+    def test_reports_latency_memory_and_queries_as_json(self):
+        run = json.loads(
+            self.benchmark(
+                "--entry",
+                "recommend_users",
+                "--entry",
+                "recommend_boost_jobs_for_user_preferences",
+                "--label",
+                "ci",
+            )
+        )
+
+        self.assertEqual(run["label"], "ci")
+        self.assertEqual(run["candidates"], 30)
+        self.assertEqual(run["job_preferences"], JobPreference.objects.count())
+        self.assertEqual(
+            set(run["results"]),
+            {"recommend_users", "recommend_boost_jobs_for_user_preferences"},
+        )
+        for result in run["results"].values():
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+            self.assertGreaterEqual(result["peak_memory_mb"], 0)
+            self.assertGreaterEqual(result["max_queries"], result["queries"])
+
+    def test_output_appends_one_line_per_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "runs.ndjson")
+            for _ in range(2):
+                self.benchmark("--entry", "recommend_users", "--output", path)
+            with open(path) as f:
+                runs = [json.loads(line) for line in f]
+        self.assertEqual(len(runs), 2)
+        self.assertIn("recommend_users", runs[1]["results"])
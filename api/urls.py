@@ -2,6 +2,9 @@ from django.urls import path
 from . import views
 from .job_handoff_views import (
     ingest_job_and_match,
+    ingest_jobs_bulk,
+    match_jobs_batch,
+    ingested_job_status,
     list_ingested_jobs,
     get_ingested_job_matches,
     recommend_jobs_for_user,
@@ -47,6 +50,11 @@ urlpatterns = [
         views.job_create_with_categories,
         name="job-create with category",
     ),
+    path(
+        "job/<int:job_id>/matches/",
+        views.job_match_status,
+        name="job-match-status",
+    ),
     path("job/update/<int:job_id>/", views.job_update, name="job-update"),
     path("job/user/", views.jobs_user, name="user_jobs"),
     path("job/all/", views.jobs_all, name="all_jobs"),
@@ -149,11 +157,26 @@ urlpatterns = [
         ingest_job_and_match,
         name="ingest-job-and-match",
     ),
+    path(
+        "jobs/ingest/bulk/",
+        ingest_jobs_bulk,
+        name="ingest-jobs-bulk",
+    ),
+    path(
+        "jobs/match/batch/",
+        match_jobs_batch,
+        name="match-jobs-batch",
+    ),
     path(
         "jobs/ingested/",
         list_ingested_jobs,
         name="list-ingested-jobs",
     ),
+    path(
+        "jobs/ingested/<int:job_id>/status/",
+        ingested_job_status,
+        name="ingested-job-status",
+    ),
     path(
         "jobs/ingested/<int:job_id>/matches/",
         get_ingested_job_matches,
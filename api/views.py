@@ -13,7 +13,6 @@ import cloudinary
 from django.core.mail import EmailMultiAlternatives
 from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
-import pandas as pd
 import json
 from django.views.decorators.csrf import csrf_exempt
 import time
@@ -41,6 +40,7 @@ from .models import (
     Wallet,
     WalletTransaction,
     JobTweet,
+    MatchingTask,
 )
 
 from .serializer import (
@@ -75,7 +75,12 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from django.conf import settings
-from .custom_signal import job_created, assist_created
+from .custom_signal import (
+    job_created,
+    assist_created,
+    boost_job_posted,
+    job_preference_updated,
+)
 from api.job_model.data_processing import DataPreprocessor
 import resend
 from scuibai.settings import RESEND_API_KEY
@@ -85,6 +90,9 @@ from decimal import Decimal
 
 from django.utils import timezone
 from api.job_model.job_recommender import JobAppMatching
+from api.job_model.match_worker import enqueue_matching, latest_task
+from api.job_model.boost_feed import boost_feed_for
+from api.job_model.skills import normalize_skills
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -1009,7 +1017,7 @@ def profile_update(request):
             new_skills if isinstance(new_skills, list) else new_skills.split(",")
         )
         current_skills = set(profile.skills.values_list("name", flat=True))
-        new_skills_set = set(new_skills)
+        new_skills_set = set(normalize_skills(new_skills))
 
         # Add new skills
         for skill_name in new_skills_set - current_skills:
@@ -1018,9 +1026,9 @@ def profile_update(request):
             )
             profile.skills.add(skill)
 
-        # Remove old skills
+        # Remove old skills (including spellings replaced by canonical names)
         for skill_name in current_skills - new_skills_set:
-            skill = UserSkills.objects.filter(name=skill_name).first()
+            skill = profile.skills.filter(name=skill_name).first()
             if skill:
                 profile.skills.remove(skill)
 
@@ -1179,7 +1187,7 @@ def onboarding(request, user_id):
     if "skills" in data:
         new_skills = data.pop("skills")
         current_skills = set(profile.skills.values_list("name", flat=True))
-        new_skills_set = set(new_skills)
+        new_skills_set = set(normalize_skills(new_skills))
 
         # Add new skills
         for skill_name in new_skills_set - current_skills:
@@ -1188,9 +1196,9 @@ def onboarding(request, user_id):
             )
             profile.skills.add(skill)
 
-        # Remove old skills
+        # Remove old skills (including spellings replaced by canonical names)
         for skill_name in current_skills - new_skills_set:
-            skill = UserSkills.objects.filter(name=skill_name).first()
+            skill = profile.skills.filter(name=skill_name).first()
             if skill:
                 profile.skills.remove(skill)
 
@@ -1451,7 +1459,7 @@ def job_create(request):
         job_instance = serialized_data.save()
 
         # Create and associate job skills
-        for skill in new_skills:
+        for skill in normalize_skills(new_skills):
             job_skill, created = JobSkills.objects.get_or_create(name=skill)
             job_instance.skills.add(job_skill)
 
@@ -1535,15 +1543,11 @@ def get_recommendation(request, job_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Convert job data into Pandas DataFrame format
-    job_df = pd.DataFrame([job_data])
+    # Load the candidates meeting the job's hard constraints
 
-    matcher.enrich_jobs_with_currency(job_df)
-    # Load all users as potential candidates
+    user_profiles = matcher.load_users_for_job(job_data)
 
-    user_profiles = matcher.load_users_from_db()
-
-    if user_profiles.empty or user_profiles["skills"].str.strip().eq("").all():
+    if user_profiles.empty or not user_profiles.has_terms("skills"):
         return Response(
             {
                 "recommended_applicants": [],
@@ -1702,7 +1706,7 @@ def job_update(request, job_id):
 
         if skills_update:
             current_skills = set(job_instance.skills.values_list("name", flat=True))
-            new_skills_set = set(new_skills)
+            new_skills_set = set(normalize_skills(new_skills))
 
             # Add new skills
             for skill_name in new_skills_set - current_skills:
@@ -2396,19 +2400,13 @@ def google_auth(request):
 def post_job_without_auth(request):
     job_data = request.data
     job_data["skills"] = ";".join(job_data["skills"])
-    # Prepare data for recommendation system
-    job_df = pd.DataFrame([job_data])
-
     # Instantiate recommendation system
     matcher = JobAppMatching()
 
-    # Enrich job data
-    matcher.enrich_jobs_with_currency(job_df)
+    # Load the candidates meeting the job's hard constraints
+    user_profiles = matcher.load_users_for_job(job_data)
 
-    # Load all users as potential candidates
-    user_profiles = matcher.load_users_from_db()
-
-    if user_profiles.empty or user_profiles["skills"].str.strip().eq("").all():
+    if user_profiles.empty or not user_profiles.has_terms("skills"):
         return Response(
             {
                 "detail": "Job processed successfully!",
@@ -2541,19 +2539,13 @@ def post_job_without_auth(request):
 def match_job_with_categories(request):
     job_data = request.data
     job_data["categories"] = ";".join(job_data["categories"])
-    # Prepare data for recommendation system
-    job_df = pd.DataFrame([job_data])
-
     # Instantiate recommendation system
     matcher = JobAppMatching()
 
-    # Enrich job data
-    matcher.enrich_jobs_with_currency(job_df)
+    # Load the candidates meeting the job's hard constraints
+    user_profiles = matcher.load_users_for_job(job_data)
 
-    # Load all users as potential candidates
-    user_profiles = matcher.load_users_from_db()
-
-    if user_profiles.empty or user_profiles["skills"].str.strip().eq("").all():
+    if user_profiles.empty or not user_profiles.has_terms("skills"):
         return Response(
             {
                 "recommended_applicants": [],
@@ -3836,77 +3828,67 @@ def job_create_with_categories(request):
             "currency_type": job_instance.currency_type,
         }
 
-        matcher = JobAppMatching()
+        # Matching runs in the background; poll job/<id>/matches/ for results
+        task = enqueue_matching(MatchingTask.Kind.JOB, job_instance.id)
+        data["match_status"] = task.status
+        data["match_task_id"] = task.id
 
-        job_data = matcher.load_job_from_db(job_instance.id)
-        if not job_data:
-            return Response(
-                {"error": "Job data could not be retrieved."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        return Response(
+            {"detail": "Job successfully posted!", "data": data},
+            status=status.HTTP_201_CREATED,
+        )
 
-        job_df = pd.DataFrame([job_data])
-        matcher.enrich_jobs_with_currency(job_df)
+    return Response(
+        {"error": serialized_data.errors}, status=status.HTTP_400_BAD_REQUEST
+    )
 
-        user_profiles = matcher.load_users_from_db()
-        if user_profiles.empty or user_profiles["categories"].str.strip().eq("").all():
-            return Response(
-                {
-                    "detail": "Job successfully posted!",
-                    "data": data,
-                    "recommended_applicants": [],
-                },
-                status=status.HTTP_201_CREATED,
-            )
 
-        # Get matches by categories (instead of skills)
-        recommended_users = matcher.recommend_users_categories(job_data, user_profiles)
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Get matching status and recommended applicants for a job",
+    manual_parameters=[
+        openapi.Parameter(
+            name="Authorization",
+            in_=openapi.IN_HEADER,
+            description="Bearer {token}",
+            type=openapi.TYPE_STRING,
+            required=True,
+        ),
+    ],
+    responses={
+        200: "Matching status, with recommended applicants once done",
+        403: "Not the job owner",
+        404: "Job not found",
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def job_match_status(request, job_id):
+    try:
+        job = Jobs.objects.get(id=job_id)
+    except Jobs.DoesNotExist:
+        return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        recommended_applicants_list = []
-        user_ids = [u["user_id"] for u in recommended_users]
-        profiles = (
-            Profile.objects.filter(user_id__in=user_ids)
-            .select_related("user")  # optimize user join
-            .prefetch_related("skills")  # optimize M2M fetch
+    if job.owner_id != request.user.id:
+        return Response(
+            {"error": "You do not own this job"}, status=status.HTTP_403_FORBIDDEN
         )
 
-        # Map for O(1) access
-        profile_map = {p.user_id: p for p in profiles}
-
-        for user_data in recommended_users:
-            user_id = user_data["user_id"]
-            profile = profile_map.get(user_id)
-            if not profile:
-                continue
-            recommended_applicants_list.append(
-                {
-                    "user_id": profile.user.id,
-                    "user_name": profile.user.first_name,
-                    "user_email": profile.user.email,
-                    "user_bio": profile.bio,
-                    "image": profile.image.url if profile.image else None,
-                    "match_score": user_data["match_score"],
-                    "years_of_experience": profile.years_of_experience,
-                    "salary_range": user_data["salary_range"],
-                    "currency": profile.currency,
-                    "location": profile.location,
-                    "employment_choice": profile.employment_type,
-                    "job_location_choice": profile.job_location,
-                    "categories": list(
-                        profile.categories.values_list("name", flat=True)
-                    ),
-                }
-            )
-
-        data["recommended_applicants"] = recommended_applicants_list
-
+    task = latest_task(MatchingTask.Kind.JOB, job.id)
+    if task is None:
         return Response(
-            {"detail": "Job successfully posted!", "data": data},
-            status=status.HTTP_201_CREATED,
+            {"error": "No matching has been run for this job"},
+            status=status.HTTP_404_NOT_FOUND,
         )
 
     return Response(
-        {"error": serialized_data.errors}, status=status.HTTP_400_BAD_REQUEST
+        {
+            "job_id": job.id,
+            "match_status": task.status,
+            "error": task.error,
+            "recommended_applicants": task.result.get("recommended_applicants", []),
+        },
+        status=status.HTTP_200_OK,
     )
 
 
@@ -4256,7 +4238,8 @@ def my_subscription(request):
 def post_boost_job(request):
     serializer = BoostJobSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save(owner=request.user)
+        job = serializer.save(owner=request.user)
+        boost_job_posted.send(sender=BoostJobs, instance=job)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -4409,6 +4392,7 @@ def update_boost_job(request, job_id):
 
     if serializer.is_valid():
         serializer.save()
+        boost_job_posted.send(sender=BoostJobs, instance=job)
         return Response(
             {"message": "Job updated successfully", "data": serializer.data}
         )
@@ -4559,6 +4543,7 @@ def job_preference_view(request):
 
     if serializer.is_valid():
         obj = serializer.save()
+        job_preference_updated.send(sender=JobPreference, instance=obj)
         return Response(
             {
                 "message": "Preferences saved successfully",
@@ -4667,9 +4652,7 @@ def recommended_boost_jobs(request):
         )
         return Response({"results": serializer.data})
 
-    matcher = JobAppMatching()
-
-    recommendations = matcher.recommend_boost_jobs_for_user_preferences(preference)
+    recommendations = boost_feed_for(preference)
 
     jobs = []
     for job, score in recommendations:
@@ -7,5 +7,11 @@ python manage.py migrate api --noinput
 echo "Running remaining migrations..."
 python manage.py migrate --noinput
 
+if [ -n "$CANDIDATE_SNAPSHOT_DIR" ]; then
+  echo "Writing candidate snapshot for the workers to share..."
+  python manage.py build_candidate_snapshot \
+    || echo "No candidate snapshot written; workers will build from the database"
+fi
+
 echo "Starting Gunicorn..."
 exec gunicorn scuibai.wsgi:application --bind 0.0.0.0:8000
@@ -0,0 +1,19 @@
+# Gunicorn reads this file from the working directory on start.
+import logging
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def post_worker_init(worker):
+    """
+    Load the active model registry artifacts (the TF-IDF vectorizers and any
+    trained classifier) before the worker takes its first request, so that
+    request does not pay for the database read and unpickling.
+    """
+    from api.job_model.model_registry import model_cache
+
+    try:
+        model_cache.warm_up()
+    except Exception:
+        # A cold cache only costs the first request; never block the worker
+        logger.exception("Model registry warm-up failed")
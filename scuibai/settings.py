@@ -119,6 +119,21 @@ else:
         )
     }
 
+# SHARED CACHE
+# The candidate and job index versions, their change logs and the model
+# registry stamps live in the default cache and must be seen by every gunicorn
+# worker. REDIS_URL selects Redis; without it each process has its own
+# LocMemCache, so workers only pick up each other's changes at their periodic
+# *_MAX_AGE rebuilds and candidate snapshots are disabled
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -259,3 +274,82 @@ NEW_RESEND_API_KEY = os.getenv("NEW_RESEND_API_KEY")
 NEW_GOOGLE_CLIENT_ID = os.getenv("NEW_CLIENT_ID")
 NEW_GOOGLE_CLIENT_SECRET = os.getenv("NEW_CLIENT_SECRET")
 SOCIAL_SECRET_KEY = os.getenv("SOCIAL_SECRET_KEY")
+
+# Recommender: seconds before a worker's resident candidate index is rebuilt
+# even if no version bump was seen (the only refresh without REDIS_URL)
+CANDIDATE_INDEX_MAX_AGE = int(os.getenv("CANDIDATE_INDEX_MAX_AGE", "300"))
+# Recommender: same fallback for the cached job matrix used by reverse matching
+JOB_INDEX_MAX_AGE = int(os.getenv("JOB_INDEX_MAX_AGE", "300"))
+# Ingested jobs older than this many days are no longer recommended; they
+# stay in the database (0 recommends them forever)
+INGESTED_JOB_MAX_AGE_DAYS = int(os.getenv("INGESTED_JOB_MAX_AGE_DAYS", "30"))
+# `manage.py purge_ingested_jobs` deletes ingested jobs (and their matches)
+# whose content has not changed for this many days. 0 disables the purge
+INGESTED_JOB_RETENTION_DAYS = int(os.getenv("INGESTED_JOB_RETENTION_DAYS", "0"))
+# Model registry: seconds between checks for a newly activated model version
+# (e.g. a refitted TF-IDF vectorizer) when no cache stamp change was seen
+MODEL_REGISTRY_REFRESH_INTERVAL = int(
+    os.getenv(
+        "MODEL_REGISTRY_REFRESH_INTERVAL",
+        os.getenv("VECTORIZER_REFRESH_INTERVAL", "60"),
+    )
+)
+# Recommender: memory budget for one chunk of the batch job-matching product
+MATCHING_BATCH_MEMORY_MB = int(os.getenv("MATCHING_BATCH_MEMORY_MB", "64"))
+# Recommender: score candidates in this many shard processes per web worker
+# (0 or 1 disables sharding), but only for requests over at least
+# MATCHING_SHARD_MIN_CANDIDATES candidates; smaller ones stay in-process
+MATCHING_SHARDS = int(os.getenv("MATCHING_SHARDS", "0"))
+MATCHING_SHARD_MIN_CANDIDATES = int(
+    os.getenv("MATCHING_SHARD_MIN_CANDIDATES", "50000")
+)
+# Recommender: job constraints enforced as hard filters in SQL before candidates
+# are loaded, comma separated from experience, years, salary, currency,
+# location, remote (see CandidateFilter). Empty keeps every constraint soft:
+# scored only, with candidates served from the resident index
+CANDIDATE_HARD_FILTERS = [
+    name.strip()
+    for name in os.getenv("CANDIDATE_HARD_FILTERS", "").split(",")
+    if name.strip()
+]
+# Recommender: registry name of a model (e.g. "applicant_ranker", trained by
+# `manage.py train_applicant_ranker`) that reranks the top RERANK_SHORTLIST_K
+# candidates of the weighted score. Reranking stops once a request has taken
+# RERANK_BUDGET_MS and the rest of the shortlist keeps its weighted order.
+# Empty disables reranking
+RERANK_MODEL = os.getenv("RERANK_MODEL", "")
+RERANK_SHORTLIST_K = int(os.getenv("RERANK_SHORTLIST_K", "200"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "50"))
+# Recommender: directory of on-disk candidate snapshots written by
+# `manage.py build_candidate_snapshot`; workers memory-map the newest one so
+# they share its pages. Empty disables snapshots (each worker builds from DB).
+# Requires a shared cache (REDIS_URL, see SHARED CACHE above): workers replay
+# the changes made since the snapshot from the cache, so with the default
+# per-process LocMemCache snapshots are ignored. Snapshots older than
+# CANDIDATE_SNAPSHOT_MAX_AGE seconds are ignored too (0 disables the limit)
+CANDIDATE_SNAPSHOT_DIR = os.getenv("CANDIDATE_SNAPSHOT_DIR", "")
+CANDIDATE_SNAPSHOT_KEEP = int(os.getenv("CANDIDATE_SNAPSHOT_KEEP", "3"))
+CANDIDATE_SNAPSHOT_MAX_AGE = int(os.getenv("CANDIDATE_SNAPSHOT_MAX_AGE", "86400"))
+# Recommender: seconds each candidate change stays in the shared change log,
+# which lets workers replay changes made since a snapshot instead of rebuilding
+CANDIDATE_CHANGELOG_TTL = int(os.getenv("CANDIDATE_CHANGELOG_TTL", "86400"))
+
+# Bulk job ingest (jobs/ingest/bulk/): payloads stored and queued for matching
+# per batch, and the most payloads read from one request
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_MAX_JOBS = int(os.getenv("INGEST_MAX_JOBS", "10000"))
+
+# Background matching queue: "thread" (in each web worker), "command"
+# (separate `manage.py run_match_worker` process) or "sync" (after commit)
+MATCHING_WORKER_MODE = os.getenv("MATCHING_WORKER_MODE", "thread")
+MATCHING_WORKER_POLL_INTERVAL = int(os.getenv("MATCHING_WORKER_POLL_INTERVAL", "5"))
+MATCHING_WORKER_BATCH_SIZE = int(os.getenv("MATCHING_WORKER_BATCH_SIZE", "50"))
+# Seconds without a heartbeat (renewed every third of it while a task runs)
+# before a running task is considered abandoned and requeued, at most
+# MAX_ATTEMPTS times
+MATCHING_TASK_TIMEOUT = int(os.getenv("MATCHING_TASK_TIMEOUT", "600"))
+
+# Boost job feed: entries kept per user, and seconds before a feed is rebuilt
+# on read even without a preference change (catches expired boost jobs)
+BOOST_FEED_SIZE = int(os.getenv("BOOST_FEED_SIZE", "20"))
+BOOST_FEED_MAX_AGE = int(os.getenv("BOOST_FEED_MAX_AGE", "86400"))